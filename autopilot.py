@@ -0,0 +1,166 @@
+"""Autopilot — plays all five stages end-to-end through the real game logic.
+
+The bot moves the cursor and sends the same press / release / right-click
+events a player would, so every frame runs the full loop(). It doubles as
+a repeatable end-to-end workload for perf tracking.
+
+    python autopilot.py                    # no rendering, as fast as possible
+    python autopilot.py --render raster    # headless framebuffer every frame
+    python autopilot.py --render canvas    # real window at the normal pace
+    python autopilot.py --idle --step 1    # hands off: play out the timeout fast
+
+Headless runs use the game clock's manual mode, so game time advances a
+fixed --step seconds per frame regardless of how fast the frames run.
+"""
+import argparse, math, os, random, sys, time
+from types import SimpleNamespace
+
+CLICK_EVERY = 4          # frames between shadow clicks
+BLOOM_EVERY = 10         # frames between plantings
+
+class Autopilot:
+    """Cursor policy for one run. step() is called once before each frame.
+
+    The defaults play cleanly; the knobs make a sloppier player for
+    balance.py: jitter (px of aim error, re-rolled on every retarget),
+    react (frames between cursor moves), and the click / bloom cadence."""
+    def __init__(self, game, idle=False, jitter=0.0, react=1,
+                 click_every=CLICK_EVERY, bloom_every=BLOOM_EVERY):
+        self.g = game
+        self.idle = idle
+        self.jitter = jitter
+        self.react = max(1, int(react))
+        self.click_every = max(1, int(click_every))
+        self.bloom_every = max(1, int(bloom_every))
+        self.tick = 0
+        self.pressed = False
+        self.stage_frames = []        # frame on which each stage completed
+        self._last_stage = game.stage
+
+    def _event(self, x, y):
+        # world -> window x; a target off to one side becomes the window's
+        # edge, which pans the camera toward it
+        x = min(self.g.CANVAS_W - 1, max(0, x - self.g.cam.x))
+        return SimpleNamespace(x=int(x), y=int(y), time=0)
+
+    def _in_view(self, x):
+        return 0 <= x - self.g.cam.x < self.g.CANVAS_W
+
+    def _aim(self, x, y):
+        if self.jitter:
+            x += random.uniform(-self.jitter, self.jitter)
+            y += random.uniform(-self.jitter, self.jitter)
+        return self._event(x, y)
+
+    def _point(self, x, y):
+        if self.tick % self.react: return
+        self.g.on_move(self._aim(x, y))
+
+    def step(self):
+        g = self.g
+        self.tick += 1
+        if g.stage != self._last_stage:
+            self.stage_frames.append(g.frame)
+            self._last_stage = g.stage
+        if self.pressed:
+            g.on_release(self._event(0, 0))
+            self.pressed = False
+
+        if self.idle:
+            return
+        if g.stage == 0:
+            # herd the swarm onto the first zone that is still charging
+            z = next((z for z in g.zones if not z.full), None)
+            if z: self._point(z.x, z.y)
+        elif g.stage in (1, 4):
+            self._point(g.HX, g.HY)
+        elif g.stage == 2:
+            if self.tick % self.bloom_every == 0:
+                i = len(g.flowers)
+                ang = i * math.tau / 5
+                x, y = g.HX + math.cos(ang) * 150, g.HY + math.sin(ang) * 110
+                if self._in_view(x): g.on_right(self._event(x, y))
+                else: self._point(x, y)
+        elif g.stage == 3:
+            if g.dark_spots and self.tick % self.click_every == 0:
+                d = g.dark_spots[0]
+                if self._in_view(d.x):
+                    g.on_press(self._aim(d.x, d.y))
+                    self.pressed = True
+                else:
+                    self._point(d.x, d.y)
+
+def run_headless(game, pilot, max_frames):
+    while not game.game_over and game.frame < max_frames:
+        pilot.step()
+        game.loop()
+
+def run_canvas(game, pilot, max_frames):
+    def drive():
+        if game.game_over or game.frame >= max_frames:
+            game.root.after(600, game.root.destroy)
+            return
+        pilot.step()
+        game.root.after(28, drive)
+    game.start_ambient()
+    game.loop()
+    drive()
+    game.root.mainloop()
+
+def main():
+    ap = argparse.ArgumentParser(description="Play Emberveil end-to-end and report throughput.")
+    ap.add_argument("--render", choices=["none", "raster", "canvas"], default="none")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--max-frames", type=int, default=20000)
+    ap.add_argument("--step", type=float, default=None,
+                    help="game seconds per frame for headless runs (default 0.028)")
+    ap.add_argument("--idle", action="store_true", help="never touch the controls")
+    ap.add_argument("--nav", action="store_true", help="launch the game with --nav")
+    ap.add_argument("--world", type=int, default=None, metavar="N",
+                    help="launch the game with --world=N (a meadow N screens wide)")
+    args = ap.parse_args()
+
+    random.seed(args.seed)
+    del sys.argv[1:]                  # the game reads sys.argv: pass it only the flags below
+    if args.render != "canvas":
+        os.environ["EMBERVEIL_HEADLESS"] = "1"
+    if args.render == "raster":
+        sys.argv.append("--raster")
+    sys.argv.append("--fresh")
+    if args.nav:
+        sys.argv.append("--nav")
+    if args.world:
+        sys.argv.append(f"--world={args.world}")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import game
+
+    if args.step:
+        game.clock.step = args.step
+    pilot = Autopilot(game, idle=args.idle)
+    t0 = time.perf_counter()
+    (run_canvas if args.render == "canvas" else run_headless)(game, pilot, args.max_frames)
+    wall = time.perf_counter() - t0
+
+    print(f"render      {args.render}")
+    print(f"outcome     {game.outcome or 'unfinished'}")
+    print(f"score       {game.score}")
+    print(f"frames      {game.frame}")
+    print(f"game time   {game.clock.now:.1f} s")
+    print(f"wall time   {wall:.2f} s")
+    print(f"sim fps     {game.frame / wall:.1f}")
+    prev = 0
+    for i, f in enumerate(pilot.stage_frames + ([game.frame] if game.outcome == "victory" else [])):
+        print(f"  {game.STAGES[i]['title']:<22} {f - prev:>6} frames")
+        prev = f
+    print("events      " + "  ".join(f"{k} {v}" for k, v in game.event_counts.items()))
+    pauses = game.profiler.gc_pauses
+    print("gc pauses   " + "  ".join(f"gen{g} {sum(1 for p, _ in pauses if p == g)}" for g in range(3))
+          + f"   worst {max((ms for _, ms in pauses), default=0):.2f} ms")
+    for name, calls, total, worst in game.bus.report():
+        print(f"  {name:<34} {calls:>5} calls  {total:>8.3f} ms  worst {worst:.3f} ms")
+    print("systems     every/phase   runs    avg ms  worst ms  over budget")
+    for name, every, phase, runs, avg, worst, over in game.systems.report():
+        print(f"  {name:<12} {every:>5}/{phase:<5} {runs:>6}  {avg:>8.3f}  {worst:>8.3f}  {over:>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Monte Carlo balancing — thousands of seeded sessions per parameter set.
+
+Each worker process imports the game once (headless, rules only: nothing
+is drawn), then plays session after session through reset_run() with the
+autopilot as the player. Every parameter set is played on the same seeds,
+so differences between sets come from the knobs, not the dice.
+
+    python balance.py --runs 2000
+    python balance.py --set HEART_GOAL=8,12 --set DARK_HP=3,5
+    python balance.py --policy jitter=60,react=6,click_every=8
+    python balance.py --runs 400 --scaling        # sessions/s at 1, 2, 4 … workers
+
+Knobs: TIME_LIMIT ZONE_CHARGE_RATE ZONE_DECAY HEART_GOAL BLOOM_GOAL
+HARMONY_GOAL DARK_HP. Policy: jitter react click_every bloom_every.
+"""
+import argparse, itertools, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+KNOBS  = ("TIME_LIMIT", "ZONE_CHARGE_RATE", "ZONE_DECAY", "HEART_GOAL",
+          "BLOOM_GOAL", "HARMONY_GOAL", "DARK_HP")
+POLICY = ("jitter", "react", "click_every", "bloom_every")
+CHUNK  = 20              # sessions per task sent to a worker
+PCTS   = (10, 50, 90)
+
+_game = None
+
+def _init():
+    """Worker start-up: one headless, draw-free copy of the game per process."""
+    global _game
+    os.environ["EMBERVEIL_HEADLESS"] = "1"
+    os.environ["EMBERVEIL_SIM_ONLY"] = "1"
+    sys.argv = [sys.argv[0]]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import game
+    _game = game
+
+def _play(job):
+    """Play one chunk of seeds under one parameter set."""
+    from autopilot import Autopilot
+    knobs, policy, seeds = job
+    g = _game
+    for k, v in knobs.items():
+        setattr(g, k, v)
+    out = []
+    for seed in seeds:
+        g.reset_run(seed)
+        pilot = Autopilot(g, **policy)
+        while not g.game_over:
+            pilot.step()
+            g.step()
+        out.append((g.outcome, list(g.stage_times)))
+    return out
+
+def _number(v):
+    return int(v) if v.lstrip("-").isdigit() else float(v)
+
+def parse_sets(specs):
+    """['HEART_GOAL=8,12', 'DARK_HP=3,5'] -> list of dicts (cartesian product)."""
+    axes = []
+    for spec in specs:
+        k, _, vals = spec.partition("=")
+        if k not in KNOBS: sys.exit(f"unknown knob {k!r} (one of {', '.join(KNOBS)})")
+        axes.append([(k, _number(v)) for v in vals.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)] or [{}]
+
+def parse_policy(spec):
+    out = {}
+    for part in filter(None, (spec or "").split(",")):
+        k, _, v = part.partition("=")
+        if k not in POLICY: sys.exit(f"unknown policy knob {k!r} (one of {', '.join(POLICY)})")
+        out[k] = _number(v)
+    return out
+
+def run(sets, policy, runs, seed, workers):
+    """results[i] = [(outcome, stage_times), ...] for sets[i]; plus wall seconds."""
+    seeds = list(range(seed, seed + runs))
+    jobs, owner = [], []
+    for i, knobs in enumerate(sets):
+        for c in range(0, runs, CHUNK):
+            jobs.append((knobs, policy, seeds[c:c + CHUNK]))
+            owner.append(i)
+    results = [[] for _ in sets]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init) as pool:
+        for i, out in zip(owner, pool.map(_play, jobs)):
+            results[i].extend(out)
+    return results, time.perf_counter() - t0
+
+def report(knobs, sessions, stage_titles):
+    n = len(sessions)
+    wins = sum(1 for o, _ in sessions if o == "victory")
+    label = "  ".join(f"{k}={v}" for k, v in knobs.items()) or "defaults"
+    totals = [sum(st) for o, st in sessions if o == "victory"]
+    med = f"{np.median(totals):.1f} s" if totals else "-"
+    print(f"\n{label}")
+    print(f"  runs {n}   victory {wins / n:6.1%}   timeout {(n - wins) / n:6.1%}   median win {med}")
+    print(f"  {'stage':<22} {'reached':>8} {'done':>7} " + " ".join(f"{'p%d' % p:>7}" for p in PCTS))
+    for s, title in enumerate(stage_titles):
+        reached = sum(1 for _, st in sessions if len(st) >= s)
+        times = [st[s] for _, st in sessions if len(st) > s]
+        cols = [f"{v:>6.1f}s" for v in np.percentile(times, PCTS)] if times else [f"{'-':>7}"] * len(PCTS)
+        print(f"  {title:<22} {reached / n:>8.1%} {len(times) / max(1, reached):>7.1%} " + " ".join(cols))
+
+def main():
+    ap = argparse.ArgumentParser(description="Monte Carlo balancing over the meadow rules.")
+    ap.add_argument("--runs", type=int, default=1000, help="sessions per parameter set")
+    ap.add_argument("--set", action="append", default=[], metavar="KNOB=V1,V2",
+                    help="knob values to sweep (repeat for a grid)")
+    ap.add_argument("--policy", default="", metavar="K=V,...", help="autopilot knobs")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--scaling", action="store_true",
+                    help="time the first set at 1, 2, 4 … workers instead of reporting")
+    args = ap.parse_args()
+    sets, policy = parse_sets(args.set), parse_policy(args.policy)
+
+    if args.scaling:
+        counts = sorted({1 << i for i in range(args.workers.bit_length())} | {args.workers})
+        print(f"{'workers':>8}  {'sessions/s':>11}  {'speed-up':>9}")
+        base = None
+        for w in counts:
+            _, wall = run(sets[:1], policy, args.runs, args.seed, w)
+            rate = args.runs / wall
+            base = base or rate
+            print(f"{w:>8}  {rate:>11.1f}  {rate / base:>8.2f}x")
+        return
+
+    results, wall = run(sets, policy, args.runs, args.seed, args.workers)
+    _init()
+    titles = [s["title"] for s in _game.STAGES]
+    for knobs, sessions in zip(sets, results):
+        report(knobs, sessions, titles)
+    total = len(sets) * args.runs
+    print(f"\n{total} sessions in {wall:.1f} s on {args.workers} workers "
+          f"({total / wall:.1f} sessions/s)")
+
+if __name__ == "__main__":
+    main()
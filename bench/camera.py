@@ -0,0 +1,59 @@
+"""Scrolling world — canvas commands per frame with and without culling.
+
+Plays a run with the autopilot on a meadow --world screens wide, with
+--flies extra flies scattered across the whole map, once drawing only what
+the camera sees and once drawing everything (a margin as wide as the
+world). Commands go through a real FrameBatch into a bare Tcl interpreter
+whose canvas is a no-op proc, as in bench/lod.py. With culling the
+command count follows the screen; without it, the map.
+
+    python bench/camera.py                        # 4 screens, 120 extra flies
+    python bench/camera.py --world 8 --flies 400
+"""
+import os, sys, time, random, tkinter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+args = sys.argv[1:]
+screens = int(args[args.index("--world") + 1]) if "--world" in args else 4
+extra = int(args[args.index("--flies") + 1]) if "--flies" in args else 120
+sys.argv[1:] = ["--fresh", f"--world={screens}"]
+import game, tkbatch
+from autopilot import Autopilot
+
+class TclCanvas(game._NullWidget):
+    _w = ".c"
+
+def play(cull):
+    game.reset_run(7)
+    game.cam.margin = game.camera.MARGIN if cull else game.WORLD_W
+    for f in game.fireflies[28:]:
+        f.x = random.uniform(60, game.WORLD_W - 60)
+    pilot = Autopilot(game)
+    b = game.batch
+    b.commands = 0
+    t0 = time.perf_counter()
+    while not game.game_over and game.frame < 20000:
+        pilot.step()
+        game.loop()
+    ms = (time.perf_counter() - t0) / game.frame * 1000
+    return game.outcome, game.frame, b.commands / game.frame, ms
+
+def main():
+    tcl = tkinter.Tcl()
+    tcl.eval("proc .c args {}")
+    game.canvas = game.panel = TclCanvas()
+    game.batch = tkbatch.FrameBatch(SimpleNamespace(tk=tcl))
+    for z in game.zones: z.canvas = game.canvas
+    game.fireflies += [game.Firefly(game.canvas) for _ in range(extra)]
+    for f in game.fireflies: f.canvas = game.canvas
+
+    print(f"{game.WORLD_SCREENS} screens ({game.WORLD_W} px), {len(game.fireflies)} flies")
+    print(f"{'drawn':>8}  {'outcome':>8}  {'frames':>6}  {'cmds/frame':>10}  {'frame ms':>8}")
+    for cull in (False, True):
+        outcome, frames, cmds, ms = play(cull)
+        print(f"{'in view' if cull else 'all':>8}  {outcome:>8}  {frames:>6}  {cmds:>10.1f}  {ms:>8.3f}")
+
+if __name__ == "__main__":
+    main()
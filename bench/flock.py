@@ -0,0 +1,50 @@
+"""Flocking throughput — simulated frames per second at large swarm sizes.
+
+Runs the real Firefly.move / Firefly.flock code headless (no canvas, no
+audio) and reports fps with flocking off and on, so the cost of the
+neighbour grid can be read straight off the table.
+
+    python bench/flock.py                 # 1k, 5k, 20k flies
+    python bench/flock.py 500 2000 --frames 60
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+import game
+
+def run(n, frames, flocking):
+    random.seed(n)
+    flies = [game.Firefly(game.canvas) for _ in range(n)]
+    grid = game.SpatialGrid()
+    w = game.STAGES[4]["flock"]
+    target = (game.HX, game.HY)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        if flocking:
+            grid.rebuild(flies)
+            for f in flies:
+                f.flock(grid.neighbors(f), w)
+                f.move(target)
+        else:
+            for f in flies:
+                f.move(target)
+    return frames / (time.perf_counter() - t0)
+
+def main():
+    args = sys.argv[1:]
+    frames = 30
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [1000, 5000, 20000]
+
+    print(f"{'flies':>8}  {'plain fps':>10}  {'flock fps':>10}  {'us/fly':>8}")
+    for n in sizes:
+        plain = run(n, frames, False)
+        flock = run(n, frames, True)
+        print(f"{n:>8}  {plain:>10.1f}  {flock:>10.1f}  {1e6/(flock*n):>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Flow-field navigation — field build / repair cost and per-fly steering.
+
+Lays the game's five shadows on the nav grid, then times a full field
+build toward each goal set, the incremental repair after a shadow is
+cleansed, and a frame of Firefly.move steering by cursor versus by the
+flow field at large swarm sizes. Steering is one list lookup per fly, so
+the two columns should stay close; the field itself never sees the swarm.
+
+    python bench/flowfield.py              # 1k, 5k, 20k flies
+    python bench/flowfield.py 500 2000 --frames 60
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+import game
+import flowfield
+
+def timed(fn, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps * 1000
+
+def shadows():
+    random.seed(5)
+    return [(random.randint(120, game.CANVAS_W-120), random.randint(100, game.HEIGHT-120),
+             random.uniform(28, 45)) for _ in range(game.DARK_COUNT)]
+
+def field_costs(reps=20):
+    heart = [(game.HX, game.HY, game.HR * 0.6)]
+    zones = [(z.x, z.y, z.r * 0.6) for z in game.zones]
+    circles = shadows()
+    rows = []
+    for label, goals in (("heart", heart), ("zones", zones)):
+        grid = flowfield.NavGrid(game.CANVAS_W, game.HEIGHT)
+        grid.set_obstacles(circles)
+        build = timed(lambda: flowfield.FlowField(grid, tuple(goals)), reps)
+        def repair():
+            grid.set_obstacles(circles)
+            grid.field(goals)
+            t0 = time.perf_counter()
+            grid.remove_obstacle(*circles[0][:2])
+            return time.perf_counter() - t0
+        fix = sum(repair() for _ in range(reps)) / reps * 1000
+        rows.append((label, grid.gw, grid.gh, build, fix))
+    return rows
+
+def run(n, frames, nav):
+    random.seed(n)
+    flies = [game.Firefly(game.canvas) for _ in range(n)]
+    grid = flowfield.NavGrid(game.CANVAS_W, game.HEIGHT)
+    grid.set_obstacles(shadows())
+    flow = grid.field([(game.HX, game.HY, game.HR * 0.6)])
+    target = None if nav else (game.HX, game.HY)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        for f in flies:
+            f.move(target, flow)
+    return frames / (time.perf_counter() - t0)
+
+def main():
+    args = sys.argv[1:]
+    frames = 30
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [1000, 5000, 20000]
+
+    print(f"{'goal':>6}  {'grid':>7}  {'build ms':>9}  {'repair ms':>10}")
+    for label, gw, gh, build, fix in field_costs():
+        print(f"{label:>6}  {gw:>3}x{gh:<3}  {build:>9.2f}  {fix:>10.2f}")
+    print()
+    print(f"{'flies':>8}  {'cursor fps':>11}  {'nav fps':>8}  {'us/fly':>7}")
+    for n in sizes:
+        cursor = run(n, frames, False)
+        nav = run(n, frames, True)
+        print(f"{n:>8}  {cursor:>11.1f}  {nav:>8.1f}  {1e6/(nav*n):>7.2f}")
+
+if __name__ == "__main__":
+    main()
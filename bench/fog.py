@@ -0,0 +1,55 @@
+"""Fog — bake vs cached load, and the per-frame cost of animating it.
+
+Bakes each layer's textures into a scratch cache, reads them back, then
+animates the layers for `--frames` frames into a bare Tcl interpreter and
+counts canvas commands per frame. Denser fog (higher peak alpha) changes
+the textures, not the command count.
+
+    python bench/fog.py
+    python bench/fog.py --frames 2000
+"""
+import itertools, os, sys, tempfile, time, tkinter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fog
+import tkbatch
+
+W, Y0, Y1 = 840, 340, 680          # game.CANVAS_W, lower half of the meadow
+RGB = (28, 52, 66)
+
+def main():
+    args = sys.argv[1:]
+    frames = 500
+    if "--frames" in args:
+        frames = int(args[args.index("--frames") + 1])
+    fog.CACHE_DIR = tempfile.mkdtemp()
+
+    tcl = tkinter.Tcl()
+    tcl.eval("proc .c args {}")
+    ids = itertools.count(1)
+    canvas = SimpleNamespace(_w=".c", create_image=lambda *a, **k: next(ids))
+
+    print(f"{'peak alpha':>10}  {'bake ms':>8}  {'cached ms':>9}  {'cmds/frame':>10}  {'frame ms':>8}")
+    for scale in (0.5, 1.0, 2.0):
+        layers = [(s, v, min(1.0, a * scale), top, p) for s, v, a, top, p in fog.LAYERS]
+        t0 = time.perf_counter()
+        for s, _, a, _, _ in layers:
+            fog.textures(W, Y1 - Y0, s, RGB, a)
+        bake = (time.perf_counter() - t0) * 1000
+        f = fog.Fog(canvas, W, Y0, Y1, RGB, lambda data, format: "img", layers)
+        t0 = time.perf_counter()
+        for _ in f.load(): pass
+        cached = (time.perf_counter() - t0) * 1000
+        batch = tkbatch.FrameBatch(SimpleNamespace(tk=tcl))
+        cmds = 0
+        t0 = time.perf_counter()
+        for i in range(frames):
+            f.update(i * 0.028, batch)
+            cmds += len(batch.cmds)
+            batch.flush()
+        ms = (time.perf_counter() - t0) / frames * 1000
+        print(f"{layers[0][2]:>10.2f}  {bake:>8.1f}  {cached:>9.2f}  {cmds / frames:>10.2f}  {ms:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""GC pauses — histograms with the default collector vs --gc-hold.
+
+Plays autopilot sessions back to back (reset_run between them) with a
+larger swarm, once per mode, each in its own process since gc.freeze()
+cannot be undone. The profiler records every collection; the table shows
+how many pauses fell in each bucket, per mode, plus the worst frame and
+the full collections that landed mid-stage.
+
+Headless play makes almost no cyclic garbage, so two synthetic loads
+stand in for a windowed session: --heap long-lived containers built at
+start-up (Tk's item tables, image caches) and --litter reference cycles
+made inside every frame that live for LITTER_FRAMES frames (callback
+wrappers, closures): long enough to be promoted, so full passes come due.
+
+    python bench/gc_pauses.py                     # 6 sessions, 400 flies
+    python bench/gc_pauses.py --sessions 20 --flies 1000 --litter 0
+"""
+import argparse, json, os, subprocess, sys, time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("default", "gc-hold")
+LITTER_FRAMES = 30
+
+def child(mode, sessions, flies, heap, litter):
+    sys.path.insert(0, ROOT)
+    os.environ["EMBERVEIL_HEADLESS"] = "1"
+    sys.argv = [sys.argv[0], "--fresh"] + (["--gc-hold"] if mode == "gc-hold" else [])
+    import game
+    from autopilot import Autopilot
+    from profiler import GC_BUCKETS_MS
+    while len(game.fireflies) < flies:
+        game.fireflies.append(game.Firefly(game.canvas))
+    game._bench_heap = [{"id": i, "tags": [i]} for i in range(heap)]
+    update_frame = game.update_frame
+    recent = deque(maxlen=LITTER_FRAMES)
+    def littered():
+        cycles = []
+        for _ in range(litter):
+            a = {}; a["self"] = a
+            cycles.append(a)
+        recent.append(cycles)
+        return update_frame()
+    game.update_frame = littered
+    if game.GC_HOLD:
+        game.gcpolicy.freeze()
+        game.gcpolicy.hold()
+    p = game.profiler
+    p.out = None
+    p.gc_pauses.clear()
+    mid_stage, t0 = 0, time.perf_counter()
+    for seed in range(sessions):
+        game.reset_run(seed)
+        pilot = Autopilot(game)
+        while not game.game_over:
+            pilot.step()
+            n, c = len(p.gc_pauses), game.gcpolicy.collections
+            game.loop()
+            # a full pass inside update_frame, not one the policy chose to run
+            mid_stage += sum(1 for g, _ in p.gc_pauses[n:] if g == 2) - (game.gcpolicy.collections - c)
+    print(json.dumps({
+        "buckets": list(GC_BUCKETS_MS),
+        "all": p.gc_histogram(), "gen2": p.gc_histogram(2),
+        "gen2_ms": [ms for g, ms in p.gc_pauses if g == 2],
+        "policy": game.gcpolicy.collections,
+        "worst": max(p.times, default=0.0),
+        "over": sum(1 for ms in p.times if ms > p.budget_ms),
+        "mid_stage": mid_stage, "wall": time.perf_counter() - t0,
+    }))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=6)
+    ap.add_argument("--flies", type=int, default=400)
+    ap.add_argument("--heap", type=int, default=300000, help="long-lived containers")
+    ap.add_argument("--litter", type=int, default=300, help="garbage cycles per frame")
+    ap.add_argument("--child", choices=MODES)
+    args = ap.parse_args()
+    if args.child:
+        return child(args.child, args.sessions, args.flies, args.heap, args.litter)
+
+    res = {}
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--child", mode,
+                              "--sessions", str(args.sessions), "--flies", str(args.flies),
+                              "--heap", str(args.heap), "--litter", str(args.litter)],
+                             capture_output=True, text=True, check=True).stdout
+        res[mode] = json.loads(out.strip().splitlines()[-1])
+
+    edges = res[MODES[0]]["buckets"]
+    labels = [f"<= {b} ms" for b in edges] + [f"> {edges[-1]} ms"]
+    print(f"{args.sessions} sessions, {args.flies} flies, heap {args.heap}, "
+          f"{args.litter} cycles/frame\n")
+    print(f"{'pause':>12}  " + "  ".join(f"{m + ' all':>12} {m + ' g2':>12}" for m in MODES))
+    for i, lab in enumerate(labels):
+        print(f"{lab:>12}  " + "  ".join(f"{res[m]['all'][i]:>12} {res[m]['gen2'][i]:>12}" for m in MODES))
+    print()
+    for m in MODES:
+        r = res[m]
+        g2 = r["gen2_ms"]
+        print(f"{m:>8}: {len(g2)} full passes (worst {max(g2, default=0):.2f} ms, "
+              f"{r['mid_stage']} mid-stage), worst frame {r['worst']:.1f} ms, "
+              f"{r['over']} frames over budget, {r['wall']:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Run-history store — insert throughput and query latency at scale.
+
+Fills a throwaway database with synthetic runs through the real background
+writer, then times each leaderboard query.
+
+    python bench/history.py              # 1,000,000 runs
+    python bench/history.py 200000
+"""
+import os, sys, time, random, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from history import RunHistory
+
+def timed(fut_fn, *args, reps=20):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        out = fut_fn(*args).result()
+    return (time.perf_counter() - t0) / reps * 1000, out
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    h = RunHistory(path)
+    rnd = random.Random(1)
+
+    t0 = time.perf_counter()
+    now = time.time()
+    for i in range(n):
+        won = rnd.random() < 0.7
+        stages = [rnd.uniform(8, 90) for _ in range(5 if won else rnd.randint(0, 4))]
+        h.record("victory" if won else "timeout", rnd.randint(40, 420),
+                 sum(stages), rnd.randint(0, 6), stages, finished_at=now - i)
+    enqueue = time.perf_counter() - t0
+    h.top(1).result()                       # waits for every queued batch
+    total = time.perf_counter() - t0
+    print(f"runs            {n:,}")
+    print(f"enqueue         {enqueue:.2f} s  ({enqueue / n * 1e6:.2f} us/run on the caller)")
+    print(f"committed       {total:.2f} s  ({n / total:,.0f} runs/s)")
+
+    for label, fn, args in [("top 10", h.top, (10,)),
+                            ("recent 10", h.recent, (10,)),
+                            ("rank", h.rank, (250,)),
+                            ("stage 2 p50/90/99", h.percentiles, (2,))]:
+        ms, _ = timed(fn, *args)
+        print(f"{label:<16}{ms:>8.3f} ms")
+    h.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Light field — per-frame cost at several grid resolutions.
+
+Times one simulation step (sources + diffusion/decay), the canvas overlay
+(PNG at 3× field resolution) and the framebuffer blend for each cell size,
+with 28 and 20k fireflies depositing light. The step should not grow with
+the swarm; only the single deposit bincount sees the flies.
+
+    python bench/lightfield.py            # cells 24, 16, 12, 8, 6, 4 px
+    python bench/lightfield.py 12 6 --frames 50
+"""
+import os, sys, time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lightfield import LightField
+
+W, H = 840, 680
+
+def timed(fn, frames):
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - t0) / frames * 1000
+
+def main():
+    args = sys.argv[1:]
+    frames = 200
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    cells = [int(a) for a in args] or [24, 16, 12, 8, 6, 4]
+    rnd = np.random.default_rng(1)
+
+    print(f"{'cell':>5}  {'grid':>9}  {'step 28':>8}  {'step 20k':>9}  {'png':>7}  {'blend':>7}   (ms)")
+    for cell in cells:
+        lf = LightField(W, H, cell)
+        row = []
+        for n in (28, 20000):
+            xs, ys = rnd.uniform(0, W, n), rnd.uniform(0, H, n)
+            def step():
+                lf.deposit(xs, ys, 0.12)
+                for x, y in ((200, 200), (660, 200), (420, 510)):
+                    lf.emit(x, y, 50, 0.07)
+                lf.emit(420, 355, 68, 0.05)
+                lf.emit(620, 360, 90, -0.09)
+                lf.step()
+            row.append(timed(step, frames))
+        png = timed(lambda: lf.to_png(3), max(1, frames // 4))
+        px = np.zeros((H, W, 3), np.float32)
+        blend = timed(lambda: lf.blend(px), max(1, frames // 10))
+        print(f"{cell:>5}  {lf.gw:>4}x{lf.gh:<4}  {row[0]:>8.3f}  {row[1]:>9.3f}  {png:>7.2f}  {blend:>7.2f}")
+
+if __name__ == "__main__":
+    main()
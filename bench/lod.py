@@ -0,0 +1,80 @@
+"""Crowd LOD — canvas commands and draw cost with the swarm piled into the Heart.
+
+Places N flies around the Heart the way the Harmony Ritual ends (a dense
+core, a loose halo, stragglers across the meadow) and draws frames with
+LOD off and on. Commands go through a real FrameBatch into a bare Tcl
+interpreter whose canvas is a no-op proc, so the columns are the Python
+side plus Tcl parsing — what LOD saves before Tk even starts drawing. The
+detect column is the clustering pass alone.
+
+    python bench/lod.py                   # 100, 1k, 5k flies
+    python bench/lod.py 500 20000 --frames 10
+"""
+import os, sys, time, random, tkinter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+import numpy as np
+import game, tkbatch
+
+class TclCanvas(game._NullWidget):
+    _w = ".c"
+
+def crowd(n):
+    random.seed(n)
+    flies = [game.Firefly(game.canvas) for _ in range(n)]
+    for i, f in enumerate(flies):
+        if i % 10 == 0:                   # stragglers
+            continue
+        spread = game.HR * (0.35 if i % 3 else 0.9)
+        f.x = game.HX + random.gauss(0, spread)
+        f.y = game.HY + random.gauss(0, spread)
+    return flies
+
+def run(n, frames, lod):
+    game.LOD = lod
+    game.fireflies = crowd(n)
+    game.impostors_shown = 0
+    game.batch = b = tkbatch.FrameBatch(SimpleNamespace(tk=tcl))
+    game.draw_swarm(0.0, game.swarm_xy()); b.flush()
+    b.commands = 0
+    t0 = time.perf_counter()
+    for i in range(frames):
+        game.draw_swarm(i * 0.028, game.swarm_xy())   # gathered per frame, as update_swarm does
+        b.flush()
+    ms = (time.perf_counter() - t0) / frames * 1000
+    return ms, b.commands / frames
+
+def detect(n, frames):
+    flies = crowd(n)
+    xy = np.array([(f.x, f.y) for f in flies])
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        game.crowd.update(xy[:, 0], xy[:, 1])
+    return (time.perf_counter() - t0) / frames * 1000, len(game.crowd.clusters)
+
+def main():
+    global tcl
+    args = sys.argv[1:]
+    frames = 20
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [100, 1000, 5000]
+
+    tcl = tkinter.Tcl()
+    tcl.eval("proc .c args {}")
+    game.canvas = TclCanvas()             # flies and impostors made from here on use it
+
+    print(f"{'flies':>7}  {'clusters':>8}  {'detect ms':>9}  {'off ms':>7}  {'off cmds':>8}  "
+          f"{'lod ms':>7}  {'lod cmds':>8}")
+    for n in sizes:
+        det, k = detect(n, frames)
+        off, off_c = run(n, frames, False)
+        on, on_c = run(n, frames, True)
+        print(f"{n:>7}  {k:>8}  {det:>9.3f}  {off:>7.2f}  {off_c:>8.0f}  {on:>7.2f}  {on_c:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Mixer — stereo block render cost vs simultaneous voices.
+
+Loads four effect-length sources (0.4–1.2 s), keeps `voices` of them
+playing at spread pans, and times Mixer.mix(). The block is real time
+when it renders in well under its own duration (BLOCK / RATE).
+
+    python bench/mixer.py                 # 1, 8, 24, 48 voices
+    python bench/mixer.py 64 --blocks 2000
+"""
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import mixer
+
+def main():
+    args = sys.argv[1:]
+    blocks = 500
+    if "--blocks" in args:
+        i = args.index("--blocks")
+        blocks = int(args[i+1])
+        del args[i:i+2]
+    counts = [int(a) for a in args] or [1, 8, 24, mixer.MAX_VOICES]
+    rnd = np.random.default_rng(1)
+    names = ["a", "b", "c", "d"]
+    block_ms = mixer.BLOCK / mixer.RATE * 1000
+
+    print(f"block {mixer.BLOCK} samples = {block_ms:.1f} ms of audio")
+    print(f"{'voices':>7}  {'mix ms':>8}  {'% of block':>10}")
+    for n in counts:
+        m = mixer.Mixer()
+        for k, name in enumerate(names):
+            m.load(name, rnd.uniform(-0.5, 0.5, int(mixer.RATE * (0.4 + 0.27 * k))))
+        t0 = time.perf_counter()
+        for b in range(blocks):
+            while len(m.voices) < n:          # keep the voice count topped up
+                m.play(names[len(m.voices) % 4], rnd.random(), 0.5)
+            m.mix()
+        ms = (time.perf_counter() - t0) / blocks * 1000
+        print(f"{n:>7}  {ms:>8.3f}  {ms / block_ms * 100:>9.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Canvas vs framebuffer — per-frame draw cost at high firefly counts.
+
+The framebuffer column always runs (NumPy only). The canvas column needs a
+display; without one it is reported as n/a.
+
+    python bench/render.py                # 1k, 5k, 20k flies
+    python bench/render.py 200 2000 --frames 10
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+import game, raster, tkbatch
+
+def swarm(n, canvas):
+    random.seed(n)
+    return [game.Firefly(canvas) for _ in range(n)]
+
+def bench_raster(n, frames):
+    game.fireflies = swarm(n, game.canvas)
+    fb = raster.Framebuffer(game.CANVAS_W, game.HEIGHT)
+    raster.render(fb, game, 0.0)          # builds the static background
+    t0 = time.perf_counter()
+    for i in range(frames):
+        raster.render(fb, game, i * 0.028)
+        fb.to_ppm()
+    return (time.perf_counter() - t0) / frames * 1000
+
+def bench_canvas(n, frames, root):
+    import tkinter as tk
+    cv = tk.Canvas(root, width=game.CANVAS_W, height=game.HEIGHT)
+    cv.pack()
+    flies = swarm(n, cv)
+    game.batch = tkbatch.FrameBatch(root)
+    root.update()
+    t0 = time.perf_counter()
+    for i in range(frames):
+        for f in flies:
+            f.draw(i * 0.028)
+        game.batch.flush()
+        root.update_idletasks()
+    ms = (time.perf_counter() - t0) / frames * 1000
+    cv.destroy()
+    return ms
+
+def main():
+    args = sys.argv[1:]
+    frames = 10
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [1000, 5000, 20000]
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        root = None
+
+    print(f"{'flies':>8}  {'canvas ms':>10}  {'raster ms':>10}")
+    for n in sizes:
+        c = f"{bench_canvas(n, frames, root):>10.2f}" if root else f"{'n/a':>10}"
+        print(f"{n:>8}  {c}  {bench_raster(n, frames):>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Restart — time from "play again" to a playable first frame.
+
+Plays a run to its end screen with the autopilot, then restarts in place
+and plays again, several times over. Reports the restart() cost and the
+first frame after it against the 28 ms frame budget, plus each run's
+outcome, so a restart that leaks state shows up as a changed result.
+
+    python bench/restart.py               # 3 runs
+    python bench/restart.py --runs 10
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+sys.argv.append("--fresh")
+import game
+from autopilot import Autopilot, run_headless
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 3
+    random.seed(7)
+    print(f"{'run':>4}  {'outcome':>8}  {'score':>5}  {'frames':>6}  {'restart ms':>10}  {'to 1st frame ms':>15}")
+    for i in range(runs):
+        restart_ms = first_ms = 0.0
+        if i:
+            t0 = time.perf_counter()
+            game.restart()                # also runs the first frame (the loop had stopped)
+            first_ms = (time.perf_counter() - t0) * 1000
+            restart_ms = game.restart_ms
+        run_headless(game, Autopilot(game), 20000)
+        print(f"{i + 1:>4}  {game.outcome:>8}  {game.score:>5}  {game.frame:>6}  "
+              f"{restart_ms:>10.2f}  {first_ms:>15.2f}")
+        while game.looping: game.loop()   # let the end-screen effects finish
+    print(f"frame budget {game.profiler.budget_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
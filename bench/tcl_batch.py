@@ -0,0 +1,61 @@
+"""Tcl bridge traffic — per-call canvas updates vs one batched eval per frame.
+
+Draws the meadow's per-frame items (zones + fireflies) through DirectCalls
+(one tkinter call per coords/itemconfig, the old path) and through
+FrameBatch (one Tcl eval per frame), and reports Tcl calls and ms per
+frame for each. Both go into a bare Tcl interpreter whose canvas is a
+no-op proc, as in bench/lod.py, so no display is needed: the columns are
+the Python side, tkinter's option marshalling and Tcl parsing, which is
+what batching saves before Tk starts drawing.
+
+    python bench/tcl_batch.py              # 28, 500, 2000 flies
+    python bench/tcl_batch.py 100 5000 --frames 20
+"""
+import os, sys, time, random, tkinter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBERVEIL_HEADLESS"] = "1"
+import game, tkbatch
+
+class TclCanvas(tkinter.Canvas):
+    """tkinter's own Canvas methods, bound to the bare interpreter's `.c`."""
+    def __init__(self, tcl):
+        self.tk, self._w = tcl, ".c"
+
+def run(n, frames, cv, impl):
+    random.seed(n)
+    flies = [game.Firefly(game.canvas) for _ in range(n)]
+    zones = [game.Zone(game.canvas, z.x, z.y) for z in game.zones]
+    for o in flies + zones: o.canvas = cv      # made headless, drawn into Tcl
+    game.batch = impl
+    t0 = time.perf_counter()
+    for i in range(frames):
+        t = i * 0.028
+        for z in zones: z.draw(t)
+        for f in flies: f.draw(t)
+        impl.flush()
+    ms = (time.perf_counter() - t0) / frames * 1000
+    return impl.calls / frames, ms
+
+def main():
+    args = sys.argv[1:]
+    frames = 30
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [28, 500, 2000]
+
+    tcl = tkinter.Tcl()
+    tcl.eval("proc .c args {}")
+    cv = TclCanvas(tcl)
+
+    print(f"{'flies':>8}  {'direct calls':>12}  {'direct ms':>10}  {'batch calls':>11}  {'batch ms':>9}")
+    for n in sizes:
+        dc, dms = run(n, frames, cv, tkbatch.DirectCalls())
+        bc, bms = run(n, frames, cv, tkbatch.FrameBatch(SimpleNamespace(tk=tcl)))
+        print(f"{n:>8}  {dc:>12.0f}  {dms:>10.2f}  {bc:>11.0f}  {bms:>9.2f}")
+
+if __name__ == "__main__":
+    main()
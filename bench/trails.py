@@ -0,0 +1,56 @@
+"""Trails — ring-buffer cost per frame at each quality level.
+
+Times TrailBuffer.push + paths (the NumPy side) and the FrameBatch lines
+for one coords command per fly (formatted into a bare Tcl interpreter),
+for the drawn trail length at every profiler quality step. Buffer memory
+is fixed at N × K and reported once per swarm size.
+
+    python bench/trails.py                # 1k, 5k, 20k flies
+    python bench/trails.py 500 --frames 50
+"""
+import os, sys, time, tkinter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import tkbatch
+from profiler import QUALITY_STEPS
+from trails import TrailBuffer
+
+K = 10                      # game.TRAIL_LEN
+W, H = 840, 680
+
+def main():
+    args = sys.argv[1:]
+    frames = 20
+    if "--frames" in args:
+        i = args.index("--frames")
+        frames = int(args[i+1])
+        del args[i:i+2]
+    sizes = [int(a) for a in args] or [1000, 5000, 20000]
+
+    tcl = tkinter.Tcl()
+    tcl.eval("proc .c args {}")
+    canvas = SimpleNamespace(_w=".c")
+    rnd = np.random.default_rng(1)
+
+    print(f"{'flies':>7}  {'buffer':>8}  " +
+          "  ".join(f"{'q%.2f ms' % q:>9}" for q in QUALITY_STEPS) + "   (numpy + one coords/fly)")
+    for n in sizes:
+        buf = TrailBuffer(n, K)
+        xy = rnd.uniform(0, [W, H], (n, 2))
+        batch = tkbatch.FrameBatch(SimpleNamespace(tk=tcl))
+        cols = []
+        for q in QUALITY_STEPS:
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                xy += rnd.normal(0, 1.5, (n, 2))
+                buf.push(xy)
+                for i, path in enumerate(buf.paths(round(K * q))):
+                    batch.coords(canvas, i + 1, *path)
+                batch.flush()
+            cols.append((time.perf_counter() - t0) / frames * 1000)
+        print(f"{n:>7}  {buf.pos.nbytes / 1024:>6.0f}KB  " + "  ".join(f"{c:>9.2f}" for c in cols))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Camera — a window-wide view onto a meadow several screens wide.
+
+The camera is a horizontal offset only: `x` is the world x at the left
+edge of the view. follow() eases it toward a target and returns the whole
+pixels it moved, so the caller scrolls the canvas (one xview) and carries
+the screen-fixed items along (one move by tag). Everything else keeps
+world coordinates.
+
+sees() and visible() say what lies within `margin` px of the view. The
+game hides off-screen flies, hands off-screen impostors and particles
+back to their pools and skips animating zones it cannot see; static items
+(the backdrop, shadows, blooms) cost nothing, as Tk does not redraw what
+is out of view. Render cost follows the screen, not the size of the map.
+"""
+import math
+
+MARGIN = 40       # px past each edge still counted as in view
+EASE   = 0.1      # fraction of the remaining offset closed per frame
+
+class Camera:
+    def __init__(self, world_w, view_w, margin=MARGIN, ease=EASE):
+        self.world, self.view = world_w, view_w
+        self.margin, self.ease = margin, ease
+        self.x = 0
+
+    def jump(self, x):
+        """Put the left edge at x (clamped to the world); returns the px moved."""
+        x = int(round(min(self.world - self.view, max(0, x))))
+        dx, self.x = x - self.x, x
+        return dx
+
+    def follow(self, cx, dead=0.0):
+        """Ease toward centring world x `cx` once it is more than `dead` px
+        off centre; returns the px moved."""
+        off = cx - (self.x + self.view / 2)
+        if abs(off) <= dead: return 0
+        return self.jump(self.x + (off - math.copysign(dead, off)) * self.ease)
+
+    def sees(self, x, r=0.0):
+        return self.x - self.margin - r < x < self.x + self.view + self.margin + r
+
+    def visible(self, xs):
+        """Bool array: which of the world xs (a NumPy array) are in view."""
+        lo = self.x - self.margin
+        return (xs > lo) & (xs < lo + self.view + 2 * self.margin)
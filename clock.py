@@ -0,0 +1,64 @@
+"""Game clock — the one place a frame loop reads time from.
+
+tick() is called once at the top of every frame. It reads the monotonic
+source once, applies pause and time scale, and the rest of the frame reads
+clock.now instead of asking the OS again. In manual mode the source is
+never read at all: every tick advances a fixed step, so headless runs are
+deterministic and can be fast-forwarded with advance().
+
+The game still moves things per frame (fly velocities, particle life,
+combo timer). frames() converts the scale into how many of those
+simulation frames are due this tick: 1 at normal speed, 0 on every other
+tick at half speed, 0 while paused.
+"""
+import time
+
+FRAME_SECS = 0.028     # one frame of the 28 ms loop
+
+class GameClock:
+    def __init__(self, manual=False, step=FRAME_SECS, scale=1.0, source=time.monotonic):
+        self.manual = manual
+        self.step = step             # seconds per tick in manual mode
+        self.scale = scale
+        self.source = source
+        self.paused = False
+        self.now = 0.0               # game seconds since the run started
+        self.dt = 0.0                # game seconds covered by the last tick
+        self._last = source()
+        self._owed = 0.0             # fractional simulation frames carried over
+
+    def tick(self):
+        if self.manual:
+            dt = self.step
+        else:
+            t = self.source()
+            dt, self._last = t - self._last, t
+        self.dt = 0.0 if self.paused else dt * self.scale
+        self.now += self.dt
+        if not self.paused:
+            self._owed += self.scale
+        return self.now
+
+    def frames(self):
+        """Simulation frames due this tick (consumes them)."""
+        n = int(self._owed)
+        self._owed -= n
+        return n
+
+    def advance(self, secs):
+        """Jump game time forward (fast-forward in tests and tooling)."""
+        self.now += secs
+
+    def set(self, now):
+        self.now = now
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self._last = self.source()
+
+    def toggle_pause(self):
+        (self.resume if self.paused else self.pause)()
+        return self.paused
@@ -0,0 +1,75 @@
+"""Game events — the simulation says what happened, listeners decide what it means.
+
+Gameplay code only emit()s. Nothing runs at that point: the event is
+queued and delivered when the frame loop calls dispatch(), at one fixed
+place in the frame (after the simulation, before the canvas flush).
+Listeners registered with async_=True (audio) are instead handed to a
+single worker thread, so the frame never waits on them.
+
+Every listener is timed; report() lists calls, total and worst cost.
+"""
+import queue, threading, time
+from collections import namedtuple
+
+ZoneCharged    = namedtuple("ZoneCharged",    "x y index")
+StageComplete  = namedtuple("StageComplete",  "index title color reward")
+ShadowHit      = namedtuple("ShadowHit",      "x y hp")       # hp left after the hit
+ShadowCleansed = namedtuple("ShadowCleansed", "x y points")
+BloomPlanted   = namedtuple("BloomPlanted",   "x y color points")
+Victory        = namedtuple("Victory",        "score")
+Timeout        = namedtuple("Timeout",        "score")
+
+class EventBus:
+    def __init__(self):
+        self._listeners = {}         # event type -> [(name, fn, async_)]
+        self._pending = []
+        self._stats = {}             # name -> [calls, total_ms, worst_ms]
+        self._lock = threading.Lock()
+        self._q = None
+
+    def on(self, etype, fn, async_=False, name=None):
+        name = name or f"{etype.__name__}:{fn.__name__}"
+        self._listeners.setdefault(etype, []).append((name, fn, async_))
+        if async_ and self._q is None:
+            self._q = queue.Queue()
+            threading.Thread(target=self._worker, daemon=True).start()
+        return fn
+
+    def emit(self, ev):
+        self._pending.append(ev)
+
+    def dispatch(self):
+        """Deliver everything emitted since the last call, in order. Events
+        emitted by listeners are delivered in the same pass."""
+        pending = self._pending
+        i = 0
+        while i < len(pending):
+            ev = pending[i]
+            i += 1
+            for name, fn, async_ in self._listeners.get(type(ev), ()):
+                if async_: self._q.put((name, fn, ev))
+                else: self._call(name, fn, ev)
+        pending.clear()
+        return i
+
+    def _call(self, name, fn, ev):
+        t0 = time.perf_counter()
+        fn(ev)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            s = self._stats.get(name)
+            if s is None: s = self._stats[name] = [0, 0.0, 0.0]
+            s[0] += 1; s[1] += ms
+            if ms > s[2]: s[2] = ms
+
+    def _worker(self):
+        while True:
+            name, fn, ev = self._q.get()
+            try: self._call(name, fn, ev)
+            except Exception: pass        # a failed sound must not kill the worker
+
+    def report(self):
+        """(name, calls, total_ms, worst_ms), most expensive first."""
+        with self._lock:
+            rows = [(n, c, t, w) for n, (c, t, w) in self._stats.items()]
+        return sorted(rows, key=lambda r: -r[2])
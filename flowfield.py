@@ -0,0 +1,162 @@
+"""Flow fields — precomputed steering toward a goal, around shadow patches.
+
+NavGrid lays a coarse grid over the meadow. Shadows make cells expensive:
+a little inside their glow, steeply inside their core (finite, so a fly
+caught inside is still steered out). For a goal set — one or more
+discs, e.g. every uncharged zone — a Dijkstra pass from the goal cells
+gives each cell its path distance to the nearest goal, and each cell
+stores a unit vector down that distance surface. Steering a fly is then
+one lookup into FlowField.vec.
+
+Fields are cached per goal set. Removing a shadow only lowers costs, so
+every cached field is repaired with a decrease-only Dijkstra seeded from
+the freed cells instead of being rebuilt.
+"""
+import heapq, math
+import numpy as np
+
+CELL       = 20          # px per nav cell
+HALO_COST  = 4.0         # cost multiplier inside a shadow's glow
+CORE_COST  = 40.0        # ... and inside its core
+HALO       = 1.7         # glow radius / core radius (matches DarkSpot)
+MARGIN     = 6           # px added to a core so flies clear its edge
+
+INF = float("inf")
+_DIRS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+class FlowField:
+    def __init__(self, grid, goals):
+        self.grid = grid
+        self.goals = goals
+        self.cell, self.gw, self.gh = grid.cell, grid.gw, grid.gh
+        self.dist = [INF] * (grid.gw * grid.gh)
+        self.vec = [(0.0, 0.0)] * (grid.gw * grid.gh)
+        seeds = grid.cells_in(goals)
+        for i in seeds:
+            self.dist[i] = 0.0
+        self._relax([(0.0, i) for i in seeds])
+        self._directions()
+
+    def at(self, x, y):
+        return self.vec[self.grid.index(x, y)]
+
+    def _relax(self, heap):
+        """Decrease-only Dijkstra from the entries in `heap`."""
+        dist, cost, nbrs = self.dist, self.grid.cost, self.grid.nbrs
+        heapq.heapify(heap)
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]: continue
+            ci = cost[i]
+            for j, step in nbrs[i]:
+                nd = d + step * (ci + cost[j]) * 0.5
+                if nd < dist[j]:
+                    dist[j] = nd
+                    heapq.heappush(heap, (nd, j))
+
+    def repair(self, freed):
+        """Costs dropped on `freed` cells: pull their distances down and relax."""
+        dist, cost, nbrs = self.dist, self.grid.cost, self.grid.nbrs
+        heap = []
+        for j in freed:
+            cj = cost[j]
+            best = dist[j]
+            for i, step in nbrs[j]:
+                if dist[i] < INF:
+                    nd = dist[i] + step * (cost[i] + cj) * 0.5
+                    if nd < best: best = nd
+            if best < dist[j]:
+                dist[j] = best
+                heap.append((best, j))
+        self._relax(heap)
+        self._directions()
+
+    def _directions(self):
+        """Per cell, the drop-weighted sum of unit vectors to lower neighbours."""
+        gw, gh = self.gw, self.gh
+        d = np.array(self.dist, np.float64).reshape(gh, gw)
+        finite = np.isfinite(d)
+        big = (d[finite].max() if finite.any() else 0.0) + 1e3
+        d = np.where(finite, d, big)
+        p = np.pad(d, 1, constant_values=big + 1e3)
+        vx = np.zeros_like(d); vy = np.zeros_like(d)
+        for ox, oy in _DIRS:
+            drop = np.maximum(0.0, d - p[1+oy:1+oy+gh, 1+ox:1+ox+gw]) / math.hypot(ox, oy)
+            vx += drop * ox; vy += drop * oy
+        n = np.hypot(vx, vy)
+        n[n == 0] = 1
+        self.vec = list(zip((vx / n).ravel().tolist(), (vy / n).ravel().tolist()))
+
+class NavGrid:
+    def __init__(self, w, h, cell=CELL):
+        self.cell = cell
+        self.gw, self.gh = -(-w // cell), -(-h // cell)
+        n = self.gw * self.gh
+        self.cost = [1.0] * n
+        self.nbrs = []
+        for i in range(n):
+            x, y = i % self.gw, i // self.gw
+            self.nbrs.append([((y+oy) * self.gw + x+ox, math.hypot(ox, oy)) for ox, oy in _DIRS
+                              if 0 <= x+ox < self.gw and 0 <= y+oy < self.gh])
+        self.obstacles = {}            # (x, y) -> core radius
+        self._fields = {}
+
+    def index(self, x, y):
+        ix = min(self.gw - 1, max(0, int(x) // self.cell))
+        iy = min(self.gh - 1, max(0, int(y) // self.cell))
+        return iy * self.gw + ix
+
+    def cells_in(self, discs):
+        out = []
+        for (x, y, r) in discs:
+            out.extend(self._disc(x, y, r))
+        return out
+
+    def _disc(self, x, y, r):
+        c = self.cell
+        for iy in range(max(0, int((y - r) // c)), min(self.gh, int((y + r) // c) + 1)):
+            for ix in range(max(0, int((x - r) // c)), min(self.gw, int((x + r) // c) + 1)):
+                if math.hypot((ix + 0.5) * c - x, (iy + 0.5) * c - y) <= r:
+                    yield iy * self.gw + ix
+
+    def _cost_at(self, i):
+        c = self.cell
+        px, py = (i % self.gw + 0.5) * c, (i // self.gw + 0.5) * c
+        cost = 1.0
+        for (x, y), r in self.obstacles.items():
+            d = math.hypot(px - x, py - y)
+            if d <= r + MARGIN: return CORE_COST
+            if d <= r * HALO: cost = HALO_COST
+        return cost
+
+    # ── obstacles ──────────────────────────────
+    def set_obstacles(self, circles):
+        """Replace every shadow at once (spawn / restore); drops cached fields."""
+        self.obstacles = {(x, y): r for (x, y, r) in circles}
+        self.cost = [1.0] * len(self.cost)
+        for (x, y), r in self.obstacles.items():
+            for i in self._disc(x, y, r * HALO):
+                self.cost[i] = self._cost_at(i)
+        self._fields.clear()
+
+    def remove_obstacle(self, x, y):
+        """A shadow was cleansed: lower its cells' costs and repair every field."""
+        r = self.obstacles.pop((x, y), None)
+        if r is None: return
+        freed = []
+        for i in self._disc(x, y, r * HALO):
+            new = self._cost_at(i)
+            if new < self.cost[i]:
+                self.cost[i] = new
+                freed.append(i)
+        for f in self._fields.values():
+            f.repair(freed)
+
+    # ── fields ─────────────────────────────────
+    def field(self, goals):
+        """Cached FlowField toward the nearest of `goals` ((x, y, r) discs)."""
+        key = tuple(goals)
+        f = self._fields.get(key)
+        if f is None:
+            f = self._fields[key] = FlowField(self, key)
+        return f
@@ -0,0 +1,134 @@
+"""Fog — tileable fractal noise, baked once, drawn as a few scrolling images.
+
+Each layer is a horizontal band of fBm value noise (tileable across X)
+turned into alpha with soft top and bottom edges, and baked into FADES
+RGBA PNGs at rising opacity. The PNGs are cached under ~/.emberveil/fog,
+so later launches only read files (and need no NumPy). A band is TILE px
+wider than the view; scrolling is one coords() per layer, wrapping by a
+whole tile, and crossfading steps the layer between its baked opacities
+(an itemconfig only when the step changes). Layers fade in and out of
+phase, so the visible texture keeps changing. The per-frame cost is the
+same however dense the fog looks.
+"""
+import math, os, struct, zlib
+
+try:
+    import numpy as np
+except ImportError:                 # menu without NumPy: cached textures only
+    np = None
+
+TILE      = 256                     # noise period in px
+OCTAVES   = 4
+FADES     = 4                       # baked opacity steps per layer
+VERSION   = 1                       # bump to invalidate cached textures
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".emberveil", "fog")
+
+# (seed, drift px/s, peak alpha 0..1, band top as a fraction of the band, fade period s)
+LAYERS = ((11,  7.0, 0.50, 0.00, 23.0),
+          (23, -4.5, 0.40, 0.25, 31.0),
+          (37, 11.0, 0.30, 0.45, 17.0))
+
+def noise(h, w, seed, octaves=OCTAVES, base=4):
+    """(h, w) float32 in 0..1; wraps seamlessly every TILE px in both axes."""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((TILE, TILE), np.float32)
+    amp = 1.0
+    for o in range(octaves):
+        n = base << o                         # lattice cells per tile
+        lat = rng.random((n, n), dtype=np.float32)
+        p = np.arange(TILE, dtype=np.float32) * (n / TILE)
+        i0 = p.astype(np.intp)
+        f = p - i0
+        f = f * f * (3 - 2 * f)               # smoothstep between lattice points
+        i1 = (i0 + 1) % n                     # the wrap that makes it tile
+        rows = lat[i0] * (1 - f)[:, None] + lat[i1] * f[:, None]
+        out += amp * (rows[:, i0] * (1 - f) + rows[:, i1] * f)
+        amp *= 0.5
+    out = (out - out.min()) / (out.max() - out.min())   # stretch to the full 0..1
+    reps = (-(-h // TILE), -(-w // TILE))
+    return np.tile(out, reps)[:h, :w]
+
+def band(w, h, seed, rgb, alpha, cover=0.35):
+    """FADES RGBA uint8 images (h, w + TILE, 4), faintest first."""
+    n = noise(h, w + TILE, seed)
+    dens = np.clip((n - cover) / (1 - cover), 0, 1) ** 1.3
+    y = np.linspace(0, 1, h, dtype=np.float32)
+    dens *= (np.clip(np.sin(np.pi * y), 0, 1) ** 1.5)[:, None]           # soft top and bottom edges
+    img = np.empty((h, w + TILE, 4), np.uint8)
+    img[..., :3] = rgb
+    out = []
+    for k in range(1, FADES + 1):
+        img[..., 3] = dens * (255 * alpha * k / FADES)
+        out.append(img.copy())
+    return out
+
+def png(img, level=6):
+    h, w = img.shape[:2]
+    raw = np.zeros((h, w * 4 + 1), np.uint8)             # filter byte 0 per row
+    raw[:, 1:] = img.reshape(h, -1)
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data +
+                struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+    return (b"\x89PNG\r\n\x1a\n" +
+            chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)) +
+            chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) +
+            chunk(b"IEND", b""))
+
+def textures(w, h, seed, rgb, alpha):
+    """PNG bytes for one layer's FADES opacities: from the cache, else baked
+    (and cached if the directory is writable). None without NumPy or cache."""
+    tag = f"v{VERSION}-{w}x{h}-s{seed}-{'%02x%02x%02x' % rgb}-a{int(alpha * 100)}"
+    paths = [os.path.join(CACHE_DIR, f"fog-{tag}-{k}.png") for k in range(FADES)]
+    try:
+        out = []
+        for p in paths:
+            with open(p, "rb") as fh: out.append(fh.read())
+        return out
+    except OSError:
+        pass
+    if np is None: return None
+    out = [png(img) for img in band(w, h, seed, rgb, alpha)]
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for p, data in zip(paths, out):
+            tmp = p + ".tmp"
+            with open(tmp, "wb") as fh: fh.write(data)
+            os.replace(tmp, p)
+    except OSError:
+        pass
+    return out
+
+class Fog:
+    """The LAYERS bands over y0..y1 of a canvas `w` px wide. The image items
+    are created at once (so they stack where the caller builds them) with
+    `tags`; the textures arrive through load()."""
+    def __init__(self, canvas, w, y0, y1, rgb, photo, layers=LAYERS, tags=()):
+        self.canvas, self.w, self.h, self.rgb, self.photo = canvas, w, int(y1 - y0), rgb, photo
+        self.layers = []      # [item, photos, y, speed, period, phase, step, seed, alpha]
+        for i, (seed, speed, alpha, top, period) in enumerate(layers):
+            y = y0 + top * self.h * 0.5
+            item = canvas.create_image(0, y, anchor="nw", tags=tags)
+            self.layers.append([item, None, y, speed, period, i * 2.1, -1, seed, alpha])
+
+    def __bool__(self):
+        return any(L[1] for L in self.layers)
+
+    def load(self):
+        """Generator: read or bake one layer per step (one idle-time job chunk)."""
+        for L in self.layers:
+            data = textures(self.w, self.h, L[7], self.rgb, L[8])
+            if data is not None:
+                L[1] = [self.photo(data=d, format="png") for d in data]
+            yield
+
+    def update(self, t, batch, x0=0):
+        """x0: canvas x of the view's left edge, for a scrolled canvas."""
+        canvas = self.canvas
+        for L in self.layers:
+            item, photos, y, speed, period, phase, step = L[:7]
+            if not photos: continue
+            batch.coords(canvas, item, x0 - (t * speed) % TILE, y)
+            k = round((0.5 + 0.5 * math.sin(t * math.tau / period + phase)) * (FADES - 1))
+            if k != step:
+                L[6] = k
+                batch.itemconfig(canvas, item, image=photos[k])
@@ -1,11 +1,40 @@
 import tkinter as tk
 from tkinter import font as tkfont
-import random, math, time, os, wave, struct, threading, subprocess, sys, tempfile
+import random, math, time, os, wave, struct, threading, subprocess, sys, tempfile, json
 import numpy as np
+from itertools import chain
+from operator import attrgetter
+import snapshot
+from history import RunHistory
+import raster
+import spectator
+import tkbatch
+import lightfield
+import flowfield
+import lod
+import fog
+import camera
+from trails import TrailBuffer
+from clock import GameClock
+from timers import TimerQueue
+from stages import StageEngine, flag, at_least, exactly
+import events
+from profiler import FrameProfiler
+from systems import Scheduler
+from gctune import GcPolicy
+from mixer import Mixer
+from jobs import JobQueue, LOW
 
 SAMPLE_RATE = 44100
 TMP_DIR = tempfile.mkdtemp()
 
+# Headless runs (benchmarks, tooling) get no window and no audio
+HEADLESS = "--headless" in sys.argv or os.environ.get("EMBERVEIL_HEADLESS") == "1"
+MIXER    = "--no-mixer" not in sys.argv   # stereo stream; off: one player process per sound
+SFX_FALLOFF = 480          # px from the cursor at which an effect is at half volume (None: off)
+mixer = Mixer(SAMPLE_RATE)
+jobs  = JobQueue()        # idle-time work, drained in frame slack by loop()
+
 def _write_wav(path, samples):
     samples = np.clip(samples, -1, 1)
     data = (samples * 32767).astype(np.int16)
@@ -15,6 +44,12 @@ def _write_wav(path, samples):
         wf.setframerate(SAMPLE_RATE)
         wf.writeframes(data.tobytes())
 
+def _store(name, samples):
+    """An effect: the samples for the mixer now, the wav for the file player when idle."""
+    mixer.load(name, np.clip(samples, -1, 1))
+    jobs.submit(lambda: _write_wav(os.path.join(TMP_DIR, f"{name}.wav"), samples),
+                LOW, key=f"wav:{name}")
+
 def _sine(freq, dur, amp=0.5, sr=SAMPLE_RATE):
     t = np.linspace(0, dur, int(sr * dur), endpoint=False)
     return amp * np.sin(2 * np.pi * freq * t)
@@ -63,7 +98,7 @@ def gen_sparkle():
     freq = random.choice([880, 1046, 1318, 1568])
     sig = _mix(_sine(freq, dur, 0.6), _sine(freq * 2, dur, 0.2))
     sig = _envelope(sig, attack=0.005, release=0.35)
-    _write_wav(os.path.join(TMP_DIR, "sparkle.wav"), sig)
+    _store("sparkle", sig)
 
 def gen_zone_charge():
     """Ascending arpeggio when a zone charges."""
@@ -74,7 +109,7 @@ def gen_zone_charge():
         s = _envelope(s, 0.01, 0.07)
         chunks.append(s)
     sig = np.concatenate(chunks)
-    _write_wav(os.path.join(TMP_DIR, "zone_charge.wav"), sig)
+    _store("zone_charge", sig)
 
 def gen_flower():
     """Soft bloom: descending bell."""
@@ -87,7 +122,7 @@ def gen_flower():
     fade[half:] = np.linspace(1, 0, len(s2) - half)
     sig = s1 + s2 * fade
     sig = _envelope(sig, 0.005, 0.4)
-    _write_wav(os.path.join(TMP_DIR, "flower.wav"), sig)
+    _store("flower", sig)
 
 def gen_cleanse():
     """Dark-to-light sweep."""
@@ -96,7 +131,7 @@ def gen_cleanse():
     freq_sweep = np.linspace(200, 900, len(t))
     sig = 0.5 * np.sin(2 * np.pi * np.cumsum(freq_sweep) / SAMPLE_RATE)
     sig = _envelope(sig, 0.01, 0.3)
-    _write_wav(os.path.join(TMP_DIR, "cleanse.wav"), sig)
+    _store("cleanse", sig)
 
 def gen_stage_complete():
     """Triumphant chord hit."""
@@ -107,7 +142,7 @@ def gen_stage_complete():
         s = _sine(f, dur, 0.3)
         s = _envelope(s, 0.01, 0.6)
         sig += s
-    _write_wav(os.path.join(TMP_DIR, "stage_done.wav"), sig * 0.7)
+    _store("stage_done", sig * 0.7)
 
 def gen_victory():
     """Full harmony fanfare."""
@@ -119,23 +154,26 @@ def gen_victory():
         sig = np.concatenate([sig, chunk])
     pad = _sine(262, len(sig)/SAMPLE_RATE, 0.2)
     sig = sig + pad[:len(sig)]
-    _write_wav(os.path.join(TMP_DIR, "victory.wav"), sig)
+    _store("victory", sig)
 
 def gen_timeout():
     """Sad descending tone."""
     notes = [523, 440, 370, 294]
     chunks = [_envelope(_sine(n, 0.3, 0.4), 0.01, 0.2) for n in notes]
-    _write_wav(os.path.join(TMP_DIR, "timeout.wav"), np.concatenate(chunks))
+    _store("timeout", np.concatenate(chunks))
 
 # Pre-generate all sounds
-print("Generating audio assets…")
-gen_ambient(); gen_zone_charge(); gen_flower()
-gen_cleanse(); gen_stage_complete(); gen_victory(); gen_timeout()
-gen_sparkle()
-print("Audio ready.")
+if not HEADLESS:
+    print("Generating audio assets…")
+    gen_ambient()                 # the loop starts at once; the effects fill the first frames' slack
+    for _gen in (gen_zone_charge, gen_flower, gen_cleanse, gen_stage_complete,
+                 gen_victory, gen_timeout, gen_sparkle):
+        jobs.submit(_gen, name=_gen.__name__)
+    if MIXER: mixer.start()
 
 # ── Playback ──────────────────────────────────
 _ambient_proc = None
+_ambient_thread = None
 _sfx_lock = threading.Lock()
 
 def _play_file(path, loop=False):
@@ -156,7 +194,8 @@ def _play_file(path, loop=False):
         return None
 
 def start_ambient():
-    global _ambient_proc
+    global _ambient_proc, _ambient_thread
+    if HEADLESS or (_ambient_thread and _ambient_thread.is_alive()): return
     def _loop():
         global _ambient_proc
         while not game_over:
@@ -165,13 +204,27 @@ def start_ambient():
                 _ambient_proc.wait()
             else:
                 time.sleep(12)
-    t = threading.Thread(target=_loop, daemon=True)
-    t.start()
-
-def play_sfx(name):
+    _ambient_thread = threading.Thread(target=_loop, daemon=True)
+    _ambient_thread.start()
+
+def sfx_gain(x, y):
+    """Distance attenuation from the cursor (1.0 with no cursor)."""
+    if SFX_FALLOFF is None or not mouse_pos: return 1.0
+    return 1.0 / (1.0 + math.hypot(x - mouse_pos[0], y - mouse_pos[1]) / SFX_FALLOFF)
+
+def play_sfx(name, x=None, y=None, origin=None):
+    """Panned by x across the view when the mixer stream is up. `origin`
+    (profiler.input_event) traces input-to-sound latency."""
+    if HEADLESS: return
+    issued = None if origin is None else (lambda: profiler.sound_issued(origin))
+    if mixer.ok:
+        if x is None: x, y = cam.x + CANVAS_W / 2, HEIGHT / 2
+        mixer.play(name, (x - cam.x) / CANVAS_W, sfx_gain(x, y), issued)
+        return
     def _go():
         with _sfx_lock:
             _play_file(os.path.join(TMP_DIR, f"{name}.wav"))
+        if issued: issued()
     threading.Thread(target=_go, daemon=True).start()
 
 WIDTH, HEIGHT   = 1100, 680
@@ -179,6 +232,100 @@ PANEL_W         = 260          # right-side task panel
 CANVAS_W        = WIDTH - PANEL_W
 TIME_LIMIT      = 360
 
+# Balance knobs — balance.py overrides these per parameter set
+# (the STAGES hints quote the goals; keep them in step when changing these)
+ZONE_CHARGE_RATE = 0.004       # charge per fly inside a zone, per frame
+ZONE_DECAY       = 0.0008      # charge lost per frame with no fly inside
+HEART_GOAL       = 8           # flies in the Heart to finish task 2
+BLOOM_GOAL       = 5           # Emberblooms for task 3
+HARMONY_GOAL     = 15          # flies in the Heart for the ritual
+DARK_HP          = 3           # clicks to cleanse a shadow
+
+# Flocking (boids) — off by default, toggle with F or launch with --flock
+FLOCKING        = "--flock" in sys.argv
+FLOCK_CELL      = 40           # neighbour grid cell size (px)
+FLOCK_NEIGHBORS = 7            # max neighbours considered per fly
+FLOCK_SCAN      = 24           # max candidates inspected per fly
+FLOCK_SEP_R     = 14           # separation radius (px)
+
+# Level of detail — a crowded cell draws as one glow impostor instead of
+# every fly in it (canvas backend); off with --no-lod
+LOD             = "--no-lod" not in sys.argv
+LOD_POOL        = 24           # impostor glows preallocated; grows if a run needs more
+
+# Trails — each fly's last TRAIL_LEN positions drawn as one smoothed line;
+# drawn length follows the profiler's quality level; off with --no-trails
+TRAILS          = "--no-trails" not in sys.argv
+TRAIL_LEN       = 10           # positions kept per fly
+C_TRAIL         = "#3A2E06"
+
+# Ground fog — cached noise bands scrolled over the lower meadow; off with --no-fog
+FOG             = "--no-fog" not in sys.argv
+C_FOG           = (28, 52, 66)
+
+# Navigation assist — with no cursor held, flies follow a flow field toward
+# the current goal around the shadows; toggle with N or launch with --nav
+NAV             = "--nav" in sys.argv
+NAV_PULL        = 0.06         # steering per frame (the cursor pull is 0.09)
+
+# Garbage collection — the profiler always records pauses; with --gc-hold,
+# start-up objects are frozen and full collections wait for a transition,
+# a pause or a frame's leftover budget instead of landing mid-stage
+GC_HOLD         = "--gc-hold" in sys.argv
+
+# Batch simulation (balance.py) — rules only: no drawing, no light field
+SIM_ONLY        = os.environ.get("EMBERVEIL_SIM_ONLY") == "1"
+
+# Render backend — canvas items by default, NumPy framebuffer with --raster
+RASTER          = "--raster" in sys.argv and not SIM_ONLY
+SCENE_STATE     = "hidden" if RASTER else "normal"   # for items made mid-run
+CANVAS_DRAW     = not (RASTER or SIM_ONLY)
+
+# Scrolling world — --world[=N]: the meadow is N screens wide (default 3) and
+# the camera follows the cursor or the swarm; only what is in view is drawn.
+# One screen with --raster (the framebuffer is the window)
+WORLD_SCREENS   = 1 if RASTER else next((int(a.partition("=")[2] or 3)
+                        for a in sys.argv if a.startswith("--world")), 1)
+WORLD_W         = CANVAS_W * WORLD_SCREENS
+START_X         = (WORLD_W - CANVAS_W) // 2      # the camera opens on the Heart
+CAM_EDGE        = 120          # px from a side where the cursor pans the view
+
+# Per-frame canvas updates go to Tcl as one batched eval; --no-batch calls through
+TCL_BATCH       = "--no-batch" not in sys.argv
+
+# Game time — one monotonic read per frame; headless runs step a fixed
+# 28 ms per frame instead, so they are deterministic and can fast-forward
+SLOWMO          = 0.35         # time scale while slow motion is on (S)
+
+# Light field — flies, zones, the Heart and blooms push back the shadows'
+# darkness on a coarse grid drawn as one overlay; off with --no-light
+# (and in a scrolling world: the overlay is one screen)
+LIGHTFIELD      = "--no-light" not in sys.argv and not SIM_ONLY and WORLD_SCREENS == 1
+LIGHT_EVERY     = 2            # frames between overlay uploads (canvas backend)
+LIGHT_UPSAMPLE  = 3            # overlay PNG is field × 3, zoomed up by Tk
+FLY_LIGHT       = 0.12         # per fly per frame
+ZONE_LIGHT      = 0.07         # per cell at full charge
+HEART_LIGHT     = 0.08         # per cell once every task is done
+BLOOM_LIGHT     = 0.08
+DARK_EMIT       = 0.09         # darkness per cell around a shadow
+
+# Spectator stream — --spectate[=tcp:HOST:PORT | unix:PATH]
+SPECTATE        = next((a.partition("=")[2] or spectator.DEFAULT_ADDR
+                        for a in sys.argv if a.startswith("--spectate")), None)
+
+# Save / resume — written off the frame loop, ignored with --fresh
+SAVE_PATH       = os.path.join(os.path.expanduser("~"), ".emberveil", "meadow.sav")
+AUTOSAVE_FRAMES = 180          # ~5 s at 35 fps
+SAVE_CHUNK      = 8192         # flies copied per idle-time chunk of an autosave (~3 ms)
+HISTORY_PATH    = os.path.join(os.path.expanduser("~"), ".emberveil", "history.db")
+METRICS_PATH    = os.path.join(os.path.expanduser("~"), ".emberveil", "metrics.log")  # JSON line per run
+
+# Preallocated entity pools — nothing is created on the canvas mid-run
+DARK_COUNT      = 5
+BLOOM_POOL      = 12           # grows past this if the player keeps planting
+PARTICLE_POOL   = 360          # particles past this are simulated but not drawn
+WARMUP_FRAMES   = 3            # frames the end screens are drawn under the sky
+
 # Night palette
 BG_SKY   = "#030C18"
 BG_MID   = "#06121F"
@@ -198,6 +345,8 @@ C_ACCENT = "#FFD166"
 C_TEXT   = "#8BB8D8"
 C_WHITE  = "#E8F4FF"
 
+MOON_X, MOON_Y, MOON_R = CANVAS_W-95, 85, 38
+
 # Task definitions
 STAGES = [
     {
@@ -205,40 +354,52 @@ STAGES = [
         "icon": "◈",
         "color": "#3A86FF",
         "hint": "Attract fireflies into the\nglowing blue rings. Hold\nthem inside to charge.",
-        "steps": ["Zone 1 charged", "Zone 2 charged", "Zone 3 charged"],
+        "goals": [flag("zone:0", "Zone 1 charged"),
+                  flag("zone:1", "Zone 2 charged"),
+                  flag("zone:2", "Zone 3 charged")],
         "reward": 30,
+        "flock": {"sep": 0.6, "ali": 0.05, "coh": 0.0015},
     },
     {
         "title": "Awaken the Heart",
         "icon": "✦",
         "color": "#00FFAA",
         "hint": "Guide 8+ fireflies into the\nHeart circle at the center\nof the meadow.",
-        "steps": ["Gather 8 fireflies at Heart"],
+        "goals": [at_least("heart", "HEART_GOAL", "Gather {n} fireflies at Heart",
+                           status="Heart  {v} / {n}")],
+        "then": ["spawn_dark"],
         "reward": 40,
+        "flock": {"sep": 0.6, "ali": 0.05, "coh": 0.0025},
     },
     {
         "title": "Bloom Emberblooms",
         "icon": "❀",
         "color": "#FF6B9D",
         "hint": "Right-click anywhere to\nplant emberblooms and\nrestore color. Plant 5.",
-        "steps": ["Plant 5 emberblooms"],
+        "goals": [at_least("flowers", "BLOOM_GOAL", "Plant {n} emberblooms",
+                           status="Emberblooms: {v} / {n}")],
         "reward": 30,
+        "flock": {"sep": 0.8, "ali": 0.03, "coh": 0.0010},
     },
     {
         "title": "Cleanse the Shadows",
         "icon": "☽",
         "color": "#C77DFF",
         "hint": "Left-click shadow patches\nto purify them. Some need\nmultiple clicks.",
-        "steps": ["Destroy all 5 shadow patches"],
+        "goals": [exactly("shadows", 0, "Destroy all 5 shadow patches",
+                          status="Shadows left: {v}")],
         "reward": 50,
+        "flock": {"sep": 0.7, "ali": 0.06, "coh": 0.0015},
     },
     {
         "title": "Harmony Ritual",
         "icon": "⊕",
         "color": "#FFD166",
         "hint": "Final task — summon\n15 fireflies into the Heart\nfor the Harmony Ritual.",
-        "steps": ["Summon 15 fireflies to Heart"],
+        "goals": [at_least("heart", "HARMONY_GOAL", "Summon {n} fireflies to Heart",
+                           status="Heart  {v} / {n}")],
         "reward": 100,
+        "flock": {"sep": 0.4, "ali": 0.08, "coh": 0.0050},
     },
 ]
 
@@ -251,13 +412,29 @@ particles    = []
 score        = 0
 combo        = 0
 combo_timer  = 0
+combo_peak   = 0
+stage_times  = []            # seconds spent on each completed stage
 game_over    = False
-start_time   = time.time()
+outcome      = None          # "victory" / "timeout" once the run ends
+clock        = GameClock(manual=HEADLESS)
+bus          = events.EventBus()
+event_counts = {}            # event name -> times emitted (telemetry)
+gcpolicy     = GcPolicy()
+timers       = TimerQueue(clock)   # delayed effects, in game time; ticked by step()
 frame        = 0
+looping      = False         # a loop() callback is scheduled
+restart_ms   = 0.0           # cost of the last in-place restart
+swarm_pos    = None          # (N, 2) fly positions, this frame
 mouse_pos    = None
-step_done    = [False] * 3   # per-stage step completion
 stars_data   = []
-pid_pool     = []
+treeline     = []            # silhouette top edge, flat [x0, y0, x1, y1, ...]
+pid_pool     = []            # preallocated particle ovals
+particles_shown = 0
+impostor_pool = []           # cluster glows (LOD)
+impostors_shown = 0
+dark_pool    = []            # every DarkSpot, active or not
+bloom_pool   = []            # spare 7-item bloom groups
+bloom_items  = []            # groups in use, parallel to flowers
 sparkle_gen  = 0
 
 def lerp_color(c1, c2, t):
@@ -270,6 +447,7 @@ def lerp_color(c1, c2, t):
 def dist(x1,y1,x2,y2): return math.hypot(x1-x2, y1-y2)
 
 def burst(x, y, color, n=14, spread=4):
+    if publisher: publisher.burst(x, y, color, n, spread)
     for _ in range(n):
         ang = random.uniform(0, math.tau)
         spd = random.uniform(1, spread)
@@ -293,21 +471,33 @@ class Particle:
 class Firefly:
     def __init__(self, canvas):
         self.canvas = canvas
-        self.x = random.uniform(60, CANVAS_W-60)
+        self.scatter()
+        self.trail = canvas.create_line(0,0,0,0, fill=C_TRAIL, width=1.5, smooth=True,
+                                        capstyle="round", state=SCENE_STATE if TRAILS else "hidden")
+        self.glow = canvas.create_oval(0,0,1,1, fill="#332200", outline="", state=SCENE_STATE)
+        self.body = canvas.create_oval(0,0,1,1, fill=C_FLY, outline="", state=SCENE_STATE)
+        self.hidden = False          # drawn by a cluster impostor instead (LOD)
+
+    def scatter(self):
+        self.x = START_X + random.uniform(60, CANVAS_W-60)
         self.y = random.uniform(60, HEIGHT-60)
         self.r = random.uniform(3, 5)
         self.dx = random.uniform(-0.6, 0.6)
         self.dy = random.uniform(-0.6, 0.6)
         self.phase = random.uniform(0, math.tau)
         self.spd = random.uniform(0.7, 1.3)
-        self.glow = canvas.create_oval(0,0,1,1, fill="#332200", outline="")
-        self.body = canvas.create_oval(0,0,1,1, fill=C_FLY, outline="")
 
-    def move(self, target=None):
-        if target and target[0] < CANVAS_W:
+    def move(self, target=None, flow=None):
+        if target and target[0] < WORLD_W:
             ang = math.atan2(target[1]-self.y, target[0]-self.x)
             self.dx += math.cos(ang) * 0.09 * self.spd
             self.dy += math.sin(ang) * 0.09 * self.spd
+        elif flow:
+            c, gw = flow.cell, flow.gw
+            vx, vy = flow.vec[min(flow.gh-1, max(0, int(self.y) // c)) * gw
+                              + min(gw-1, max(0, int(self.x) // c))]
+            self.dx += vx * NAV_PULL * self.spd
+            self.dy += vy * NAV_PULL * self.spd
         self.dx += random.uniform(-0.04, 0.04)
         self.dy += random.uniform(-0.04, 0.04)
         spd = math.hypot(self.dx, self.dy)
@@ -315,10 +505,25 @@ class Firefly:
         self.x += self.dx; self.y += self.dy
         self.dx *= 0.96; self.dy *= 0.96
         if self.x < 50:  self.dx += 0.15
-        if self.x > CANVAS_W-50: self.dx -= 0.15
+        if self.x > WORLD_W-50: self.dx -= 0.15
         if self.y < 50:  self.dy += 0.15
         if self.y > HEIGHT-50: self.dy -= 0.15
 
+    def flock(self, near, w):
+        """Separation / alignment / cohesion against a bounded neighbour list."""
+        n = len(near)
+        if n == 0: return
+        ax = ay = cx = cy = sx = sy = 0.0
+        for o in near:
+            ax += o.dx; ay += o.dy
+            cx += o.x;  cy += o.y
+            ox, oy = self.x - o.x, self.y - o.y
+            d2 = ox*ox + oy*oy
+            if 0 < d2 < FLOCK_SEP_R * FLOCK_SEP_R:
+                sx += ox / d2; sy += oy / d2
+        self.dx += (ax/n - self.dx) * w["ali"] + (cx/n - self.x) * w["coh"] + sx * w["sep"]
+        self.dy += (ay/n - self.dy) * w["ali"] + (cy/n - self.y) * w["coh"] + sy * w["sep"]
+
     def draw(self, t):
         v = 0.65 + 0.35 * math.sin(t * 3.2 + self.phase)
         ri, gi = int(255*v), int(245*v)
@@ -328,17 +533,54 @@ class Firefly:
         gr, gg = int(100*gv), int(80*gv)
         gcol = f"#{gr:02x}{gg:02x}00"
         gr2 = self.r * 3.8
-        self.canvas.coords(self.glow,
+        batch.coords(self.canvas, self.glow,
             self.x-gr2, self.y-gr2, self.x+gr2, self.y+gr2)
-        self.canvas.itemconfig(self.glow, fill=gcol)
-        self.canvas.coords(self.body,
+        batch.itemconfig(self.canvas, self.glow, fill=gcol)
+        batch.coords(self.canvas, self.body,
             self.x-self.r, self.y-self.r,
             self.x+self.r, self.y+self.r)
-        self.canvas.itemconfig(self.body, fill=col)
+        batch.itemconfig(self.canvas, self.body, fill=col)
+
+class SpatialGrid:
+    """Uniform bucket grid; neighbour queries inspect a bounded number of flies."""
+    def __init__(self, cell=FLOCK_CELL):
+        self.cell = cell
+        self.buckets = {}
+
+    def rebuild(self, flies):
+        self.buckets.clear()
+        c = self.cell
+        for f in flies:
+            key = (int(f.x // c), int(f.y // c))
+            b = self.buckets.get(key)
+            if b is None: self.buckets[key] = [f]
+            else: b.append(f)
+
+    def neighbors(self, f, limit=FLOCK_NEIGHBORS, scan=FLOCK_SCAN):
+        c = self.cell
+        cx, cy = int(f.x // c), int(f.y // c)
+        r2 = c * c
+        out = []
+        seen = 0
+        # own cell first, then the 8 around it
+        for key in ((cx,cy), (cx-1,cy), (cx+1,cy), (cx,cy-1), (cx,cy+1),
+                    (cx-1,cy-1), (cx+1,cy-1), (cx-1,cy+1), (cx+1,cy+1)):
+            b = self.buckets.get(key)
+            if not b: continue
+            for o in b:
+                seen += 1
+                if o is not f:
+                    ox, oy = o.x - f.x, o.y - f.y
+                    if ox*ox + oy*oy < r2:
+                        out.append(o)
+                        if len(out) >= limit: return out
+                if seen >= scan: return out
+        return out
 
 class Zone:
-    def __init__(self, canvas, x, y, r=50):
+    def __init__(self, canvas, x, y, r=50, index=0):
         self.canvas = canvas
+        self.index = index
         self.x, self.y = x, y
         self.r = r
         self.charge = 0.0
@@ -353,13 +595,12 @@ class Zone:
         inside = sum(1 for f in flies if dist(f.x,f.y,self.x,self.y) < self.r)
         if inside > 0 and not self.full:
             prev = self.charge
-            self.charge = min(1.0, self.charge + 0.004 * inside)
+            self.charge = min(1.0, self.charge + ZONE_CHARGE_RATE * inside)
             if self.charge >= 1.0 and prev < 1.0:
                 self.full = True
-                play_sfx("zone_charge")
-                burst(self.x, self.y, C_ZONE, 18)
+                bus.emit(events.ZoneCharged(self.x, self.y, self.index))
         elif not self.full:
-            self.charge = max(0.0, self.charge - 0.0008)
+            self.charge = max(0.0, self.charge - ZONE_DECAY)
 
     def draw(self, t):
         p  = 0.88 + 0.12 * math.sin(t * 2.1 + self.pulse)
@@ -371,29 +612,43 @@ class Zone:
             col = lerp_color("#1A4A7A", C_ZONE, self.charge)
             n = int(self.charge * 40)
             fill_col = f"#{n//2:02x}{n:02x}{min(60,n*2):02x}"
-        self.canvas.coords(self.ring2, self.x-r2,self.y-r2,self.x+r2,self.y+r2)
-        self.canvas.itemconfig(self.ring2, outline=lerp_color("#040E1A",col,0.4))
-        self.canvas.coords(self.fill, self.x-r+2,self.y-r+2,self.x+r-2,self.y+r-2)
-        self.canvas.itemconfig(self.fill, fill=fill_col)
-        self.canvas.coords(self.ring, self.x-r,self.y-r,self.x+r,self.y+r)
-        self.canvas.itemconfig(self.ring, outline=col, width=2)
+        batch.coords(self.canvas, self.ring2, self.x-r2,self.y-r2,self.x+r2,self.y+r2)
+        batch.itemconfig(self.canvas, self.ring2, outline=lerp_color("#040E1A",col,0.4))
+        batch.coords(self.canvas, self.fill, self.x-r+2,self.y-r+2,self.x+r-2,self.y+r-2)
+        batch.itemconfig(self.canvas, self.fill, fill=fill_col)
+        batch.coords(self.canvas, self.ring, self.x-r,self.y-r,self.x+r,self.y+r)
+        batch.itemconfig(self.canvas, self.ring, outline=col, width=2)
         if self.full:
-            self.canvas.itemconfig(self.pct, text="✓", fill=C_HEART)
+            batch.itemconfig(self.canvas, self.pct, text="✓", fill=C_HEART)
         else:
-            self.canvas.itemconfig(self.pct, text=f"{int(self.charge*100)}%", fill=C_TEXT)
+            batch.itemconfig(self.canvas, self.pct, text=f"{int(self.charge*100)}%", fill=C_TEXT)
 
 class DarkSpot:
-    def __init__(self, canvas, x, y):
+    """Created hidden up front; activate() places it when the shadows rise."""
+    def __init__(self, canvas, x=0, y=0):
         self.canvas = canvas
         self.x, self.y = x, y
         self.base_r = random.randint(30, 46)
         self.r = self.base_r
-        self.hp = 3
+        self.hp = DARK_HP
         self.pulse = random.uniform(0, math.tau)
-        self.g2 = canvas.create_oval(0,0,1,1, fill=C_DARK_G, outline="")
-        self.b  = canvas.create_oval(0,0,1,1, fill=C_DARK, outline="")
+        self.g2 = canvas.create_oval(0,0,1,1, fill=C_DARK_G, outline="", state="hidden")
+        self.b  = canvas.create_oval(0,0,1,1, fill=C_DARK, outline="", state="hidden")
         self._draw()
 
+    def activate(self, x, y, base_r=None, hp=None):
+        self.x, self.y = x, y
+        self.base_r = base_r or random.randint(30, 46)
+        self.hp = hp or DARK_HP
+        self.r = int(self.base_r * (self.hp / DARK_HP))
+        self._draw()
+        self.canvas.itemconfig(self.g2, state=SCENE_STATE)
+        self.canvas.itemconfig(self.b,  state=SCENE_STATE)
+
+    def deactivate(self):
+        self.canvas.itemconfig(self.g2, state="hidden")
+        self.canvas.itemconfig(self.b,  state="hidden")
+
     def _draw(self):
         gr = self.r * 1.7
         self.canvas.coords(self.g2, self.x-gr,self.y-gr,self.x+gr,self.y+gr)
@@ -402,32 +657,56 @@ class DarkSpot:
 
     def hit(self):
         self.hp -= 1
-        self.r = int(self.base_r * (self.hp / 3))
+        self.r = int(self.base_r * (self.hp / DARK_HP))
         self._draw()
         if self.hp <= 0:
-            self.canvas.delete(self.g2); self.canvas.delete(self.b)
+            self.deactivate()
             return True
-        play_sfx("cleanse")
         return False
 
     def contains(self, ex, ey): return dist(ex,ey,self.x,self.y) < self.r
 
 
-root = tk.Tk()
-root.title("✦ Emberveil ✦")
-root.geometry(f"{WIDTH}x{HEIGHT}")
-root.resizable(False, False)
-root.configure(bg="#000000")
+class _NullWidget:
+    """Accepts any Tk widget call and does nothing; used when HEADLESS."""
+    _next_id = 0
 
-# Main game canvas (left)
-canvas = tk.Canvas(root, bg=BG_SKY, highlightthickness=0,
-                   width=CANVAS_W, height=HEIGHT)
-canvas.place(x=0, y=0)
+    def __init__(self, *a, **kw): pass
 
-# Panel canvas (right)
-panel = tk.Canvas(root, bg=C_PANEL, highlightthickness=0,
-                  width=PANEL_W, height=HEIGHT)
-panel.place(x=CANVAS_W, y=0)
+    def __getattr__(self, name):
+        return self._create if name.startswith("create_") else self._noop
+
+    def _create(self, *a, **kw):
+        _NullWidget._next_id += 1
+        return _NullWidget._next_id
+
+    def _noop(self, *a, **kw): return None
+
+if HEADLESS:
+    root = canvas = panel = _NullWidget()
+else:
+    root = tk.Tk()
+    root.title("✦ Emberveil ✦")
+    root.geometry(f"{WIDTH}x{HEIGHT}")
+    root.resizable(False, False)
+    root.configure(bg="#000000")
+
+    # Main game canvas (left)
+    canvas = tk.Canvas(root, bg=BG_SKY, highlightthickness=0,
+                       width=CANVAS_W, height=HEIGHT)
+    canvas.place(x=0, y=0)
+
+    # Panel canvas (right)
+    panel = tk.Canvas(root, bg=C_PANEL, highlightthickness=0,
+                      width=PANEL_W, height=HEIGHT)
+    panel.place(x=CANVAS_W, y=0)
+    if WORLD_SCREENS > 1:
+        canvas.configure(scrollregion=(0, 0, WORLD_W, HEIGHT), xscrollincrement=1)
+
+if HEADLESS:
+    batch = _NullWidget()
+else:
+    batch = tkbatch.FrameBatch(root) if TCL_BATCH else tkbatch.DirectCalls()
 
 
 def build_background():
@@ -437,64 +716,84 @@ def build_background():
         r = int(3 + f*8)
         g = int(12 + f*16)
         b = int(24 + f*10)
-        canvas.create_rectangle(0, int(f*(HEIGHT-60)), CANVAS_W,
+        canvas.create_rectangle(0, int(f*(HEIGHT-60)), WORLD_W,
             int((f+0.12)*(HEIGHT+40)),
             fill=f"#{r:02x}{g:02x}{b:02x}", outline="")
     # Stars
-    for _ in range(200):
-        sx, sy = random.randint(0,CANVAS_W), random.randint(0, HEIGHT-80)
+    for _ in range(200 * WORLD_SCREENS):
+        sx, sy = random.randint(0,WORLD_W), random.randint(0, HEIGHT-80)
         sr = random.uniform(0.5, 1.8)
         brt = random.randint(140,255)
         sc = f"#{brt:02x}{brt:02x}{min(255,brt+15):02x}"
         sid = canvas.create_oval(sx-sr,sy-sr,sx+sr,sy+sr, fill=sc, outline="")
         stars_data.append((sid, sx, sy, sr, random.uniform(0, math.tau)))
-    # Moon
-    MX, MY, MR = CANVAS_W-95, 85, 38
-    canvas.create_oval(MX-MR*1.9,MY-MR*1.9,MX+MR*1.9,MY+MR*1.9, fill="#030D1C", outline="")
-    canvas.create_oval(MX-MR*1.4,MY-MR*1.4,MX+MR*1.4,MY+MR*1.4, fill="#0A1D30", outline="")
-    canvas.create_oval(MX-MR,MY-MR,MX+MR,MY+MR, fill=C_MOON, outline="")
+    # Moon (fixed to the screen: it is too far away to scroll)
+    MX, MY, MR = MOON_X, MOON_Y, MOON_R
+    canvas.create_oval(MX-MR*1.9,MY-MR*1.9,MX+MR*1.9,MY+MR*1.9, fill="#030D1C", outline="", tags="hud")
+    canvas.create_oval(MX-MR*1.4,MY-MR*1.4,MX+MR*1.4,MY+MR*1.4, fill="#0A1D30", outline="", tags="hud")
+    canvas.create_oval(MX-MR,MY-MR,MX+MR,MY+MR, fill=C_MOON, outline="", tags="hud")
     canvas.create_oval(MX+10-MR*0.38,MY-10-MR*0.38,
-                       MX+10+MR*0.38,MY-10+MR*0.38, fill="#D4E8FF", outline="")
+                       MX+10+MR*0.38,MY-10+MR*0.38, fill="#D4E8FF", outline="", tags="hud")
     # Tree silhouette
     pts = []
     tx = 0
-    while tx <= CANVAS_W+30:
+    while tx <= WORLD_W+30:
         pts += [tx, HEIGHT - random.randint(8, 60)]
         tx += random.randint(10, 38)
-    pts += [CANVAS_W, HEIGHT, 0, HEIGHT]
+    treeline[:] = pts
+    pts += [WORLD_W, HEIGHT, 0, HEIGHT]
     canvas.create_polygon(*pts, fill="#020B05", outline="")
     # Ground strip
     for i in range(5):
         f = i / 4
         yy = HEIGHT - 58 + int(f * 58)
         gv = int(f * 16)
-        canvas.create_rectangle(0, yy, CANVAS_W, yy+14,
+        canvas.create_rectangle(0, yy, WORLD_W, yy+14,
             fill=f"#00{gv:02x}00", outline="")
 
 build_background()
 
-HX, HY, HR = CANVAS_W // 2, HEIGHT // 2 + 15, 68
+# Ground fog sits on the backdrop; its textures load (or bake) in idle time
+ground_fog = None
+if FOG and CANVAS_DRAW and not HEADLESS:
+    ground_fog = fog.Fog(canvas, CANVAS_W, HEIGHT * 0.5, HEIGHT, C_FOG, tk.PhotoImage, tags="hud")
+    jobs.submit(ground_fog.load, LOW, name="fog")
+
+# Light overlay sits above the backdrop and below everything that moves
+light = lightfield.LightField(CANVAS_W, HEIGHT) if LIGHTFIELD else None
+nav   = flowfield.NavGrid(WORLD_W, HEIGHT)
+crowd = lod.ClusterLOD(WORLD_W, HEIGHT)
+cam   = camera.Camera(WORLD_W, CANVAS_W)
+trails = TrailBuffer(0, TRAIL_LEN)       # sized to the swarm on the first push
+light_src = light_photo = None
+if light and not (HEADLESS or RASTER):
+    light_src   = tk.PhotoImage()
+    light_photo = tk.PhotoImage(width=CANVAS_W, height=HEIGHT)
+    canvas.create_image(0, 0, anchor="nw", image=light_photo)
+
+HX, HY, HR = WORLD_W // 2, HEIGHT // 2 + 15, 68
+REGIONS    = {"heart": (HX, HY, HR)}          # counted for stage goals
 heart_ring   = canvas.create_oval(HX-HR,HY-HR,HX+HR,HY+HR, outline="#152A3A", width=2)
 heart_inner  = canvas.create_oval(HX-HR//2,HY-HR//2,HX+HR//2,HY+HR//2,
                                    outline="#0D1E2E", width=1)
 heart_label  = canvas.create_text(HX, HY+HR+16, text="Heart of the Veil",
     fill="#1A3A5C", font=("Georgia", 9, "italic"))
 
-status_bg = canvas.create_rectangle(0,0,1,1, fill="#000814", outline="", state="hidden")
-status_id = canvas.create_text(CANVAS_W//2, HY-HR-40, text="",
+status_bg = canvas.create_rectangle(0,0,1,1, fill="#000814", outline="", state="hidden", tags="hud")
+status_id = canvas.create_text(CANVAS_W//2, HY-HR-40, text="", tags="hud",
     fill=C_ACCENT, font=("Georgia", 14, "bold"), state="hidden")
 
 def show_status(msg, color=C_ACCENT):
     canvas.itemconfig(status_id, text=msg, fill=color, state="normal")
     tw = len(msg) * 8 + 24
-    canvas.coords(status_bg,
-        CANVAS_W//2-tw//2, HY-HR-56,
-        CANVAS_W//2+tw//2, HY-HR-24)
+    cx = cam.x + CANVAS_W//2
+    canvas.coords(status_bg, cx-tw//2, HY-HR-56, cx+tw//2, HY-HR-24)
     canvas.itemconfig(status_bg, state="normal")
-    root.after(2400, lambda: (
-        canvas.itemconfig(status_id, state="hidden"),
-        canvas.itemconfig(status_bg, state="hidden")
-    ))
+    timers.after(2.4, hide_status, key="status")    # a newer message restarts the wait
+
+def hide_status():
+    canvas.itemconfig(status_id, state="hidden")
+    canvas.itemconfig(status_bg, state="hidden")
 
 # cursor ring
 cursor_ring = canvas.create_oval(0,0,1,1, outline=C_ACCENT, width=1)
@@ -583,6 +882,11 @@ controls = [
     ("Left-click", "Attract fireflies / Cleanse"),
     ("Right-click","Plant emberbloom"),
     ("Drag",       "Continuously attract"),
+    ("F",          "Toggle flocking"),
+    ("P / S",      "Pause / slow motion"),
+    ("N",          "Navigation assist"),
+    ("D",          "Profiler overlay"),
+    ("R",          "Play again (end screen)"),
 ]
 for i,(k,v) in enumerate(controls):
     y = 516 + i * 16
@@ -592,10 +896,10 @@ for i,(k,v) in enumerate(controls):
         fill=C_TEXT, font=("Georgia", 7))
 
 # Exit button
-exit_btn = tk.Button(panel, text="✕  EXIT", fg=C_TEXT, bg="#06101A",
+exit_btn = (_NullWidget if HEADLESS else tk.Button)(panel, text="✕  EXIT", fg=C_TEXT, bg="#06101A",
     font=("Courier", 9, "bold"), borderwidth=0, relief="flat",
     activebackground="#1A3050", activeforeground="white",
-    command=root.destroy, cursor="hand2")
+    command=lambda: on_close(), cursor="hand2")
 exit_btn.place(x=PANEL_W//2-35, y=HEIGHT-34, width=70, height=24)
 
 # ── Panel update function ──────────────────────
@@ -603,312 +907,859 @@ def refresh_panel():
     s = STAGES[min(stage, len(STAGES)-1)]
 
     # Active task card
-    panel.itemconfig(task_icon_id, text=s["icon"], fill=s["color"])
-    panel.itemconfig(task_title_id, text=f"Task {stage+1}  ·  {s['title']}", fill=s["color"])
-    panel.itemconfig(task_hint_id,  text=s["hint"])
-    panel.itemconfig(task_reward_id, text=f"Reward: +{s['reward']} pts")
+    batch.itemconfig(panel, task_icon_id, text=s["icon"], fill=s["color"])
+    batch.itemconfig(panel, task_title_id, text=f"Task {stage+1}  ·  {s['title']}", fill=s["color"])
+    batch.itemconfig(panel, task_hint_id,  text=s["hint"])
+    batch.itemconfig(panel, task_reward_id, text=f"Reward: +{s['reward']} pts")
 
     # Steps
-    raw_steps = s["steps"]
+    labels = campaign.labels
     for i, (chk, lbl) in enumerate(step_ids):
-        if i < len(raw_steps):
-            done = step_done[i] if i < len(step_done) else False
-            panel.itemconfig(chk, text="●" if done else "○",
+        if i < len(labels):
+            done = campaign.done[i]
+            batch.itemconfig(panel, chk, text="●" if done else "○",
                 fill=C_HEART if done else "#3A5A7A")
-            panel.itemconfig(lbl, text=raw_steps[i],
+            batch.itemconfig(panel, lbl, text=labels[i],
                 fill=C_HEART if done else C_TEXT)
         else:
-            panel.itemconfig(chk, text="")
-            panel.itemconfig(lbl, text="")
+            batch.itemconfig(panel, chk, text="")
+            batch.itemconfig(panel, lbl, text="")
 
     # Stage list highlight
     for i, (icon_id, name_id) in enumerate(stage_labels):
         if i < stage:
-            panel.itemconfig(icon_id, fill="#2A6A4A")
-            panel.itemconfig(name_id, fill="#2A6A4A")
+            batch.itemconfig(panel, icon_id, fill="#2A6A4A")
+            batch.itemconfig(panel, name_id, fill="#2A6A4A")
         elif i == stage:
-            panel.itemconfig(icon_id, fill=s["color"])
-            panel.itemconfig(name_id, fill=C_WHITE)
+            batch.itemconfig(panel, icon_id, fill=s["color"])
+            batch.itemconfig(panel, name_id, fill=C_WHITE)
         else:
-            panel.itemconfig(icon_id, fill="#152030")
-            panel.itemconfig(name_id, fill="#152030")
+            batch.itemconfig(panel, icon_id, fill="#152030")
+            batch.itemconfig(panel, name_id, fill="#152030")
 
     # Progress bar
     pct = stage / len(STAGES)
-    panel.coords(progress_bar, 10, 292, 10 + int((PANEL_W-20)*pct), 306)
+    batch.coords(panel, progress_bar, 10, 292, 10 + int((PANEL_W-20)*pct), 306)
     col = lerp_color(C_ZONE, C_HEART, pct)
-    panel.itemconfig(progress_bar, fill=col)
+    batch.itemconfig(panel, progress_bar, fill=col)
 
 def spawn_zones():
-    positions = [(200, 200), (CANVAS_W-180, 200), (CANVAS_W//2, HEIGHT-170)]
-    for (x,y) in positions:
-        zones.append(Zone(canvas, x, y))
+    positions = [(200, 200), (WORLD_W-180, 200), (WORLD_W//2, HEIGHT-170)]
+    for i, (x,y) in enumerate(positions):
+        zones.append(Zone(canvas, x, y, index=i))
 
 def spawn_dark():
-    for _ in range(5):
-        x = random.randint(120, CANVAS_W-120)
+    profiler.mark("shadows rise")
+    for spot in dark_pool[:DARK_COUNT]:
+        x = random.randint(120, WORLD_W-120)
         y = random.randint(100, HEIGHT-120)
-        dark_spots.append(DarkSpot(canvas, x, y))
+        spot.activate(x, y)
+        dark_spots.append(spot)
+    campaign.set("shadows", len(dark_spots))
+    nav.set_obstacles([(d.x, d.y, d.base_r) for d in dark_spots])
+
+def preallocate():
+    """Create every item a run can need, hidden, so transitions only flip state."""
+    for _ in range(DARK_COUNT):
+        dark_pool.append(DarkSpot(canvas))
+    for _ in range(BLOOM_POOL):
+        bloom_pool.append(_bloom_items())
+    for _ in range(PARTICLE_POOL):
+        pid_pool.append(canvas.create_oval(0,0,1,1, fill=C_FLY_DIM, outline="", state="hidden"))
+    for _ in range(LOD_POOL):
+        impostor_pool.append(_impostor_item())
+    build_end_screens()
+
+def _impostor_item():
+    pid = canvas.create_oval(0,0,1,1, fill="#332200", outline="", state="hidden")
+    canvas.tag_lower(pid, fireflies[0].glow)       # under the flies still drawn
+    return pid
+
+def _bloom_items():
+    # 6 petals + center
+    petals = [canvas.create_oval(0,0,1,1, outline="", state="hidden") for _ in range(6)]
+    return petals + [canvas.create_oval(0,0,1,1, fill="#FFFAAA", outline="", state="hidden")]
+
+def plant_bloom(x, y, col):
+    items = bloom_pool.pop() if bloom_pool else _bloom_items()
+    for i, pid in enumerate(items[:6]):
+        ang = i * math.tau / 6
+        px = x + math.cos(ang) * 11
+        py = y + math.sin(ang) * 11
+        canvas.coords(pid, px-6,py-6,px+6,py+6)
+        canvas.itemconfig(pid, fill=col, state=SCENE_STATE)
+    canvas.coords(items[6], x-4,y-4,x+4,y+4)
+    canvas.itemconfig(items[6], state=SCENE_STATE)
+    flowers.append((x, y, col))
+    bloom_items.append(items)
+    campaign.set("flowers", len(flowers))
+
+def clear_blooms():
+    for items in bloom_items:
+        for pid in items:
+            canvas.itemconfig(pid, state="hidden")
+        bloom_pool.append(items)
+    bloom_items.clear()
+    flowers.clear()
+    campaign.set("flowers", 0)
+
+_fly_fields = attrgetter(*snapshot.FLY_FIELDS)
+_fly_xy     = attrgetter("x", "y")
+
+def _swarm_rows(flies):
+    """Flat float32 copy of each fly's FLY_FIELDS, fly after fly."""
+    nf = len(snapshot.FLY_FIELDS)
+    return np.fromiter(chain.from_iterable(map(_fly_fields, flies)),
+                       np.float32, count=len(flies) * nf)
+
+def capture_state(swarm=True):
+    """Plain-data copy of the run for snapshot.encode, which packs it on the
+    writer thread. swarm=False leaves the swarm blocks to the caller."""
+    return {
+        "stage": stage, "score": score, "combo": combo,
+        "combo_timer": combo_timer, "frame": frame, "combo_peak": combo_peak,
+        "elapsed": clock.now, "stage_times": list(stage_times), "world_w": WORLD_W,
+        "zones": [(z.x, z.y, z.r, z.charge, z.full) for z in zones],
+        "shadows": [(d.x, d.y, d.base_r, max(0, d.r), d.hp) for d in dark_spots],
+        "blooms": [(x, y, int(col[1:], 16)) for (x, y, col) in flowers],
+        "swarm": [_swarm_rows(fireflies)] if swarm else [],
+    }
+
+def capture_chunks():
+    """Idle-time job: capture_state() with the swarm copied SAVE_CHUNK flies
+    per chunk. Slices may be a frame apart; every fly's row is whole."""
+    state = capture_state(swarm=False)
+    flies = fireflies[:]
+    for i in range(0, len(flies), SAVE_CHUNK):
+        state["swarm"].append(_swarm_rows(flies[i:i + SAVE_CHUNK]))
+        yield
+    if autosaver and not game_over: autosaver.submit(state)
+
+def restore_state(st):
+    global stage, score, combo, combo_timer, frame, combo_peak
+    stage, score = st["stage"], st["score"]
+    combo, combo_timer, frame = st["combo"], st["combo_timer"], st["frame"]
+    combo_peak = st["combo_peak"]
+    stage_times[:] = st["stage_times"]
+    clock.set(st["elapsed"])
+    for z, (_, _, _, charge, full) in zip(zones, st["zones"]):
+        z.charge, z.full = charge, bool(full)
+        campaign.set(f"zone:{z.index}", int(z.full))
+    campaign.start(stage)
+    for spot in dark_spots:
+        spot.deactivate()
+    dark_spots.clear()
+    while len(dark_pool) < len(st["shadows"]):
+        dark_pool.append(DarkSpot(canvas))
+    for spot, (x, y, base_r, r, hp) in zip(dark_pool, st["shadows"]):
+        spot.activate(x, y, base_r, hp)
+        dark_spots.append(spot)
+    campaign.set("shadows", len(dark_spots))
+    nav.set_obstacles([(d.x, d.y, d.base_r) for d in dark_spots])
+    clear_blooms()
+    for (x, y, rgb) in st["blooms"]:
+        plant_bloom(x, y, f"#{rgb:06X}")
+    swarm = st["swarm"]
+    n = swarm.shape[1]
+    while len(fireflies) < n:
+        fireflies.append(Firefly(canvas))
+    for f in fireflies[n:]:
+        canvas.delete(f.trail); canvas.delete(f.glow); canvas.delete(f.body)
+    del fireflies[n:]
+    for f, row in zip(fireflies, swarm.T.tolist()):
+        f.x, f.y, f.dx, f.dy, f.r, f.phase, f.spd = row
+    trails.clear()
+    scroll(cam.jump(swarm[0].mean() - CANVAS_W / 2))
+    refresh_panel()
+
+def reset_run(seed=None):
+    """Back to a fresh run in place: same items, pools and swarm size."""
+    global stage, score, combo, combo_timer, combo_peak, frame
+    global game_over, outcome, mouse_pos, particles_shown
+    if seed is not None: random.seed(seed)
+    stage = score = combo = combo_timer = combo_peak = frame = 0
+    game_over, outcome = False, None
+    mouse_pos = None
+    stage_times.clear()
+    clock.set(0.0)
+    timers.clear()
+    hide_status()
+    for z in zones:
+        z.charge, z.full = 0.0, False
+        campaign.set(f"zone:{z.index}", 0)
+    for spot in dark_spots:
+        spot.deactivate()
+    dark_spots.clear()
+    campaign.set("shadows", 0)
+    campaign.start(0)
+    nav.set_obstacles([])
+    clear_blooms()
+    particles.clear()
+    for pid in pid_pool[:particles_shown]:
+        canvas.itemconfig(pid, state="hidden")
+    particles_shown = 0
+    for f in fireflies:
+        f.scatter()
+    trails.clear()
+    scroll(cam.jump(START_X))
+    if light: light.field.fill(light.ambient)
+    if GC_HOLD: gcpolicy.hold()
+    profiler.new_run()                    # each metrics record covers one run
+    canvas.itemconfig("endscreen", state="hidden")
+    canvas.itemconfig(heart_label, text="Heart of the Veil", fill="#1A3A5C")
+    refresh_panel()
+
+def restart(e=None):
+    """Play again from an end screen: reset_run() in place, so the canvas items,
+    pools, panel and generated audio are all reused."""
+    global restart_ms
+    if not game_over: return
+    t0 = time.perf_counter()
+    reset_run()
+    clock.resume()                        # the loop may have stopped: don't bill the idle gap
+    panel.itemconfig(panel_score, fill=C_HEART)
+    start_ambient()
+    restart_ms = (time.perf_counter() - t0) * 1000
+    if not looping: loop()
+
+def on_close():
+    if autosaver and not game_over:
+        autosaver.save_now(capture_state())
+    if not (HEADLESS or game_over): write_metrics(run_metrics())   # a finished run has logged already
+    root.destroy()
 
 def draw_particles():
     global particles
-    for pid in pid_pool:
-        try: canvas.delete(pid)
-        except: pass
-    pid_pool.clear()
-    alive = []
-    for p in particles:
-        if p.update() and 0 < p.x < CANVAS_W and 0 < p.y < HEIGHT:
-            alive.append(p)
-            a = p.life / p.max_life
-            r2 = max(0.5, p.r * a)
-            pid_pool.append(
-                canvas.create_oval(p.x-r2,p.y-r2,p.x+r2,p.y+r2,
-                    fill=p.color, outline=""))
-    particles = alive
+    global particles_shown
+    particles = [p for p in particles
+                 if p.update() and 0 < p.x < WORLD_W and 0 < p.y < HEIGHT]
+    if not CANVAS_DRAW: return
+    shown = particles if WORLD_SCREENS == 1 else [p for p in particles if cam.sees(p.x)]
+    n = min(len(shown), len(pid_pool))
+    for i in range(n):
+        p, pid = shown[i], pid_pool[i]
+        a = p.life / p.max_life
+        r2 = max(0.5, p.r * a)
+        batch.coords(canvas, pid, p.x-r2,p.y-r2,p.x+r2,p.y+r2)
+        if i < particles_shown: batch.itemconfig(canvas, pid, fill=p.color)
+        else: batch.itemconfig(canvas, pid, fill=p.color, state="normal")
+    for pid in pid_pool[n:particles_shown]:
+        batch.itemconfig(canvas, pid, state="hidden")
+    particles_shown = n
     
+def swarm_xy():
+    """(N, 2) fly positions, gathered once per frame for everything that needs them."""
+    return np.fromiter(chain.from_iterable(map(_fly_xy, fireflies)),
+                       np.float64, count=2 * len(fireflies)).reshape(-1, 2)
+
+def draw_swarm(t, xy):
+    """Every fly and its trail; with LOD, one impostor per crowded cell
+    stands in for the flies under it. Flies out of view are hidden too."""
+    global impostors_shown
+    n = len(fireflies)
+    paths = None
+    if TRAILS:
+        trails.push(xy)
+        paths = trails.paths(round(TRAIL_LEN * profiler.quality))
+    absorbed = crowd.update(xy[:, 0], xy[:, 1]) if LOD else np.zeros(n, bool)
+    if WORLD_SCREENS > 1: absorbed |= ~cam.visible(xy[:, 0])
+    absorbed = absorbed.tolist()
+    for i, f in enumerate(fireflies):
+        if absorbed[i]:
+            if not f.hidden:
+                for item in (f.trail, f.glow, f.body):
+                    batch.itemconfig(canvas, item, state="hidden")
+                f.hidden = True
+            continue
+        if f.hidden:
+            for item in ((f.trail, f.glow, f.body) if TRAILS else (f.glow, f.body)):
+                batch.itemconfig(canvas, item, state="normal")
+            f.hidden = False
+        f.draw(t)
+        if paths: batch.coords(canvas, f.trail, *paths[i])
+    clusters = crowd.clusters if LOD else []
+    if WORLD_SCREENS > 1: clusters = [c for c in clusters if cam.sees(c[0], c[2])]
+    while len(impostor_pool) < len(clusters):
+        impostor_pool.append(_impostor_item())
+    for i, (x, y, r, n) in enumerate(clusters):
+        pid = impostor_pool[i]
+        v = 0.8 + 0.2 * math.sin(t * 2.4 + x * 0.05)
+        k = min(1.0, n / 40)
+        col = f"#{int((90+150*k)*v):02x}{int((70+140*k)*v):02x}{int((8+40*k)*v):02x}"
+        batch.coords(canvas, pid, x-r, y-r, x+r, y+r)
+        if i < impostors_shown: batch.itemconfig(canvas, pid, fill=col)
+        else: batch.itemconfig(canvas, pid, fill=col, state="normal")
+    for pid in impostor_pool[len(clusters):impostors_shown]:
+        batch.itemconfig(canvas, pid, state="hidden")
+    impostors_shown = len(clusters)
+
+def present_raster(t):
+    """Framebuffer backend: rasterize the scene and push it as one image."""
+    raster.render(fb, sys.modules[__name__], t, cursor=False)
+    frame_photo.configure(data=fb.to_ppm(), format="PPM")
+
+def update_light(xy):
+    """Deposit this frame's light and darkness, then step the field."""
+    light.ambient = lightfield.AMBIENT * (1 - stage / len(STAGES))   # the veil lifts
+    light.deposit(xy[:, 0], xy[:, 1], FLY_LIGHT)
+    for z in zones:
+        light.emit(z.x, z.y, z.r, ZONE_LIGHT * z.charge)
+    light.emit(HX, HY, HR, HEART_LIGHT * stage / len(STAGES))
+    for (x, y, _) in flowers:
+        light.emit(x, y, 16, BLOOM_LIGHT)
+    for d in dark_spots:
+        light.emit(d.x, d.y, d.r * 2.4, -DARK_EMIT)
+    light.step()
+
+def present_light():
+    light_src.configure(data=light.to_png(LIGHT_UPSAMPLE), format="png")
+    z = light.cell // LIGHT_UPSAMPLE
+    root.tk.call(light_photo, "copy", light_src, "-zoom", z, z, "-compositingrule", "set")
+
 def twinkle_stars(t):
     for (sid, sx, sy, sr, phase) in stars_data:
+        if not cam.sees(sx): continue
         v = 0.45 + 0.55 * math.sin(t * 1.4 + phase)
         b = int(100 + 155 * v)
         col = f"#{b:02x}{b:02x}{min(255,b+20):02x}"
-        canvas.itemconfig(sid, fill=col)
+        batch.itemconfig(canvas, sid, fill=col)
 
 def animate_heart(t):
+    if not cam.sees(HX, HR): return
     p  = 0.90 + 0.10 * math.sin(t * 1.9)
     r  = HR * p
     r2 = HR * 0.44 * p
     prog = stage / max(1, len(STAGES) - 1)
     col = lerp_color("#152A3A", C_HEART, prog)
-    canvas.coords(heart_ring, HX-r,HY-r,HX+r,HY+r)
-    canvas.coords(heart_inner,HX-r2,HY-r2,HX+r2,HY+r2)
-    canvas.itemconfig(heart_ring, outline=col, width=2)
-    canvas.itemconfig(heart_inner, outline=lerp_color(col,"#000000",0.6))
+    batch.coords(canvas, heart_ring, HX-r,HY-r,HX+r,HY+r)
+    batch.coords(canvas, heart_inner,HX-r2,HY-r2,HX+r2,HY+r2)
+    batch.itemconfig(canvas, heart_ring, outline=col, width=2)
+    batch.itemconfig(canvas, heart_inner, outline=lerp_color(col,"#000000",0.6))
+
+def nav_field():
+    """Flow field toward the current goal: the nearest uncharged zone in
+    Task 1, the Heart after that. None when there is nowhere to go."""
+    if stage == 0:
+        goals = [(z.x, z.y, z.r * 0.6) for z in zones if not z.full]
+    else:
+        goals = [(HX, HY, HR * 0.6)]
+    return nav.field(goals) if goals else None
 
-def check_tasks():
-    global stage, score, step_done, game_over
+def measure_goals(xy):
+    """Per-frame counters, taken only while the active stage watches them."""
+    for name, (x, y, r) in REGIONS.items():
+        if campaign.watching(name):
+            d = xy - (x, y)
+            campaign.set(name, int(np.count_nonzero((d * d).sum(1) < r * r)))
 
-    if game_over: return
+def complete_stage(s_idx):
+    if s_idx == len(STAGES) - 1: victory()
+    else: _advance(s_idx)
 
-    if stage == 0:
-        full = [z.full for z in zones]
-        step_done = full + [False] * max(0, 3 - len(full))
-        if all(full):
-            _advance(0)
-
-    elif stage == 1:
-        cnt = sum(1 for f in fireflies if dist(f.x,f.y,HX,HY)<HR)
-        step_done = [cnt >= 8, False, False]
-        canvas.itemconfig(heart_label,
-            text=f"Heart  {cnt} / 8", fill=C_TEXT)
-        if cnt >= 8:
-            _advance(1)
-            spawn_dark()
-
-    elif stage == 2:
-        done = len(flowers) >= 5
-        step_done = [done, False, False]
-        canvas.itemconfig(heart_label,
-            text=f"Emberblooms: {len(flowers)} / 5", fill=C_TEXT)
-        if done:
-            _advance(2)
-
-    elif stage == 3:
-        rem = len(dark_spots)
-        step_done = [rem == 0, False, False]
-        canvas.itemconfig(heart_label,
-            text=f"Shadows left: {rem}", fill=C_TEXT)
-        if rem == 0:
-            _advance(3)
-
-    elif stage == 4:
-        cnt = sum(1 for f in fireflies if dist(f.x,f.y,HX,HY)<HR)
-        step_done = [cnt >= 15, False, False]
-        canvas.itemconfig(heart_label,
-            text=f"Heart  {cnt} / 15", fill=C_TEXT)
-        if cnt >= 15:
-            play_sfx("victory")
-            victory()
+def show_goal_status(text):
+    canvas.itemconfig(heart_label, text=text, fill=C_TEXT)
+
+campaign = StageEngine(STAGES, sys.modules[__name__], complete_stage, show_goal_status)
+
+def _stage_done():
+    stage_times.append(clock.now - sum(stage_times))
 
 def _advance(s_idx):
-    global stage, score, step_done
+    global stage, score
+    _stage_done()
     score += STAGES[s_idx]["reward"]
     stage += 1
-    step_done = [False, False, False]
-    play_sfx("stage_done")
-    burst(HX, HY, STAGES[s_idx]["color"], 24)
-    show_status(f"✦  {STAGES[s_idx]['title']}  Complete!", STAGES[s_idx]["color"])
-    canvas.itemconfig(heart_label, text="Heart of the Veil", fill="#1A3A5C")
-    refresh_panel()
-
-def victory():
-    global game_over
-    game_over = True
-    ov = canvas.create_rectangle(0,0,CANVAS_W,HEIGHT, fill="#000814",stipple="gray50")
-    for i in range(4):
-        root.after(i*150, lambda: burst(
-            random.randint(100,CANVAS_W-100),
-            random.randint(100,HEIGHT-100), C_HEART, 22, 5))
+    campaign.start(stage)
+    s = STAGES[s_idx]
+    bus.emit(events.StageComplete(s_idx, s["title"], s["color"], s["reward"]))
+
+def build_end_screens():
+    """Both end screens, built once. They start visible but lowered beneath
+    the sky so their fonts and stipples are rasterized during warm-up."""
+    global victory_score_id, timeout_score_id, victory_rank_id, timeout_rank_id
+    v = ("endscreen", "victory", "hud")
+    canvas.create_rectangle(0,0,CANVAS_W,HEIGHT, fill="#000814",stipple="gray50", tags=v)
     canvas.create_text(CANVAS_W//2, HEIGHT//2-60,
         text="✦  EMBERVEIL RESTORED  ✦",
-        fill=C_HEART, font=("Georgia", 28, "bold"))
+        fill=C_HEART, font=("Georgia", 28, "bold"), tags=v)
     canvas.create_text(CANVAS_W//2, HEIGHT//2-18,
         text="The embers glow. The darkness sleeps.",
-        fill=C_TEXT, font=("Georgia", 13, "italic"))
-    canvas.create_text(CANVAS_W//2, HEIGHT//2+22,
-        text=f"Final Score  ·  {score}",
-        fill=C_ACCENT, font=("Courier", 18, "bold"))
+        fill=C_TEXT, font=("Georgia", 13, "italic"), tags=v)
+    victory_score_id = canvas.create_text(CANVAS_W//2, HEIGHT//2+22,
+        text="Final Score  ·  0123456789",
+        fill=C_ACCENT, font=("Courier", 18, "bold"), tags=v)
     canvas.create_text(CANVAS_W//2, HEIGHT//2+60,
         text="You brought harmony back to the veil.",
-        fill="#3A5A7A", font=("Georgia", 10, "italic"))
-    panel.itemconfig(panel_score, text=f"Score  {score}", fill=C_ACCENT)
-
-def timeout():
-    global game_over
-    game_over = True
-    play_sfx("timeout")
-    canvas.create_rectangle(0,0,CANVAS_W,HEIGHT, fill="#03060C",stipple="gray75")
+        fill="#3A5A7A", font=("Georgia", 10, "italic"), tags=v)
+    victory_rank_id = canvas.create_text(CANVAS_W//2, HEIGHT//2+92,
+        text="Rank #0123456789", fill=C_TEXT, font=("Courier", 11), tags=v)
+    canvas.create_text(CANVAS_W//2, HEIGHT//2+130, text="▸  Play again  (R)",
+        fill=C_ACCENT, font=("Georgia", 12, "bold"), tags=v + ("restart",))
+
+    to = ("endscreen", "timeout", "hud")
+    canvas.create_rectangle(0,0,CANVAS_W,HEIGHT, fill="#03060C",stipple="gray75", tags=to)
     canvas.create_text(CANVAS_W//2, HEIGHT//2-24,
         text="The veil grows dark…", fill="#5A2A7A",
-        font=("Georgia", 22, "italic"))
-    canvas.create_text(CANVAS_W//2, HEIGHT//2+20,
-        text=f"Score: {score}", fill=C_TEXT, font=("Courier", 13))
+        font=("Georgia", 22, "italic"), tags=to)
+    timeout_score_id = canvas.create_text(CANVAS_W//2, HEIGHT//2+20,
+        text="Score: 0123456789", fill=C_TEXT, font=("Courier", 13), tags=to)
     canvas.create_text(CANVAS_W//2, HEIGHT//2+50,
         text="The veil awaits. Try again.", fill="#2A3A5A",
-        font=("Georgia", 10, "italic"))
+        font=("Georgia", 10, "italic"), tags=to)
+    timeout_rank_id = canvas.create_text(CANVAS_W//2, HEIGHT//2+78,
+        text="Rank #0123456789", fill="#2A3A5A", font=("Courier", 10), tags=to)
+    canvas.create_text(CANVAS_W//2, HEIGHT//2+116, text="▸  Play again  (R)",
+        fill=C_ACCENT, font=("Georgia", 12, "bold"), tags=to + ("restart",))
+    # after the click: item bindings run before on_press, which must still see the end screen
+    canvas.tag_bind("restart", "<Button-1>", lambda e: root.after_idle(restart))
+
+    # Status banner glyphs, drawn once off-screen-in-z for the same reason
+    canvas.create_text(CANVAS_W//2, HY-HR-40, tags=("fontwarm",),
+        text="✦ " + " ".join(s["title"] for s in STAGES) + " Complete!",
+        fill=C_ACCENT, font=("Georgia", 14, "bold"))
+    canvas.tag_lower("endscreen")
+    canvas.tag_lower("fontwarm")
+
+def finish_warmup():
+    canvas.itemconfig(victory_rank_id, text="")
+    canvas.itemconfig(timeout_rank_id, text="")
+    canvas.itemconfig("endscreen", state="hidden")
+    canvas.tag_raise("endscreen")
+    canvas.delete("fontwarm")
+
+def record_run():
+    """Queue the finished run for the history writer; fill in the rank later."""
+    if not run_history: return
+    run_history.record(outcome, score, clock.now, combo_peak, stage_times)
+    fut = run_history.rank(score)
+    rank_id = victory_rank_id if outcome == "victory" else timeout_rank_id
+    def poll():
+        if not fut.done():
+            root.after(50, poll)
+        elif fut.exception() is None:
+            rank, total = fut.result()
+            canvas.itemconfig(rank_id, text=f"Rank #{rank} of {total}")
+    poll()
+
+def victory():
+    global game_over, outcome
+    game_over = True
+    outcome = "victory"
+    _stage_done()
+    bus.emit(events.Victory(score))
+
+def timeout():
+    global game_over, outcome
+    game_over = True
+    outcome = "timeout"
+    bus.emit(events.Timeout(score))
+
+def input_event(e):
+    """Timestamp an input for latency tracing, unless no frame will show it
+    soon: paused, or the run is over and the loop winding down."""
+    if clock.paused or game_over: return None
+    return profiler.input_event(e.time)
 
 def on_move(e):
     global mouse_pos
-    if e.x < CANVAS_W: mouse_pos = (e.x, e.y)
+    input_event(e)
+    if e.x < CANVAS_W: mouse_pos = (e.x + cam.x, e.y)
     else: mouse_pos = None
 
 def on_press(e):
-    global mouse_pos, score, combo, combo_timer
-    mouse_pos = (e.x, e.y)
+    global mouse_pos, score, combo, combo_timer, combo_peak
+    if game_over: return                  # the end screen's own button restarts
+    origin = input_event(e)
+    x, y = e.x + cam.x, e.y               # world coordinates
+    mouse_pos = (x, y)
     # Cleanse
     if stage == 3:
         for spot in dark_spots[:]:
-            if spot.contains(e.x, e.y):
-                burst(spot.x, spot.y, "#C77DFF", 14)
+            if spot.contains(x, y):
+                bus.emit(events.ShadowHit(spot.x, spot.y, spot.hp - 1))
                 if spot.hit():
                     dark_spots.remove(spot)
-                    score += 15 + combo
+                    campaign.set("shadows", len(dark_spots))
+                    pts = 15 + combo
+                    score += pts
                     combo = min(combo+1, 6)
+                    combo_peak = max(combo_peak, combo)
                     combo_timer = 90
+                    bus.emit(events.ShadowCleansed(spot.x, spot.y, pts))
                 else:
                     score += 4
                 break
     # Sparkle on click
-    play_sfx("sparkle")
-    gen_sparkle()  # regenerate with new freq
-    burst(e.x, e.y, C_FLY_DIM, 6, 2)
+    play_sfx("sparkle", x, y, origin)
+    if not HEADLESS: jobs.submit(gen_sparkle, key="sparkle")  # new freq, in idle time
+    burst(x, y, C_FLY_DIM, 6, 2)
 
 def on_release(e):
     global mouse_pos
     mouse_pos = None
 
+def toggle_flocking(e=None):
+    global FLOCKING
+    FLOCKING = not FLOCKING
+    show_status("Flocking on" if FLOCKING else "Flocking off", C_TEXT)
+
+def toggle_nav(e=None):
+    global NAV
+    NAV = not NAV
+    show_status("Navigation assist on" if NAV else "Navigation assist off", C_TEXT)
+
+def toggle_overlay(e=None):
+    show = canvas.itemcget(stats_item, "state") == "hidden"
+    canvas.itemconfig(stats_item, state="normal" if show else "hidden")
+    if show: draw_overlay()
+
+def toggle_pause(e=None):
+    if game_over: return
+    if clock.toggle_pause():
+        show_status("Paused  ·  P to resume", C_TEXT)
+        panel.itemconfig(panel_timer, text="paused", fill=C_TEXT)
+        if GC_HOLD: gcpolicy.collect()
+        profiler.pending_input.clear()     # nothing is drawn until resume
+    else:
+        profiler.pending_input.clear()     # the pause is not input latency
+        show_status("Resumed", C_TEXT)
+
+def toggle_slowmo(e=None):
+    clock.scale = 1.0 if clock.scale != 1.0 else SLOWMO
+    show_status("Slow motion" if clock.scale != 1.0 else "Normal speed", C_TEXT)
+
 def on_right(e):
-    global score, combo, combo_timer
-    if e.x >= CANVAS_W: return
+    global score, combo, combo_timer, combo_peak
+    input_event(e)
+    if game_over or e.x >= CANVAS_W: return
     if stage < 2:
         show_status("Emberblooms unlock at Task 3!", "#3A86FF")
         return
     col = random.choice(C_FLOWER)
-    # Draw 6-petal flower
-    for i in range(6):
-        ang = i * math.tau / 6
-        px = e.x + math.cos(ang) * 11
-        py = e.y + math.sin(ang) * 11
-        canvas.create_oval(px-6,py-6,px+6,py+6, fill=col, outline="")
-    # Center
-    canvas.create_oval(e.x-4,e.y-4,e.x+4,e.y+4, fill="#FFFAAA", outline="")
-    flowers.append((e.x, e.y))
-    play_sfx("flower")
-    burst(e.x, e.y, col, 10, 3)
+    x, y = e.x + cam.x, e.y
+    plant_bloom(x, y, col)
     combo = min(combo+1, 6)
+    combo_peak = max(combo_peak, combo)
     combo_timer = 90
     score += 5 + combo
+    bus.emit(events.BloomPlanted(x, y, col, 5 + combo))
+
+# ── Event listeners ───────────────────────────
+# Delivered by bus.dispatch() once per frame; audio goes to the bus worker.
+def on_zone_charged(ev):
+    burst(ev.x, ev.y, C_ZONE, 18)
+    campaign.set(f"zone:{ev.index}", 1)
+
+def on_stage_complete(ev):
+    burst(HX, HY, ev.color, 24)
+    show_status(f"✦  {ev.title}  Complete!", ev.color)
+    canvas.itemconfig(heart_label, text="Heart of the Veil", fill="#1A3A5C")
+    if not SIM_ONLY: refresh_panel()     # the checklist turns now, not on its next slot
+    profiler.mark(f"{ev.title} complete")
+
+def on_shadow_hit(ev):
+    burst(ev.x, ev.y, "#C77DFF", 14)
+
+def on_shadow_cleansed(ev):
+    nav.remove_obstacle(ev.x, ev.y)
+
+def on_bloom_planted(ev):
+    burst(ev.x, ev.y, ev.color, 10, 3)
+
+def on_victory(ev):
+    profiler.mark("victory")
+    for i in range(4):
+        timers.after(i * 0.15, victory_burst)
+    canvas.itemconfig(victory_score_id, text=f"Final Score  ·  {ev.score}")
+    canvas.itemconfig("victory", state="normal")
+    panel.itemconfig(panel_score, text=f"Score  {ev.score}", fill=C_ACCENT)
+
+def victory_burst():
+    burst(cam.x + random.randint(100,CANVAS_W-100), random.randint(100,HEIGHT-100), C_HEART, 22, 5)
+
+def on_timeout(ev):
+    profiler.mark("timeout")
+    canvas.itemconfig(timeout_score_id, text=f"Score: {ev.score}")
+    canvas.itemconfig("timeout", state="normal")
+
+def on_run_end(ev):
+    jobs.cancel("autosave")               # a capture still in flight must not save the finished run
+    if autosaver: autosaver.discard()
+    record_run()
+    if not HEADLESS:
+        rec = run_metrics()               # taken now: a restart clears the profiler
+        jobs.submit(lambda: write_metrics(rec), LOW, name="write_metrics")
+
+def gc_transition(ev):
+    if GC_HOLD: gcpolicy.collect()
+
+def gc_run_end(ev):
+    if GC_HOLD:
+        gcpolicy.collect()
+        gcpolicy.release()
+
+def count_event(ev):
+    name = type(ev).__name__
+    event_counts[name] = event_counts.get(name, 0) + 1
+
+def _sound(name, when=None):
+    path = os.path.join(TMP_DIR, f"{name}.wav")
+    def play(ev):
+        if when is None or when(ev):
+            if mixer.ok: play_sfx(name, getattr(ev, "x", HX), getattr(ev, "y", HY))
+            else: _play_file(path)
+    return play
+
+bus.on(events.ZoneCharged,   on_zone_charged)
+bus.on(events.StageComplete, on_stage_complete)
+bus.on(events.ShadowHit,     on_shadow_hit)
+bus.on(events.ShadowCleansed, on_shadow_cleansed)
+bus.on(events.BloomPlanted,  on_bloom_planted)
+bus.on(events.Victory,       on_victory)
+bus.on(events.Timeout,       on_timeout)
+bus.on(events.Victory,       on_run_end)
+bus.on(events.Timeout,       on_run_end)
+bus.on(events.StageComplete, gc_transition)
+bus.on(events.Victory,       gc_run_end)
+bus.on(events.Timeout,       gc_run_end)
+for _etype in (events.ZoneCharged, events.StageComplete, events.ShadowHit,
+               events.ShadowCleansed, events.BloomPlanted, events.Victory, events.Timeout):
+    bus.on(_etype, count_event)
+if not HEADLESS:
+    for _etype, _name in [(events.ZoneCharged, "zone_charge"), (events.StageComplete, "stage_done"),
+                          (events.BloomPlanted, "flower"), (events.Victory, "victory"),
+                          (events.Timeout, "timeout")]:
+        bus.on(_etype, _sound(_name), async_=True, name=f"audio:{_name}")
+    bus.on(events.ShadowHit, _sound("cleanse", lambda ev: ev.hp > 0),   # last hit is silent
+           async_=True, name="audio:cleanse")
 
 canvas.bind("<Motion>",           on_move)
 canvas.bind("<Button-1>",         on_press)
 canvas.bind("<B1-Motion>",        on_move)
 canvas.bind("<ButtonRelease-1>",  on_release)
 canvas.bind("<Button-3>",         on_right)
+root.bind("<Key-f>",              toggle_flocking)
+root.bind("<Key-n>",              toggle_nav)
+root.bind("<Key-p>",              toggle_pause)
+root.bind("<Key-s>",              toggle_slowmo)
+root.bind("<Key-d>",              toggle_overlay)
+root.bind("<Key-r>",              restart)
+root.protocol("WM_DELETE_WINDOW", on_close)
+
+flock_grid = SpatialGrid()
 
 def loop():
+    global looping
+    profiler.begin()
+    running = step()
+    slack = profiler.budget_ms - profiler.end(frame)
+    slack -= jobs.run(slack)
+    if GC_HOLD and running: gcpolicy.idle(slack)
+    looping = bool(running or timers or particles or jobs)   # end-screen effects play out
+    if looping: root.after(28, loop)
+
+def step():
+    """Advance and draw one frame; False once the run is over."""
+    clock.tick()
+    running = True
+    n = clock.frames()                    # 0 while paused / between slow-mo frames
+    for _ in range(n):
+        running = update_frame()
+        if not running: break
+    timers.tick()
+    bus.dispatch()             # side effects of this frame's events
+    batch.flush()              # every coords/itemconfig of the frame, one Tcl eval
+    if n and profiler.pending_input:
+        root.update_idletasks()           # draw now: this is when the input is on screen
+        profiler.presented()
+    return running
+
+def update_frame():
     global frame, combo, combo_timer
     if game_over:
         draw_particles()
-        return
-    t  = time.time() - start_time
+        if RASTER: present_raster(clock.now)
+        return False
     frame += 1
-
-    # Timer
-    remaining = max(0, TIME_LIMIT - int(t))
+    if frame == WARMUP_FRAMES: finish_warmup()
+    if TIME_LIMIT - int(clock.now) <= 0:
+        hud_text(); timeout(); return False
+    if combo_timer > 0: combo_timer -= 1
+    else: combo = max(0, combo-1)
+    systems.run(frame)
+    return True
+
+# ── Frame systems ─────────────────────────────
+# update_frame() hands the frame to `systems`; each piece below runs at its
+# own rate (see the registrations after the profiler). Simulation that
+# feeds the swarm or the RNG stays at frame rate so runs replay exactly.
+def hud_text():
+    remaining = max(0, TIME_LIMIT - int(clock.now))
     mm, ss = remaining // 60, remaining % 60
     tcol = C_ACCENT if remaining > 30 else "#FF4444"
-    panel.itemconfig(panel_timer, text=f"{mm}:{ss:02d}", fill=tcol)
-    if remaining == 0:
-        timeout(); return
-
-    # Score / combo
-    panel.itemconfig(panel_score, text=f"Score  {score}")
+    batch.itemconfig(panel, panel_timer, text=f"{mm}:{ss:02d}", fill=tcol)
+    batch.itemconfig(panel, panel_score, text=f"Score  {score}")
     if combo_timer > 0:
-        combo_timer -= 1
-        panel.itemconfig(combo_lbl, text=f"×{combo}  COMBO", fill="#FF6B9D")
+        batch.itemconfig(panel, combo_lbl, text=f"×{combo}  COMBO", fill="#FF6B9D")
     else:
-        combo = max(0, combo-1)
-        panel.itemconfig(combo_lbl, text="" if combo == 0 else f"×{combo}", fill="#FF6B9D")
+        batch.itemconfig(panel, combo_lbl, text="" if combo == 0 else f"×{combo}", fill="#FF6B9D")
 
-    # Stars
-    if frame % 4 == 0: twinkle_stars(t)
+def update_zones():
+    for z in zones: z.update(fireflies)
 
-    # Zones
+def draw_zones():
+    t = clock.now
     for z in zones:
-        z.update(fireflies)
-        z.draw(t)
-
-    # Heart
-    animate_heart(t)
-
-    # Fireflies + ambient sparks
+        if cam.sees(z.x, z.r): z.draw(t)
+
+def update_swarm():
+    """Flock, steer and spark every fly, then draw the swarm."""
+    global swarm_pos
+    flock_w = STAGES[min(stage, len(STAGES)-1)]["flock"] if FLOCKING else None
+    if flock_w: flock_grid.rebuild(fireflies)
+    flow = nav_field() if NAV and not mouse_pos else None
     for f in fireflies:
-        f.move(mouse_pos)
-        f.draw(t)
+        if flock_w: f.flock(flock_grid.neighbors(f), flock_w)
+        f.move(mouse_pos, flow)
         if random.random() < 0.012:
             particles.append(Particle(
                 f.x+random.uniform(-3,3), f.y+random.uniform(-3,3),
                 C_FLY_DIM,
                 vx=random.uniform(-0.3,0.3), vy=random.uniform(-0.7,-0.1),
                 life=random.randint(12,28), r=1.1))
+    swarm_pos = swarm_xy()
+    if CANVAS_DRAW: draw_swarm(clock.now, swarm_pos)
+    if light: update_light(swarm_pos)
+
+def draw_light():
+    if light and light_photo: present_light()
+
+def scroll(dx):
+    """The camera moved dx px: scroll the canvas, carry the screen-fixed
+    items along, and keep the held cursor where it is on screen."""
+    global mouse_pos
+    if not dx: return
+    canvas.xview_moveto(cam.x / WORLD_W)
+    canvas.move("hud", dx, 0)
+    if mouse_pos: mouse_pos = (mouse_pos[0] + dx, mouse_pos[1])
 
-    # Cursor
+def follow_camera():
+    """Pan while the cursor is near a side of the view, else ease toward the swarm."""
+    if mouse_pos: scroll(cam.follow(mouse_pos[0], CANVAS_W / 2 - CAM_EDGE))
+    elif swarm_pos is not None: scroll(cam.follow(float(swarm_pos[:, 0].mean())))
+
+def draw_cursor():
     if mouse_pos:
         mx, my = mouse_pos
-        canvas.coords(cursor_ring, mx-14,my-14,mx+14,my+14)
-        canvas.coords(cursor_dot, mx-2,my-2,mx+2,my+2)
+        batch.coords(canvas, cursor_ring, mx-14,my-14,mx+14,my+14)
+        batch.coords(canvas, cursor_dot, mx-2,my-2,mx+2,my+2)
     else:
-        canvas.coords(cursor_ring, 0,0,1,1)
-        canvas.coords(cursor_dot, 0,0,1,1)
+        batch.coords(canvas, cursor_ring, 0,0,1,1)
+        batch.coords(canvas, cursor_dot, 0,0,1,1)
 
-    # Random scatter
+def scatter():
     if random.randint(0,70) == 0:
         sample = random.sample(fireflies, random.randint(1,4))
         for f in sample:
             f.dx += random.uniform(-1.2,1.2)
             f.dy += random.uniform(-1.2,1.2)
 
-    # Particles
-    draw_particles()
+def check_goals():
+    measure_goals(swarm_pos)
+    campaign.update()
 
-    check_tasks()
-    refresh_panel()
+def autosave():
+    # captured after the frame, in its slack; the autosaver thread encodes and writes
+    if autosaver and not game_over: jobs.submit(capture_chunks, key="autosave")
+
+def draw_overlay():
+    if canvas.itemcget(stats_item, "state") == "normal":
+        batch.itemconfig(canvas, stats_item, text="\n".join(profiler.summary()))
 
-    root.after(28, loop)
+def run_metrics():
+    """This run's frame, GC and latency figures."""
+    return {"time": time.time(), "outcome": outcome, "score": score, "frames": frame,
+            **profiler.metrics()}
 
+def write_metrics(rec):
+    """Append a run_metrics() record to the metrics log."""
+    try:
+        os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+        with open(METRICS_PATH, "a") as fh: fh.write(json.dumps(rec) + "\n")
+    except OSError:
+        pass
+
+def publish():
+    if publisher:
+        publisher.publish(frame, stage, score,
+            [(z.x, z.y, z.r, z.charge) for z in zones],
+            list(map(_fly_xy, fireflies)), (WORLD_W, cam.x))
+
+profiler = FrameProfiler()
+profiler.watch_gc()
+
+# Registration order is run order within a frame.
+systems = Scheduler(profiler)
+systems.add("hud", hud_text, hz=7, budget_ms=0.5)
+if WORLD_SCREENS > 1:
+    systems.add("camera", follow_camera, budget_ms=0.3)
+if CANVAS_DRAW:
+    systems.add("stars", lambda: twinkle_stars(clock.now), hz=9, budget_ms=1.0)
+systems.add("zones", update_zones, budget_ms=0.5)
+if ground_fog is not None:
+    systems.add("fog", lambda: ground_fog.update(clock.now, batch, cam.x), hz=18, budget_ms=0.3)
+if CANVAS_DRAW:
+    systems.add("zone-fx", draw_zones, hz=18, budget_ms=0.5)
+    systems.add("heart-fx", lambda: animate_heart(clock.now), hz=18, budget_ms=0.5)
+systems.add("swarm", update_swarm, budget_ms=8.0)
+systems.add("light", draw_light, every=LIGHT_EVERY, budget_ms=3.0)
+systems.add("cursor", draw_cursor, budget_ms=0.2)
+systems.add("scatter", scatter, budget_ms=0.2)
+systems.add("particles", draw_particles, budget_ms=3.0)
+if RASTER:
+    systems.add("raster", lambda: present_raster(clock.now), budget_ms=20.0)
+systems.add("goals", check_goals, hz=12, budget_ms=0.5)
+if not SIM_ONLY:
+    systems.add("panel", refresh_panel, hz=5, budget_ms=1.0)
+systems.add("autosave", autosave, every=AUTOSAVE_FRAMES, budget_ms=2.0)
+systems.add("spectate", publish, budget_ms=1.0)
+systems.add("overlay", draw_overlay, hz=4, budget_ms=0.5)
+publisher = spectator.Publisher(SPECTATE) if SPECTATE else None
 fireflies = [Firefly(canvas) for _ in range(28)]
 spawn_zones()
+preallocate()
 refresh_panel()
-start_ambient()
-loop()
-root.mainloop()
\ No newline at end of file
+
+fb = frame_photo = None
+if RASTER:
+    # Scene items stay (hidden) so the canvas backend can be swapped back;
+    # only the overlay text and cursor are drawn on top of the framebuffer.
+    fb = raster.Framebuffer(CANVAS_W, HEIGHT)
+    canvas.itemconfig("all", state="hidden")
+    frame_photo = (_NullWidget if HEADLESS else tk.PhotoImage)(width=CANVAS_W, height=HEIGHT)
+    frame_item = canvas.create_image(0, 0, anchor="nw", image=frame_photo)
+    canvas.tag_lower(frame_item)
+    for item in [cursor_ring, cursor_dot, heart_label] + [z.pct for z in zones]:
+        canvas.itemconfig(item, state="normal")
+
+# Profiler overlay (D): frame cost, GC and input latency, above everything
+stats_item = canvas.create_text(8, 8, anchor="nw", text="", fill=C_TEXT,
+                                font=("Courier", 8), state="hidden", tags="hud")
+scroll(cam.jump(START_X))      # screen-fixed items were placed for a camera at 0
+
+autosaver = run_history = None
+if not HEADLESS:
+    run_history = RunHistory(HISTORY_PATH)
+    autosaver = snapshot.Autosaver(SAVE_PATH)
+    _saved = None if "--fresh" in sys.argv else snapshot.load(SAVE_PATH)
+    if _saved and _saved["world_w"] == WORLD_W:    # a run saved on another --world size starts fresh
+        restore_state(_saved)
+
+if GC_HOLD:
+    gcpolicy.freeze()          # scene, pools, palettes: never walked again
+    gcpolicy.hold()
+
+if __name__ == "__main__":
+    start_ambient()
+    loop()
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Gameplay-aware garbage collection — keep full collections out of play.
+
+CPython's cyclic collector runs a full (generation 2) pass on its own
+schedule, and that pass walks every tracked object the process holds:
+canvas item tables, palettes, pools, the whole preallocated scene. It
+lands in whatever frame happens to allocate at the wrong moment.
+
+GcPolicy moves it:
+  freeze()   after start-up, so long-lived objects are never walked again
+  hold()     while a stage is being played: generations 0/1 still run
+  collect()  at a stage transition, the end screen or a pause
+  idle(ms)   in a frame's leftover budget, when a full pass is owed and
+             the last one fitted — or unconditionally once it is long overdue
+"""
+import gc, time
+
+HOLD_GEN2    = 1_000_000     # gen-2 threshold while held (never reached)
+OVERDUE      = 20            # × the normal threshold: collect regardless of slack
+SLACK_MARGIN = 1.5           # run in slack only if last cost × this fits
+
+class GcPolicy:
+    def __init__(self):
+        self.normal = gc.get_threshold()
+        self.held = False
+        self.collections = 0         # full passes run by the policy
+        self.last_ms = 0.0           # cost of the most recent one
+
+    def freeze(self):
+        """Collect once, then move everything alive now to the permanent generation."""
+        gc.collect()
+        gc.freeze()
+
+    def hold(self):
+        t0, t1, _ = self.normal
+        gc.set_threshold(t0, t1, HOLD_GEN2)
+        self.held = True
+
+    def release(self):
+        gc.set_threshold(*self.normal)
+        self.held = False
+
+    def owed(self):
+        """Gen-1 passes since the last full one, in units of the normal threshold."""
+        return gc.get_count()[2] / max(1, self.normal[2])
+
+    def collect(self):
+        t0 = time.perf_counter()
+        gc.collect()
+        self.last_ms = (time.perf_counter() - t0) * 1000
+        self.collections += 1
+        return self.last_ms
+
+    def idle(self, slack_ms):
+        """Spend frame slack on a full pass if one is owed. True if it ran."""
+        if not self.held: return False
+        owed = self.owed()
+        if owed >= OVERDUE or (owed >= 1 and self.last_ms * SLACK_MARGIN <= slack_ms):
+            self.collect()
+            return True
+        return False
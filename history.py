@@ -0,0 +1,187 @@
+"""Local run history — every finished run, stored in SQLite (WAL mode).
+
+The game never touches the database on the frame loop. record() only
+enqueues, and a single background thread owns the connection and commits
+in batches. Queries are queued on the same thread and return Futures.
+
+Leaderboard rank and stage-time percentiles are answered from small
+counter tables (scores, tenth-of-a-second stage buckets) that the writer
+keeps up to date. Their cost therefore depends on the number of distinct
+values, not on how many runs have been stored.
+
+    python history.py top 10
+    python history.py recent 20
+    python history.py percentiles
+"""
+import os, queue, sqlite3, sys, threading, time
+from concurrent.futures import Future
+
+BATCH      = 256            # max runs per transaction
+FLUSH_SECS = 0.5            # max time a run waits before being committed
+BUCKET     = 0.1            # stage-time histogram resolution (s)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    finished_at REAL    NOT NULL,
+    outcome     TEXT    NOT NULL,
+    score       INTEGER NOT NULL,
+    duration    REAL    NOT NULL,
+    combo_peak  INTEGER NOT NULL,
+    stages_done INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stage_times (
+    run_id  INTEGER NOT NULL,
+    stage   INTEGER NOT NULL,
+    seconds REAL    NOT NULL,
+    PRIMARY KEY (run_id, stage)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    n     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stage_hist (
+    stage  INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    n      INTEGER NOT NULL,
+    PRIMARY KEY (stage, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_by_score    ON runs(score DESC, finished_at);
+CREATE INDEX IF NOT EXISTS runs_by_finished ON runs(finished_at DESC);
+"""
+
+class RunHistory:
+    def __init__(self, path):
+        self.path = path
+        self._q = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ── producer side (frame loop) ──────────────
+    def record(self, outcome, score, duration, combo_peak, stage_times, finished_at=None):
+        """Queue one finished run. stage_times[i] is the seconds spent on stage i."""
+        self._q.put(("run", (finished_at or time.time(), outcome, int(score),
+                             float(duration), int(combo_peak), list(stage_times))))
+
+    def _query(self, fn, *args):
+        fut = Future()
+        self._q.put(("query", (fn, args, fut)))
+        return fut
+
+    def rank(self, score):
+        """Future -> (rank, total): 1 + number of stored runs with a higher score."""
+        return self._query(_rank, score)
+
+    def top(self, n=10):
+        return self._query(_top, n)
+
+    def recent(self, n=10):
+        return self._query(_recent, n)
+
+    def percentiles(self, stage, pcts=(50, 90, 99)):
+        return self._query(_percentiles, stage, pcts)
+
+    def close(self, timeout=5.0):
+        self._q.put(("stop", None))
+        self._thread.join(timeout)
+
+    # ── writer thread ──────────────────────────
+    def _run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        pending = []
+        while True:
+            timeout = FLUSH_SECS if pending else None
+            try:
+                kind, item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                kind, item = "flush", None
+            if kind == "run":
+                pending.append(item)
+                if len(pending) < BATCH:
+                    continue
+            if pending:
+                _insert(db, pending)
+                pending = []
+            if kind == "query":
+                fn, args, fut = item
+                try: fut.set_result(fn(db, *args))
+                except Exception as exc: fut.set_exception(exc)
+            elif kind == "stop":
+                break
+        db.close()
+
+def _insert(db, runs):
+    with db:
+        for (at, outcome, score, duration, peak, stage_times) in runs:
+            cur = db.execute(
+                "INSERT INTO runs (finished_at, outcome, score, duration, combo_peak, stages_done)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (at, outcome, score, duration, peak, len(stage_times)))
+            rid = cur.lastrowid
+            db.executemany("INSERT INTO stage_times VALUES (?, ?, ?)",
+                           [(rid, i, s) for i, s in enumerate(stage_times)])
+        db.executemany(
+            "INSERT INTO score_counts VALUES (?, 1)"
+            " ON CONFLICT(score) DO UPDATE SET n = n + 1",
+            [(r[2],) for r in runs])
+        db.executemany(
+            "INSERT INTO stage_hist VALUES (?, ?, 1)"
+            " ON CONFLICT(stage, bucket) DO UPDATE SET n = n + 1",
+            [(i, int(s / BUCKET)) for r in runs for i, s in enumerate(r[5])])
+
+def _rank(db, score):
+    above, total = db.execute(
+        "SELECT COALESCE(SUM(CASE WHEN score > ? THEN n END), 0), COALESCE(SUM(n), 0)"
+        " FROM score_counts", (score,)).fetchone()
+    return above + 1, total
+
+_RUN_COLS = "id, finished_at, outcome, score, duration, combo_peak, stages_done"
+
+def _top(db, n):
+    return db.execute(f"SELECT {_RUN_COLS} FROM runs ORDER BY score DESC, finished_at"
+                      " LIMIT ?", (n,)).fetchall()
+
+def _recent(db, n):
+    return db.execute(f"SELECT {_RUN_COLS} FROM runs ORDER BY finished_at DESC"
+                      " LIMIT ?", (n,)).fetchall()
+
+def _percentiles(db, stage, pcts):
+    rows = db.execute("SELECT bucket, n FROM stage_hist WHERE stage = ? ORDER BY bucket",
+                      (stage,)).fetchall()
+    total = sum(n for _, n in rows)
+    out = {}
+    for p in pcts:
+        if not total:
+            out[p] = None
+            continue
+        want, seen = p / 100 * total, 0
+        for bucket, n in rows:
+            seen += n
+            if seen >= want:
+                out[p] = (bucket + 1) * BUCKET     # upper edge of the bucket
+                break
+    return out
+
+def main():
+    path = os.path.join(os.path.expanduser("~"), ".emberveil", "history.db")
+    args = sys.argv[1:] or ["top"]
+    h = RunHistory(path)
+    cmd, n = args[0], int(args[1]) if len(args) > 1 else 10
+    if cmd in ("top", "recent"):
+        for row in (h.top if cmd == "top" else h.recent)(n).result():
+            rid, at, outcome, score, dur, peak, done = row
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(at))
+            print(f"{rid:>8}  {when}  {outcome:<8} {score:>5}  {dur:>6.1f}s  ×{peak}  {done}/5")
+    elif cmd == "percentiles":
+        for stage in range(5):
+            pct = h.percentiles(stage).result()
+            print(f"stage {stage}  " + "  ".join(
+                f"p{p}={'-' if v is None else f'{v:.1f}s'}" for p, v in pct.items()))
+    h.close()
+
+if __name__ == "__main__":
+    main()
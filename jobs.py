@@ -0,0 +1,144 @@
+"""Idle-time jobs — work that can wait for a frame's leftover budget.
+
+submit() queues a callable. The frame loop calls run(slack_ms) once the
+frame is done, and jobs run in priority order (HIGH first, FIFO within a
+priority) until the slack is spent. A job whose callable is a generator
+function is chunked: each next() is one chunk, and between chunks the job
+goes to the back of its priority, so a long job spreads across frames and
+an urgent one can slip in between. A chunk is never interrupted, so keep
+them short; the queue only decides whether to start one.
+
+Starvation guard: a job that has waited STARVE_FRAMES run() calls gets one
+chunk on the next call even when there is no slack at all. A key
+coalesces like timers.TimerQueue: submitting a key that is still pending
+replaces the earlier job.
+
+A job that raises is dropped and its traceback goes to stderr; the frame
+loop calling run() carries on.
+
+    python jobs.py               # self-check
+"""
+import heapq, inspect, itertools, sys, time, traceback
+
+HIGH, NORMAL, LOW = 0, 1, 2
+STARVE_FRAMES     = 45           # ~1.3 s at 35 fps
+
+class Job:
+    __slots__ = ("fn", "gen", "priority", "key", "name", "since", "dead")
+
+    def __init__(self, fn, priority, key, name, since):
+        self.fn, self.gen, self.priority, self.key = fn, None, priority, key
+        self.name, self.since, self.dead = name, since, False
+
+class JobQueue:
+    def __init__(self):
+        self._heap = []                  # (priority, seq, Job)
+        self._seq = itertools.count()
+        self._keyed = {}
+        self._live = 0
+        self.frame = 0                   # run() calls so far
+        self.forced = 0                  # chunks run by the starvation guard
+        self.failed = 0                  # jobs dropped because they raised
+        self._stats = {}                 # name -> [chunks, total_ms, worst_ms]
+
+    def __len__(self):
+        return self._live
+
+    def submit(self, fn, priority=NORMAL, key=None, name=None):
+        if key is not None: self.cancel(key)
+        job = Job(fn, priority, key, name or key or fn.__name__, self.frame)
+        if key is not None: self._keyed[key] = job
+        self._push(job)
+        self._live += 1
+        return job
+
+    def cancel(self, key):
+        """Drop the pending job with this key, if any (even mid-way through its chunks)."""
+        old = self._keyed.pop(key, None)
+        if old and not old.dead:
+            old.dead = True
+            self._live -= 1
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+
+    def run(self, slack_ms):
+        """Run chunks while slack remains. Returns the ms spent."""
+        perf = time.perf_counter
+        t0 = perf()
+        self.frame += 1
+        heap = self._heap
+        starving = min((e for e in heap if not e[2].dead and self.frame - e[2].since >= STARVE_FRAMES),
+                       key=lambda e: e[2].since, default=None)
+        if starving:
+            heap.remove(starving)
+            heapq.heapify(heap)
+            self.forced += 1
+            self._chunk(starving[2])
+        deadline = t0 + slack_ms / 1000
+        while heap and perf() < deadline:
+            job = heapq.heappop(heap)[2]
+            if not job.dead: self._chunk(job)
+        return (perf() - t0) * 1000
+
+    def drain(self):
+        """Finish everything now (shutdown, tests)."""
+        while self._heap:
+            job = heapq.heappop(self._heap)[2]
+            if not job.dead: self._chunk(job)
+
+    def _chunk(self, job):
+        t0 = time.perf_counter()
+        done = True
+        try:
+            if job.gen is None:
+                if inspect.isgeneratorfunction(job.fn): job.gen = job.fn()
+                else: job.fn()
+            if job.gen is not None:
+                next(job.gen)
+                done = False
+        except StopIteration:
+            pass
+        except Exception:                 # dropped: one bad job must not stop the frame loop
+            self.failed += 1
+            print(f"job {job.name!r} failed and was dropped:", file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            s = self._stats.get(job.name)
+            if s is None: s = self._stats[job.name] = [0, 0.0, 0.0]
+            s[0] += 1; s[1] += ms
+            if ms > s[2]: s[2] = ms
+            if not done:
+                job.since = self.frame
+                self._push(job)
+            else:
+                job.dead = True
+                self._live -= 1
+                if job.key is not None and self._keyed.get(job.key) is job:
+                    del self._keyed[job.key]
+
+    def report(self):
+        """(name, chunks, total_ms, worst_ms), most expensive first."""
+        rows = [(n, c, t, w) for n, (c, t, w) in self._stats.items()]
+        return sorted(rows, key=lambda r: -r[2])
+
+def check():
+    """A raising job (plain or mid-generator) is dropped, the rest still run."""
+    q, ran = JobQueue(), []
+    def boom(): raise RuntimeError("plain job")
+    def gen():
+        ran.append("gen:1")
+        yield
+        raise RuntimeError("generator job")
+    q.submit(boom, HIGH, name="boom")
+    q.submit(gen, NORMAL, name="gen")
+    q.submit(lambda: ran.append("after"), LOW, name="after")
+    spent = q.run(1000.0)
+    assert spent >= 0 and q.failed == 2 and len(q) == 0, (spent, q.failed, len(q))
+    assert ran == ["gen:1", "after"], ran
+    assert {r[0] for r in q.report()} == {"boom", "gen", "after"}
+    print("failing jobs dropped, queue kept running")
+
+if __name__ == "__main__":
+    check()
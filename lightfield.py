@@ -0,0 +1,134 @@
+"""Light field — a coarse grid of light (+) and darkness (−) over the meadow.
+
+Each step every source deposits into the grid. Point sources (fireflies)
+go in with one bincount; area sources (zones, the Heart, blooms, shadows)
+are stamped as cached discs. Then the whole grid diffuses (5-point stencil
+over padded slices) and relaxes toward the ambient darkness. The step costs
+the same however many fireflies there are; only the bincount sees them.
+
+The result is drawn as one translucent image: a warm glow where the field
+is lit, a deepening of the night where it is dark.
+
+    field = LightField(840, 680)
+    field.deposit(xs, ys, 0.05)
+    field.emit(x, y, r, -0.2)         # darkness
+    field.step()
+    photo.configure(data=field.to_png(), format="png")
+"""
+import struct, zlib
+import numpy as np
+
+CELL    = 12           # px per grid cell
+DIFFUSE = 0.35         # share of each cell exchanged with its neighbours per step
+DECAY   = 0.92         # fraction of the departure from ambient kept per step
+AMBIENT = -0.45        # resting level of an unlit meadow
+
+LIGHT_RGB   = (255, 196, 90)
+DARK_RGB    = (4, 0, 12)
+LIGHT_ALPHA = 110      # alpha at full light
+DARK_ALPHA  = 150      # alpha at full darkness
+
+class LightField:
+    def __init__(self, w, h, cell=CELL, diffuse=DIFFUSE, decay=DECAY, ambient=AMBIENT):
+        self.w, self.h, self.cell = w, h, cell
+        self.gw, self.gh = -(-w // cell), -(-h // cell)
+        self.diffuse, self.decay, self.ambient = diffuse, decay, ambient
+        self.field = np.full((self.gh, self.gw), ambient, np.float32)
+        self._src = np.zeros(self.gw * self.gh, np.float32)
+        self._discs = {}
+        self._up = {}
+
+    # ── sources ────────────────────────────────
+    def deposit(self, xs, ys, amount):
+        """Point sources at pixel positions; amount is a scalar or per point."""
+        ix = (np.asarray(xs) / self.cell).astype(np.int64)
+        iy = (np.asarray(ys) / self.cell).astype(np.int64)
+        ok = (ix >= 0) & (ix < self.gw) & (iy >= 0) & (iy < self.gh)
+        w = np.broadcast_to(np.asarray(amount, np.float32), ix.shape)[ok]
+        self._src += np.bincount(iy[ok] * self.gw + ix[ok], w, minlength=self._src.size)
+
+    def emit(self, x, y, r, amount):
+        """Area source: `amount` per cell over the disc of radius r (px)."""
+        rc = max(0, int(r / self.cell))
+        disc = self._discs.get(rc)
+        if disc is None:
+            yy, xx = np.mgrid[-rc:rc+1, -rc:rc+1]
+            disc = self._discs[rc] = (xx*xx + yy*yy <= rc*rc + rc).astype(np.float32)
+        cx, cy = int(x / self.cell), int(y / self.cell)
+        x0, y0 = max(0, cx - rc), max(0, cy - rc)
+        x1, y1 = min(self.gw, cx + rc + 1), min(self.gh, cy + rc + 1)
+        if x0 >= x1 or y0 >= y1: return
+        src = self._src.reshape(self.gh, self.gw)
+        src[y0:y1, x0:x1] += amount * disc[y0-cy+rc:y1-cy+rc, x0-cx+rc:x1-cx+rc]
+
+    # ── simulation ─────────────────────────────
+    def step(self):
+        f = self.field
+        f += self._src.reshape(self.gh, self.gw)
+        p = np.pad(f, 1, mode="edge")
+        f += self.diffuse * ((p[:-2, 1:-1] + p[2:, 1:-1] + p[1:-1, :-2] + p[1:-1, 2:]) * 0.25 - f)
+        f -= self.ambient
+        f *= self.decay
+        f += self.ambient
+        np.clip(f, -1, 1, out=f)
+        self._src.fill(0)
+
+    def at(self, x, y):
+        return float(self.field[min(self.gh-1, max(0, int(y / self.cell))),
+                                min(self.gw-1, max(0, int(x / self.cell)))])
+
+    # ── output ─────────────────────────────────
+    def upsample(self, k, shape=None):
+        """Field bilinearly resampled by k (default shape: k × grid resolution)."""
+        h, w = shape or (self.gh * k, self.gw * k)
+        idx = self._up.get((k, h, w))
+        if idx is None:
+            idx = self._up[k, h, w] = (_lin(self.gh, k, h), _lin(self.gw, k, w))
+        (y0, y1, wy), (x0, x1, wx) = idx
+        f = self.field
+        rows = f[y0] * (1 - wy[:, None]) + f[y1] * wy[:, None]
+        return rows[:, x0] * (1 - wx) + rows[:, x1] * wx
+
+    def rgba(self, k=1):
+        """Overlay pixels (uint8 RGBA) at k × grid resolution."""
+        f = self.upsample(k)
+        lit = f > 0
+        out = np.empty(f.shape + (4,), np.uint8)
+        out[..., :3] = np.where(lit[..., None], np.uint8(LIGHT_RGB), np.uint8(DARK_RGB))
+        out[..., 3] = np.abs(f) * np.where(lit, np.float32(LIGHT_ALPHA), np.float32(DARK_ALPHA))
+        return out
+
+    def blend(self, px, block=4):
+        """Composite the overlay onto a float RGB image of the field's pixel size.
+        The overlay is resampled to block-sized squares and broadcast over
+        them, so px's height and width must be multiples of `block`."""
+        h, w = px.shape[0] // block, px.shape[1] // block
+        f = self.upsample(self.cell / block, (h, w))
+        lit = np.clip(f, 0, 1) * np.float32(LIGHT_ALPHA / 255)
+        dark = np.clip(-f, 0, 1) * np.float32(DARK_ALPHA / 255)
+        keep = (1 - lit - dark)[:, None, :, None, None]
+        add = (lit[..., None] * np.float32(LIGHT_RGB) + dark[..., None] * np.float32(DARK_RGB))
+        v = px.reshape(h, block, w, block, 3)
+        v *= keep
+        v += add[:, None, :, None, :]
+
+    def to_png(self, k=1, level=1):
+        img = self.rgba(k)
+        h, w = img.shape[:2]
+        raw = np.zeros((h, w * 4 + 1), np.uint8)            # filter byte 0 per row
+        raw[:, 1:] = img.reshape(h, -1)
+        def chunk(tag, data):
+            return (struct.pack(">I", len(data)) + tag + data +
+                    struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+        return (b"\x89PNG\r\n\x1a\n" +
+                chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)) +
+                chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) +
+                chunk(b"IEND", b""))
+
+def _lin(n, k, m):
+    """Source indices and weights for m samples of n cells resampled by k."""
+    s = np.clip((np.arange(m) + 0.5) / k - 0.5, 0, n - 1)
+    i0 = s.astype(np.int64)
+    i1 = np.minimum(i0 + 1, n - 1)
+    w = (s - i0).astype(np.float32)
+    return i0, i1, w
@@ -0,0 +1,49 @@
+"""Level of detail for dense swarms — one glow per crowded cell.
+
+Each frame the fly positions are binned on a coarse grid with one
+bincount. A cell holding at least `dense` flies is a cluster: it is drawn
+as a single impostor glow at the cell's centroid, its radius growing with
+the square root of the population (glow area ∝ flies). Flies under that
+glow are not drawn. Flies of a dense cell that stick out of it (the
+cluster's ragged edge), and every fly in a sparse cell, still are.
+
+The whole pass is a few array operations over the swarm, far cheaper than
+the four canvas commands per fly it saves.
+"""
+import numpy as np
+
+CELL  = 32        # px per LOD cell
+DENSE = 8         # flies in a cell before it becomes a cluster
+GLOW  = 6.0       # impostor radius per sqrt(fly)
+CORE  = 0.8       # flies within CORE × radius of the centroid are absorbed
+
+class ClusterLOD:
+    def __init__(self, w, h, cell=CELL, dense=DENSE):
+        self.cell, self.dense = cell, dense
+        self.gw, self.gh = -(-w // cell), -(-h // cell)
+        self.clusters = []           # (x, y, radius, flies) per dense cell
+
+    def update(self, xs, ys):
+        """Bool array: which flies the impostors stand in for this frame."""
+        c, gw, n = self.cell, self.gw, self.gw * self.gh
+        idx = (np.clip((ys // c).astype(np.intp), 0, self.gh - 1) * gw
+               + np.clip((xs // c).astype(np.intp), 0, gw - 1))
+        counts = np.bincount(idx, minlength=n)
+        dense = np.flatnonzero(counts >= self.dense)
+        absorbed = np.zeros(len(xs), bool)
+        if not len(dense):
+            self.clusters = []
+            return absorbed
+        pop = counts[dense]
+        cx = np.bincount(idx, xs, n)[dense] / pop
+        cy = np.bincount(idx, ys, n)[dense] / pop
+        rad = GLOW * np.sqrt(pop)
+        slot = np.full(n, -1, np.intp)
+        slot[dense] = np.arange(len(dense))
+        s = slot[idx]
+        inside = s >= 0
+        s = s[inside]
+        dx, dy = xs[inside] - cx[s], ys[inside] - cy[s]
+        absorbed[inside] = dx * dx + dy * dy < (CORE * rad[s]) ** 2
+        self.clusters = list(zip(cx.tolist(), cy.tolist(), rad.tolist(), pop.tolist()))
+        return absorbed
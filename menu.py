@@ -1,15 +1,25 @@
 import tkinter as tk
 import subprocess, sys, random, math, time, os
 import wave, tempfile, threading
+import tkbatch
+import fog
+from clock import GameClock
+from timers import TimerQueue
+from gctune import GcPolicy
+from profiler import FrameProfiler
+from systems import Scheduler
 
 try:
     import numpy as np
+    from trails import TrailBuffer
     HAS_NUMPY = True
 except ImportError:
     HAS_NUMPY = False
 
 SAMPLE_RATE = 44100
 TMP_DIR = tempfile.mkdtemp()
+clock = GameClock()      # ticked once per frame in loop()
+timers = TimerQueue(clock)
 
 def _write_wav(path, samples):
     samples = np.clip(samples, -1, 1)
@@ -113,6 +123,7 @@ C_EMBER    = "#FFB830"
 C_EMBER2   = "#FF7A00"
 C_GLOW     = "#FF4500"
 C_MIST     = "#0A1E28"
+C_FOG      = (24, 48, 60)
 C_TITLE    = "#FFD080"
 C_SUBTITLE = "#5A8090"
 C_BTN_FG   = "#8BB8C8"
@@ -153,7 +164,7 @@ class Ember:
 
     @property
     def color(self):
-        pulse = 0.6 + 0.4 * math.sin(time.time() * 3 + self.phase)
+        pulse = 0.6 + 0.4 * math.sin(clock.now * 3 + self.phase)
         alpha = (self.life / self.max_life) * pulse
         if self.color_idx < 0.5:
             r, g, b = 255, int(184 * alpha), int(48 * alpha)
@@ -165,7 +176,7 @@ class Ember:
         return f"#{r:02x}{g:02x}{b:02x}"
 
     def update(self):
-        wobble = math.sin(time.time() * 2.1 + self.phase) * 0.18
+        wobble = math.sin(clock.now * 2.1 + self.phase) * 0.18
         self.x += self.vx + wobble
         self.y += self.vy
         self.life -= 0.004
@@ -277,8 +288,10 @@ for s in stars:
         fill="#888888", outline="")
     star_ids.append(sid)
 
-# Mist layers
-mist_layers = [
+# Mist: fog bands from cached noise textures; flat drifting bands without them
+mist_fog = fog.Fog(canvas, W, H * 0.55, H, C_FOG, tk.PhotoImage)
+for _ in mist_fog.load(): pass
+mist_layers = [] if mist_fog else [
     MistLayer(H * 0.72, 0.18, 0.4, random.randint(180, 320))
     for _ in range(7)
 ]
@@ -287,12 +300,18 @@ for _ in mist_layers:
     mid = canvas.create_rectangle(0, 0, 1, 1, fill=C_MIST, outline="", state="hidden")
     mist_ids.append(mid)
 
-# Embers
+# Embers, each with a smoothed trail line under it (needs numpy)
+EMBER_TRAIL = 12        # positions kept per ember
 embers = [Ember() for _ in range(55)]
 ember_ids = []
+trail_ids = []
 for _ in embers:
+    if HAS_NUMPY:
+        trail_ids.append(canvas.create_line(0, 0, 0, 0, fill="#3A1804", width=1.2,
+                                            smooth=True, capstyle="round"))
     eid = canvas.create_oval(0, 0, 1, 1, fill=C_EMBER, outline="")
     ember_ids.append(eid)
+trails = TrailBuffer(len(embers), EMBER_TRAIL) if HAS_NUMPY else None
 
 
 # Decorative horizontal rules
@@ -423,60 +442,92 @@ def advance_fade():
     else:
         canvas.itemconfig(fade_overlay, fill="#000000", stipple=stipple)
     fade_step += 1
-    root.after(320, advance_fade)
+    timers.after(0.32, advance_fade)
 
-root.after(200, advance_fade)
+timers.after(0.2, advance_fade)
 
 frame = 0
-
-def loop():
-    global frame
-    frame += 1
-    t = time.time()
-
-    # Stars twinkle
-    if frame % 3 == 0:
-        for i, s in enumerate(stars):
-            canvas.itemconfig(star_ids[i], fill=s.color(t))
-
-    # Mist drift
+batch = tkbatch.FrameBatch(root)   # per-frame updates, one Tcl eval
+profiler = FrameProfiler(out=None)  # frame cost -> quality level for the trails
+gcpolicy = GcPolicy()              # scene frozen; full collections only in frame slack
+gcpolicy.freeze()
+gcpolicy.hold()
+
+# ── Frame systems ─────────────────────────────
+def twinkle_stars():
+    t = clock.now
+    for i, s in enumerate(stars):
+        batch.itemconfig(canvas, star_ids[i], fill=s.color(t))
+
+def drift_mist():
+    t = clock.now
     for i, m in enumerate(mist_layers):
         m.update()
         wave_h = m.h + int(math.sin(t * 0.4 + m.phase) * 5)
-        canvas.coords(mist_ids[i],
+        batch.coords(canvas, mist_ids[i],
             m.x, m.y, m.x + m.w, m.y + wave_h)
         # subtle teal-grey mist
         rv = int(10 + math.sin(t * 0.3 + m.phase) * 3)
-        canvas.itemconfig(mist_ids[i],
+        batch.itemconfig(canvas, mist_ids[i],
             fill=f"#{rv:02x}{rv+8:02x}{rv+12:02x}",
             state="normal")
 
-    # Embers
-    for i, e in enumerate(embers):
+def update_embers():
+    for e in embers:
         e.update()
+    if trails is not None:
+        xy = np.array([(e.x, e.y) for e in embers])
+        trails.push(xy)
+        trails.restart([i for i, e in enumerate(embers) if e.life == e.max_life], xy)  # respawned
+        for tid, path in zip(trail_ids, trails.paths(round(EMBER_TRAIL * profiler.quality))):
+            batch.coords(canvas, tid, *path)
+    for i, e in enumerate(embers):
         gr = e.r * (1.5 + 0.5 * (e.life / e.max_life))
-        canvas.coords(ember_ids[i],
+        batch.coords(canvas, ember_ids[i],
             e.x - gr, e.y - gr, e.x + gr, e.y + gr)
-        canvas.itemconfig(ember_ids[i], fill=e.color)
+        batch.itemconfig(canvas, ember_ids[i], fill=e.color)
 
-    # Title glow pulse
+def pulse_title():
+    t = clock.now
     glow_v = abs(math.sin(t * 1.2))  # always 0..1, never negative
     r_glow = max(0, min(255, int(90 * glow_v)))
     g_glow = max(0, min(255, int(35 * glow_v)))
     glow_col = f"#{r_glow:02x}{g_glow:02x}00"
-    canvas.itemconfig(title_glow_id, fill=glow_col)
+    batch.itemconfig(canvas, title_glow_id, fill=glow_col)
 
-    # Subtitle fade-shimmer
-    sv = 0.65 + 0.35 * math.sin(t * 0.7 + 1.0)
+def shimmer_subtitle():
+    sv = 0.65 + 0.35 * math.sin(clock.now * 0.7 + 1.0)
     sr = max(0, min(255, int(90 * sv)))
     sg = max(0, min(255, int(128 * sv)))
     sb = max(0, min(255, int(144 * sv)))
-    canvas.itemconfig(sub_id, fill=f"#{sr:02x}{sg:02x}{sb:02x}")
+    batch.itemconfig(canvas, sub_id, fill=f"#{sr:02x}{sg:02x}{sb:02x}")
 
+def keep_overlay():
     # Ensure overlay stays on top during fade
     if not reveal_done:
         canvas.tag_raise(fade_overlay)
 
+# Slow colour drifts run below frame rate; embers and mist move every frame.
+systems = Scheduler(profiler)
+systems.add("stars", twinkle_stars, hz=12, budget_ms=1.0)
+if mist_fog:
+    systems.add("mist", lambda: mist_fog.update(clock.now, batch), budget_ms=0.3)
+else:
+    systems.add("mist", drift_mist, budget_ms=0.5)
+systems.add("embers", update_embers, budget_ms=3.0)
+systems.add("title", pulse_title, hz=18, budget_ms=0.2)
+systems.add("subtitle", shimmer_subtitle, hz=12, budget_ms=0.2)
+systems.add("overlay", keep_overlay, budget_ms=0.2)
+
+def loop():
+    global frame
+    frame += 1
+    profiler.begin()
+    clock.tick()
+    timers.tick()
+    systems.run(frame)
+    batch.flush()
+    gcpolicy.idle(profiler.budget_ms - profiler.end(frame))
     root.after(28, loop)
 
 start_ambient()
@@ -0,0 +1,90 @@
+"""Positional sound effects — mono sources panned into one stereo stream.
+
+Sources are loaded once as mono arrays. play(name, pan, gain) starts a
+voice: pan 0..1 is left..right (equal-power), gain is any attenuation the
+caller wants (distance from the cursor). A daemon thread renders BLOCK
+samples at a time, adding each live voice's next slice into a stereo
+block with its two channel gains, and writes the block as 16-bit PCM to
+one long-running `aplay` reading raw audio from stdin. No file per
+position and no process per sound: a burst of forty voices is forty
+slice-adds per block.
+
+The stream only exists on Linux with aplay installed. Everywhere else
+(or if aplay exits) `ok` stays False and the caller plays files instead.
+"""
+import math, subprocess, sys, threading
+import numpy as np
+
+RATE       = 44100
+BLOCK      = 512          # samples per write, ~12 ms
+MAX_VOICES = 48           # past this the oldest voice is dropped
+BUFFER_US  = 60000        # aplay's device buffer: the latency floor
+
+class Mixer:
+    def __init__(self, rate=RATE, block=BLOCK):
+        self.rate, self.block = rate, block
+        self.sources = {}                 # name -> float32 mono samples
+        self.voices = []                  # [samples, position, (2,) gains, issued callback]
+        self._issued = []                 # callbacks due once the current block is written
+        self.ok = False
+        self._lock = threading.Lock()
+        self._proc = None
+
+    def load(self, name, samples):
+        """(Re)place a source; voices already playing keep the old samples."""
+        self.sources[name] = np.asarray(samples, np.float32)
+
+    def start(self):
+        """Open the stream; False if this platform has none."""
+        if not sys.platform.startswith("linux"): return False
+        try:
+            self._proc = subprocess.Popen(
+                ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "2", "-r", str(self.rate),
+                 f"--buffer-time={BUFFER_US}", "-"],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                bufsize=0)
+        except OSError:
+            return False
+        self.ok = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return True
+
+    def play(self, name, pan=0.5, gain=1.0, issued=None):
+        """issued(), if given, runs on the mixer thread once the voice's first
+        block has been written to the device."""
+        src = self.sources.get(name)
+        if src is None: return False
+        a = min(1.0, max(0.0, pan)) * (math.pi / 2)
+        g = np.array([math.cos(a), math.sin(a)], np.float32) * gain
+        with self._lock:
+            if len(self.voices) >= MAX_VOICES: self.voices.pop(0)
+            self.voices.append([src, 0, g, issued])
+        return True
+
+    def mix(self):
+        """Render the next block: interleaved S16_LE stereo bytes."""
+        n = self.block
+        out = np.zeros((n, 2), np.float32)
+        with self._lock:
+            live = []
+            for v in self.voices:
+                src, pos, g, issued = v
+                if issued and pos == 0: self._issued.append(issued)
+                seg = src[pos:pos + n]
+                out[:len(seg)] += seg[:, None] * g
+                v[1] = pos + n
+                if v[1] < len(src): live.append(v)
+            self.voices = live
+        np.tanh(out, out=out)             # soft limit: bursts stack without clipping
+        return (out * 32767).astype(np.int16).tobytes()
+
+    def _run(self):
+        w = self._proc.stdin
+        try:
+            while True:
+                w.write(self.mix())       # blocks while aplay's buffer is full: real-time pacing
+                if self._issued:
+                    for fn in self._issued: fn()
+                    self._issued.clear()
+        except (OSError, ValueError):
+            self.ok = False
@@ -0,0 +1,177 @@
+"""Frame timing: per-frame cost, labelled frames and over-budget reports.
+
+The game calls begin() / end() around every frame. Anything notable that
+happens inside a frame (a stage transition, the end screen) is tagged with
+mark(); a tagged frame that blows the budget is reported with its labels so
+the spike can be traced back to what caused it.
+
+quality is an adaptive detail level (0.25 .. 1.0) for optional effects: it
+steps down when recent frames run close to the budget and back up when
+they have room, at most once per ADAPT_WINDOW frames.
+
+watch_gc() also times every garbage collection through gc.callbacks: each
+pause is kept with its generation, and a frame that ran a full (gen-2)
+collection is labelled with it.
+
+Latency: input_event() takes a Tk event's timestamp (e.time, ms on the X
+server clock) and presented() closes every pending input once the frame
+that shows it has been flushed and drawn, giving input-to-photon times;
+sound_issued() gives input-to-sound. The two clocks are aligned by the
+smallest (arrival - e.time) seen so far, so the fastest-handled input
+counts as zero delay: the figures are lower bounds, good for comparing
+before and after a change.
+"""
+import gc, statistics, sys, time
+from collections import deque
+
+FRAME_BUDGET_MS = 28.0
+GC_BUCKETS_MS   = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25)   # histogram upper edges
+LATENCY_BUCKETS_MS = (8, 16, 33, 50, 67, 100, 150, 250)
+QUALITY_STEPS   = (0.25, 0.5, 0.75, 1.0)
+ADAPT_WINDOW    = 30           # frames averaged per quality decision
+ADAPT_HIGH      = 0.8          # × budget: step quality down above this
+ADAPT_LOW       = 0.4          # × budget: step it up below this
+
+class FrameProfiler:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, history=240, out=sys.stderr):
+        self.budget_ms = budget_ms
+        self.times = deque(maxlen=history)    # recent frame costs (ms)
+        self.marked = []                      # (frame, labels, ms) for tagged frames
+        self.out = out
+        self._t0 = 0.0
+        self._labels = []
+        self.gc_pauses = []                   # (generation, ms) per collection
+        self.quality = QUALITY_STEPS[-1]
+        self._since_adapt = 0
+        self._gc_t0 = 0.0
+        self.latency = {"photon": [], "sound": []}   # kind -> ms per input
+        self.pending_input = []               # origins (perf ms) not yet on screen
+        self._skew = None                     # min(arrival - e.time) seen
+
+    def begin(self):
+        self._t0 = time.perf_counter()
+        self._labels = []
+
+    def mark(self, label):
+        self._labels.append(label)
+
+    def end(self, frame):
+        ms = (time.perf_counter() - self._t0) * 1000
+        self.times.append(ms)
+        if self._labels:
+            self.marked.append((frame, self._labels, ms))
+            if ms > self.budget_ms and self.out:
+                print(f"[frame {frame}] {' + '.join(self._labels)}: "
+                      f"{ms:.1f} ms (budget {self.budget_ms:.0f} ms)", file=self.out)
+        self._adapt()
+        return ms
+
+    def _adapt(self):
+        self._since_adapt += 1
+        if self._since_adapt < ADAPT_WINDOW or len(self.times) < ADAPT_WINDOW: return
+        avg = sum(self.times[-i] for i in range(1, ADAPT_WINDOW + 1)) / ADAPT_WINDOW
+        i = QUALITY_STEPS.index(self.quality)
+        if avg > self.budget_ms * ADAPT_HIGH and i > 0: i -= 1
+        elif avg < self.budget_ms * ADAPT_LOW and i < len(QUALITY_STEPS) - 1: i += 1
+        else: return
+        self.quality = QUALITY_STEPS[i]
+        self._since_adapt = 0
+
+    def worst(self):
+        return max(self.times, default=0.0)
+
+    def new_run(self):
+        """Forget the last run's frame times, marks, GC pauses and latencies
+        (the clock skew and quality level carry over)."""
+        self.times.clear()
+        self.marked.clear()
+        self.gc_pauses.clear()
+        for v in self.latency.values(): v.clear()
+        self.pending_input.clear()
+
+    # ── garbage collection ─────────────────────
+    def watch_gc(self):
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
+    def unwatch_gc(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_t0 = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self._gc_t0) * 1000
+        gen = info["generation"]
+        self.gc_pauses.append((gen, ms))
+        if gen == 2:
+            self._labels.append(f"gc gen2 {ms:.1f} ms")
+
+    def gc_histogram(self, gen=None, buckets=GC_BUCKETS_MS):
+        """Pause counts per bucket ("<= edge", last one open), optionally one generation."""
+        counts = [0] * (len(buckets) + 1)
+        for g, ms in self.gc_pauses:
+            if gen is None or g == gen:
+                counts[next((i for i, b in enumerate(buckets) if ms <= b), len(buckets))] += 1
+        return counts
+
+    # ── input latency ──────────────────────────
+    def input_event(self, event_ms):
+        """A Tk event stamped `event_ms`; returns its origin on the perf clock
+        (None for synthetic events, which carry time 0)."""
+        if not event_ms: return None
+        d = time.perf_counter() * 1000 - event_ms
+        if self._skew is None or d < self._skew: self._skew = d
+        origin = event_ms + self._skew
+        self.pending_input.append(origin)
+        return origin
+
+    def presented(self):
+        """The frame showing every pending input is on screen."""
+        now = time.perf_counter() * 1000
+        self.latency["photon"].extend(now - o for o in self.pending_input)
+        self.pending_input.clear()
+
+    def sound_issued(self, origin):
+        """The audio for the input at `origin` was handed to the device (any thread)."""
+        self.latency["sound"].append(time.perf_counter() * 1000 - origin)
+
+    def latency_histogram(self, kind, buckets=LATENCY_BUCKETS_MS):
+        counts = [0] * (len(buckets) + 1)
+        for ms in self.latency[kind]:
+            counts[next((i for i, b in enumerate(buckets) if ms <= b), len(buckets))] += 1
+        return counts
+
+    def latency_stats(self, kind):
+        """(count, p50, p95, worst) in ms; zeros when nothing was measured."""
+        v = sorted(self.latency[kind])
+        if not v: return 0, 0.0, 0.0, 0.0
+        return len(v), statistics.median(v), v[min(len(v) - 1, int(len(v) * 0.95))], v[-1]
+
+    def summary(self):
+        """Text lines for the on-screen overlay."""
+        t = sorted(self.times)
+        p50 = t[len(t) // 2] if t else 0.0
+        pauses = self.gc_pauses
+        lines = [f"frame   p50 {p50:5.1f}  worst {self.worst():5.1f} ms  quality {self.quality:.2f}",
+                 "gc      " + "  ".join(f"gen{g} {sum(1 for p, _ in pauses if p == g)}" for g in range(3))
+                 + f"  worst {max((ms for _, ms in pauses), default=0):.1f} ms"]
+        edges = [f"≤{b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        for kind in ("photon", "sound"):
+            n, p50, p95, worst = self.latency_stats(kind)
+            lines.append(f"input→{kind:<6} n {n:<5} p50 {p50:5.1f}  p95 {p95:5.1f}  worst {worst:5.1f} ms")
+            lines.append("  " + " ".join(f"{e}:{c}" for e, c in zip(edges, self.latency_histogram(kind)) if c))
+        return lines
+
+    def metrics(self):
+        """Plain-data record for the metrics log."""
+        return {
+            "frame_ms": {"p50": statistics.median(self.times) if self.times else 0.0,
+                         "worst": self.worst()},
+            "gc_histogram_ms": {"edges": list(GC_BUCKETS_MS), "counts": self.gc_histogram()},
+            "latency_ms": {kind: dict(zip(("count", "p50", "p95", "worst"), self.latency_stats(kind)),
+                                      edges=list(LATENCY_BUCKETS_MS),
+                                      counts=self.latency_histogram(kind))
+                           for kind in self.latency},
+        }
@@ -0,0 +1,279 @@
+"""NumPy software rasterizer — draws the meadow into an RGB framebuffer.
+
+Two uses:
+  * headless: dump frames as PPM/PNG for visual regression and trailers
+        python raster.py --frames 300 --every 10 --out frames --png
+  * live: game.py --raster pushes each frame into a single PhotoImage
+    instead of moving hundreds of canvas items.
+
+render() reads the game module's state directly, so it stays in step with
+whatever the canvas backend would have drawn.
+"""
+import functools, math, os, struct, sys, zlib
+from operator import attrgetter
+import numpy as np
+
+@functools.lru_cache(maxsize=1024)
+def rgb(col):
+    return np.array([int(col[1:3],16), int(col[3:5],16), int(col[5:7],16)], np.float32)
+
+def _sprite(radius, falloff=1.0):
+    """Radial weights in 0..1 over a (2r+1)² patch."""
+    r = int(math.ceil(radius))
+    yy, xx = np.mgrid[-r:r+1, -r:r+1]
+    d = np.sqrt(xx*xx + yy*yy) / radius
+    return np.clip(1 - d, 0, 1) ** falloff
+
+BODY_SPRITE  = _sprite(4.5, 0.35)
+SPARK_SPRITE = _sprite(2.5, 0.6)
+
+def _box(a, r, axis):
+    """Box blur of half-width r along one axis using running sums."""
+    n = a.shape[axis]
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (r + 1, r)
+    c = np.cumsum(np.pad(a, pad), axis=axis)
+    hi = np.take(c, np.arange(2*r + 1, 2*r + 1 + n), axis=axis)
+    lo = np.take(c, np.arange(n), axis=axis)
+    return (hi - lo) / (2*r + 1)
+
+def _blur(a, r):
+    for _ in range(3):          # three box passes ≈ gaussian
+        a = _box(_box(a, r, 0), r, 1)
+    return a
+
+class Framebuffer:
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.px = np.zeros((h, w, 3), np.float32)
+        self.background = None
+        self._glow_norm = {}
+
+    # ── primitives ─────────────────────────────
+    def _window(self, x, y, r):
+        x0, x1 = max(0, int(x - r)), min(self.w, int(x + r) + 2)
+        y0, y1 = max(0, int(y - r)), min(self.h, int(y + r) + 2)
+        if x0 >= x1 or y0 >= y1: return None
+        ys, xs = np.ogrid[y0:y1, x0:x1]
+        d = np.sqrt((xs - x) ** 2 + (ys - y) ** 2)
+        return self.px[y0:y1, x0:x1], d
+
+    def rect(self, x0, y0, x1, y1, col):
+        x0, x1 = max(0, int(x0)), min(self.w, int(x1))
+        y0, y1 = max(0, int(y0)), min(self.h, int(y1))
+        if x0 < x1 and y0 < y1:
+            self.px[y0:y1, x0:x1] = rgb(col)
+
+    def disc(self, x, y, r, col, alpha=1.0):
+        win = self._window(x, y, r)
+        if win is None: return
+        region, d = win
+        m = d <= r
+        region[m] = region[m] * (1 - alpha) + rgb(col) * alpha
+
+    def ring(self, x, y, r, col, width=2):
+        win = self._window(x, y, r + width)
+        if win is None: return
+        region, d = win
+        region[np.abs(d - r) <= width / 2] = rgb(col)
+
+    def splat(self, xs, ys, sprite, color, gain=1.0):
+        """Additively blend `sprite` at every (x, y). `color` is one RGB or
+        one per point; `gain` is a scalar or one weight per point."""
+        n = len(xs)
+        if n == 0: return
+        r = sprite.shape[0] // 2
+        oy, ox = np.nonzero(sprite)
+        wts = sprite[oy, ox]
+        ix = np.rint(xs).astype(np.int64)[:, None] + (ox - r)[None, :]
+        iy = np.rint(ys).astype(np.int64)[:, None] + (oy - r)[None, :]
+        ok = (ix >= 0) & (ix < self.w) & (iy >= 0) & (iy < self.h)
+        flat = (iy * self.w + ix)[ok]
+        w = wts[None, :] * np.reshape(gain, (-1, 1)) if np.ndim(gain) else wts[None, :] * gain
+        w = np.broadcast_to(w, ix.shape)[ok]
+        color = np.asarray(color, np.float32)
+        if color.ndim == 2:
+            color = np.broadcast_to(color[:, None, :], ix.shape + (3,))[ok]
+        size = self.w * self.h
+        if len(flat) * 8 < size:      # sparse: scatter straight into the pixels
+            np.add.at(self.px.reshape(-1, 3), flat, w[:, None].astype(np.float32) * color)
+        elif color.ndim == 1:         # dense: one full-frame histogram per channel
+            acc = np.bincount(flat, w, minlength=size).astype(np.float32)
+            self.px += acc.reshape(self.h, self.w, 1) * color
+        else:
+            for c in range(3):
+                acc = np.bincount(flat, w * color[:, c], minlength=size)
+                self.px[..., c] += acc.reshape(self.h, self.w).astype(np.float32)
+
+    def glow(self, xs, ys, color, gain, radius, scale=2):
+        """Additive soft glow: points are binned into a 1/scale density grid
+        and blurred, so the cost does not depend on how many points there are.
+        A lone point peaks at `gain` × color."""
+        gw, gh = -(-self.w // scale), -(-self.h // scale)
+        r = max(1, int(radius / scale / 2))
+        norm = self._glow_norm.get(r)
+        if norm is None:
+            imp = np.zeros((4*r + 3, 4*r + 3)); imp[2*r + 1, 2*r + 1] = 1
+            norm = self._glow_norm[r] = 1 / _blur(imp, r).max()
+        ix = (np.asarray(xs) / scale).astype(np.int64)
+        iy = (np.asarray(ys) / scale).astype(np.int64)
+        ok = (ix >= 0) & (ix < gw) & (iy >= 0) & (iy < gh)
+        g = np.broadcast_to(gain, ix.shape)[ok]
+        dens = np.bincount(iy[ok] * gw + ix[ok], g, minlength=gw * gh).reshape(gh, gw)
+        dens = _blur(dens, r) * norm
+        up = np.repeat(np.repeat(dens.astype(np.float32), scale, 0), scale, 1)
+        self.px += up[:self.h, :self.w, None] * np.asarray(color, np.float32)
+
+    # ── output ─────────────────────────────────
+    def to_bytes(self):
+        return np.clip(self.px, 0, 255).astype(np.uint8).tobytes()
+
+    def to_ppm(self):
+        return b"P6 %d %d 255\n" % (self.w, self.h) + self.to_bytes()
+
+    def save_ppm(self, path):
+        with open(path, "wb") as fh:
+            fh.write(self.to_ppm())
+
+    def save_png(self, path, level=6):
+        img = np.clip(self.px, 0, 255).astype(np.uint8)
+        raw = np.zeros((self.h, self.w * 3 + 1), np.uint8)   # filter byte 0 per row
+        raw[:, 1:] = img.reshape(self.h, -1)
+        def chunk(tag, data):
+            return (struct.pack(">I", len(data)) + tag + data +
+                    struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+        with open(path, "wb") as fh:
+            fh.write(b"\x89PNG\r\n\x1a\n")
+            fh.write(chunk(b"IHDR", struct.pack(">IIBBBBB", self.w, self.h, 8, 2, 0, 0, 0)))
+            fh.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), level)))
+            fh.write(chunk(b"IEND", b""))
+
+# ── scene ──────────────────────────────────────
+def build_background(fb, g):
+    """Static layers, mirroring game.build_background: sky, moon, trees, ground."""
+    W, H = fb.w, fb.h
+    for i in range(10):
+        f = i / 9
+        col = f"#{int(3+f*8):02x}{int(12+f*16):02x}{int(24+f*10):02x}"
+        fb.rect(0, int(f*(H-60)), W, int((f+0.12)*(H+40)), col)
+    MX, MY, MR = g.MOON_X, g.MOON_Y, g.MOON_R
+    fb.disc(MX, MY, MR*1.9, "#030D1C")
+    fb.disc(MX, MY, MR*1.4, "#0A1D30")
+    fb.disc(MX, MY, MR, g.C_MOON)
+    fb.disc(MX+10, MY-10, MR*0.38, "#D4E8FF")
+    if g.treeline:
+        top = np.interp(np.arange(W), g.treeline[0::2], g.treeline[1::2])
+        rows = np.arange(H)[:, None]
+        fb.px[rows >= top[None, :]] = rgb("#020B05")
+    for i in range(5):
+        f = i / 4
+        yy = H - 58 + int(f * 58)
+        fb.rect(0, yy, W, yy + 14, f"#00{int(f*16):02x}00")
+    fb.background = fb.px.copy()
+
+    stars = g.stars_data
+    fb.star_x = np.array([s[1] for s in stars], np.int64).clip(0, W-1)
+    fb.star_y = np.array([s[2] for s in stars], np.int64).clip(0, H-1)
+    fb.star_phase = np.array([s[4] for s in stars], np.float32)
+
+_fly_attrs = attrgetter("x", "y", "r", "phase")
+
+def render(fb, g, t, cursor=True):
+    """Rasterize one frame of game module `g` at time `t` into `fb`."""
+    if fb.background is None:
+        build_background(fb, g)
+    np.copyto(fb.px, fb.background)
+
+    # Stars
+    v = 0.45 + 0.55 * np.sin(t * 1.4 + fb.star_phase)
+    b = 100 + 155 * v
+    fb.px[fb.star_y, fb.star_x] = np.stack([b, b, np.minimum(255, b + 20)], axis=1)
+
+    # Light field, over the backdrop and under everything that moves
+    if getattr(g, "light", None) is not None:
+        g.light.blend(fb.px)
+
+    # Heart
+    p = 0.90 + 0.10 * math.sin(t * 1.9)
+    prog = g.stage / max(1, len(g.STAGES) - 1)
+    col = g.lerp_color("#152A3A", g.C_HEART, prog)
+    fb.ring(g.HX, g.HY, g.HR * p, col, 2)
+    fb.ring(g.HX, g.HY, g.HR * 0.44 * p, g.lerp_color(col, "#000000", 0.6), 1)
+
+    if cursor and g.mouse_pos:
+        mx, my = g.mouse_pos
+        fb.ring(mx, my, 14, g.C_ACCENT, 1)
+        fb.disc(mx, my, 2, g.C_ACCENT)
+
+    # Fireflies — additive glow + body
+    if g.fireflies:
+        a = np.array(list(map(_fly_attrs, g.fireflies)), np.float32)
+        v = 0.65 + 0.35 * np.sin(t * 3.2 + a[:, 3])
+        fb.glow(a[:, 0], a[:, 1], (100, 80, 0), v * 0.35, a[:, 2].mean() * 3.8)
+        fb.splat(a[:, 0], a[:, 1], BODY_SPRITE, (255, 245, 40), v)
+
+    # Zones
+    for z in g.zones:
+        p = 0.88 + 0.12 * math.sin(t * 2.1 + z.pulse)
+        if z.full:
+            col, fill_col = g.C_HEART, "#002A1A"
+        else:
+            col = g.lerp_color("#1A4A7A", g.C_ZONE, z.charge)
+            n = int(z.charge * 40)
+            fill_col = f"#{n//2:02x}{n:02x}{min(60,n*2):02x}"
+        fb.ring(z.x, z.y, z.r * 1.35 * p, g.lerp_color("#040E1A", col, 0.4), 1)
+        fb.disc(z.x, z.y, z.r * p - 2, fill_col)
+        fb.ring(z.x, z.y, z.r * p, col, 2)
+
+    # Shadows and blooms
+    for d in g.dark_spots:
+        if d.hp > 0:
+            fb.disc(d.x, d.y, d.r * 1.7, g.C_DARK_G)
+            fb.disc(d.x, d.y, d.r, g.C_DARK)
+    for (x, y, col) in g.flowers:
+        for i in range(6):
+            ang = i * math.tau / 6
+            fb.disc(x + math.cos(ang) * 11, y + math.sin(ang) * 11, 6, col)
+        fb.disc(x, y, 4, "#FFFAAA")
+
+    # Particles
+    if g.particles:
+        ps = g.particles
+        xs = np.fromiter((q.x for q in ps), np.float32, len(ps))
+        ys = np.fromiter((q.y for q in ps), np.float32, len(ps))
+        life = np.fromiter((q.life / q.max_life for q in ps), np.float32, len(ps))
+        cols = np.stack([rgb(q.color) for q in ps])
+        fb.splat(xs, ys, SPARK_SPRITE, cols, life)
+
+def main():
+    """Headless capture: run the game without a window and dump frames."""
+    import argparse
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--every", type=int, default=10, help="save every Nth frame")
+    ap.add_argument("--out", default="frames")
+    ap.add_argument("--png", action="store_true", help="PNG instead of PPM")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    import random
+    random.seed(args.seed)
+    os.environ["EMBERVEIL_HEADLESS"] = "1"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import game
+
+    os.makedirs(args.out, exist_ok=True)
+    fb = Framebuffer(game.CANVAS_W, game.HEIGHT)
+    for i in range(args.frames):
+        ang = i * 0.02   # slow orbit around the Heart so the swarm moves
+        game.mouse_pos = (game.HX + math.cos(ang) * 220, game.HY + math.sin(ang) * 140)
+        game.loop()
+        if i % args.every == 0:
+            render(fb, game, game.clock.now)
+            ext = "png" if args.png else "ppm"
+            path = os.path.join(args.out, f"frame_{i:05d}.{ext}")
+            (fb.save_png if args.png else fb.save_ppm)(path)
+    print(f"wrote {len(range(0, args.frames, args.every))} frames to {args.out}/")
+
+if __name__ == "__main__":
+    main()
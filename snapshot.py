@@ -0,0 +1,143 @@
+"""Versioned binary snapshots of the meadow state (no pickle).
+
+File layout, little-endian:
+
+    HEADER            magic, version, run counters, elapsed, record counts, world width
+    ZONE   × zones    x, y, r, charge, full
+    SHADOW × shadows  x, y, base_r, r, hp
+    BLOOM  × blooms   x, y, 0xRRGGBB
+    stage_times       float64 seconds per completed stage
+    swarm             float32 columns, one per FLY_FIELDS entry, n_flies long
+
+A state is a plain dict so this module never needs to import the game.
+"""
+import mmap, os, struct, threading
+import numpy as np
+
+MAGIC   = b"EMBV"
+VERSION = 3                     # 2: combo peak + per-stage times, 3: world width
+
+HEADER = struct.Struct("<4sHHiiiiiidIIIIII")
+ZONE   = struct.Struct("<ffffB3x")
+SHADOW = struct.Struct("<ffHHh2x")
+BLOOM  = struct.Struct("<ffI")
+FLY_FIELDS = ("x", "y", "dx", "dy", "r", "phase", "spd")
+
+def encode(state):
+    """state["swarm"] is a (fields, flies) array, or a list of flat blocks of
+    per-fly rows (a capture taken in slices), joined here."""
+    zones, shadows, blooms = state["zones"], state["shadows"], state["blooms"]
+    swarm = state["swarm"]
+    if isinstance(swarm, list):
+        rows = np.concatenate(swarm) if swarm else np.zeros(0, np.float32)
+        swarm = rows.reshape(-1, len(FLY_FIELDS)).T
+    swarm = np.ascontiguousarray(swarm, dtype=np.float32)
+    n_flies = swarm.shape[1] if swarm.size else 0
+    stage_times = np.asarray(state["stage_times"], np.float64)
+    parts = [HEADER.pack(MAGIC, VERSION, 0,
+        state["stage"], state["score"], state["combo"], state["combo_timer"],
+        state["frame"], state["combo_peak"], state["elapsed"],
+        len(zones), len(shadows), len(blooms), n_flies, len(stage_times), state["world_w"])]
+    parts += [ZONE.pack(*z) for z in zones]
+    parts += [SHADOW.pack(*d) for d in shadows]
+    parts += [BLOOM.pack(*b) for b in blooms]
+    parts.append(stage_times.tobytes())
+    parts.append(swarm.tobytes())
+    return b"".join(parts)
+
+def write(path, state):
+    """Atomically replace `path` with an encoded snapshot."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(encode(state))
+        fh.flush()
+        os.fsync(fh.fileno())         # on disk before the rename, so a crash can't leave it empty
+    os.replace(tmp, path)
+
+def load(path):
+    """Map a snapshot file and decode it; None if missing, foreign, stale,
+    truncated or corrupt."""
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return None
+    try:
+        with fh:
+            return _decode(fh)
+    except (struct.error, ValueError, OSError):
+        return None
+
+def _decode(fh):
+    if os.fstat(fh.fileno()).st_size < HEADER.size:
+        return None
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (magic, version, _, stage, score, combo, combo_timer, frame,
+         combo_peak, elapsed, nz, nd, nb, nf, nt, world_w) = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        off = HEADER.size
+        if len(mm) != (off + nz * ZONE.size + nd * SHADOW.size + nb * BLOOM.size
+                       + 8 * nt + 4 * nf * len(FLY_FIELDS)):
+            return None
+        zones = [ZONE.unpack_from(mm, off + i*ZONE.size) for i in range(nz)]
+        off += nz * ZONE.size
+        shadows = [SHADOW.unpack_from(mm, off + i*SHADOW.size) for i in range(nd)]
+        off += nd * SHADOW.size
+        blooms = [BLOOM.unpack_from(mm, off + i*BLOOM.size) for i in range(nb)]
+        off += nb * BLOOM.size
+        stage_times = np.frombuffer(mm, np.float64, nt, off).tolist()
+        off += 8 * nt
+        swarm = np.frombuffer(mm, np.float32, nf * len(FLY_FIELDS), off)
+        swarm = swarm.reshape(len(FLY_FIELDS), nf).copy()
+    return {
+        "stage": stage, "score": score, "combo": combo,
+        "combo_timer": combo_timer, "frame": frame, "elapsed": elapsed,
+        "combo_peak": combo_peak, "stage_times": stage_times,
+        "zones": zones, "shadows": shadows, "blooms": blooms, "swarm": swarm,
+        "world_w": world_w,
+    }
+
+def discard(path):
+    try: os.remove(path)
+    except OSError: pass
+
+class Autosaver:
+    """Background writer. Only the newest submitted state is kept, so a slow
+    disk coalesces saves instead of queueing them behind the frame loop."""
+    _DISCARD = object()
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._cv = threading.Condition()
+        self._io = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, state):
+        with self._cv:
+            self._pending = state
+            self._cv.notify()
+
+    def discard(self):
+        self.submit(self._DISCARD)
+
+    def save_now(self, state):
+        """Synchronous save for shutdown; supersedes anything pending."""
+        with self._cv:
+            self._pending = None
+        with self._io:
+            write(self.path, state)
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while self._pending is None:
+                    self._cv.wait()
+                state, self._pending = self._pending, None
+            with self._io:
+                try:
+                    if state is self._DISCARD: discard(self.path)
+                    else: write(self.path, state)
+                except OSError:
+                    pass
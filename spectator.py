@@ -0,0 +1,429 @@
+"""Spectator stream — mirror a live meadow onto other displays.
+
+game.py --spectate publishes one binary message per frame over a local TCP
+or Unix socket; `python spectator.py view` renders it. Messages are
+delta-encoded against the previous frame, so a still swarm costs a few
+bytes and bandwidth tracks what actually moved.
+
+Message = u32 length + body. Body:
+
+    u8  kind            KEY (absolute) or DELTA
+    u32 frame
+    u8  flags           which sections follow, in this order:
+    STAGE   u8 stage, i32 score
+    VIEW    u16 world width, u16 camera x (px)                when changed
+    ZONES   KEY:   u8 n, n × (u16 x, u16 y, u8 r, u8 charge)
+            DELTA: u8 n, n × (u8 index, u8 charge)          changed only
+    FLIES   KEY / FLIES_ABS: u16 n, n × (u16 x, u16 y)      in 1/POS_Q px
+            DELTA: u16 n, ceil(n/8) changed-bitmask, m × (i8 dx, i8 dy)
+    EVENTS  u8 n, n × (u16 x, u16 y, u8 r, u8 g, u8 b, u8 count, u8 spread)
+
+Addresses look like "tcp:127.0.0.1:47800" or "unix:/tmp/emberveil.sock".
+
+    python spectator.py view [ADDR]      # viewer window
+    python spectator.py loopback         # headless encode → decode check
+    python spectator.py resync           # lagging socket client: partial sends + resyncs
+"""
+import os, socket, struct, sys
+import numpy as np
+
+DEFAULT_ADDR = "tcp:127.0.0.1:47800"
+POS_Q        = 4                 # positions quantized to 1/4 px
+MAX_BACKLOG  = 256 * 1024        # a client further behind than this is resynced (or dropped)
+
+KEY, DELTA = 1, 2
+STAGE, ZONES, FLIES, EVENTS, FLIES_ABS, VIEW = 1, 2, 4, 8, 16, 32
+
+_LEN   = struct.Struct("<I")
+_HEAD  = struct.Struct("<BIB")
+_STAGE = struct.Struct("<Bi")
+_VIEW  = struct.Struct("<HH")
+_ZKEY  = struct.Struct("<HHBB")
+_ZDEL  = struct.Struct("<BB")
+_EVENT = struct.Struct("<HHBBBBB")
+
+def _u16(v):
+    return max(0, min(0xFFFF, int(v)))
+
+class Encoder:
+    """Turns per-frame game state into KEY / DELTA messages."""
+    def __init__(self):
+        self.last = None          # (stage, score, zone charges, fly positions, view)
+
+    def encode(self, frame, stage, score, zones, flies_xy, events, key=False, view=(840, 0)):
+        """zones: [(x, y, r, charge 0..1)]; flies_xy: (n, 2) float array;
+        view: (world width, camera x) in px."""
+        view = (_u16(view[0]), _u16(view[1]))
+        q = np.rint(np.asarray(flies_xy, np.float64).reshape(-1, 2) * POS_Q)
+        q = np.clip(q, 0, 0xFFFF).astype(np.int32)
+        charges = bytes(min(255, int(z[3] * 255)) for z in zones)
+        key = key or self.last is None
+        parts, flags = [], 0
+
+        if key or (stage, score) != self.last[:2]:
+            flags |= STAGE
+            parts.append(_STAGE.pack(stage, score))
+
+        if key or view != self.last[4]:
+            flags |= VIEW
+            parts.append(_VIEW.pack(*view))
+
+        if key:
+            flags |= ZONES
+            parts.append(bytes([len(zones)]))
+            parts += [_ZKEY.pack(_u16(x), _u16(y), min(255, int(r)), c)
+                      for (x, y, r, _), c in zip(zones, charges)]
+        else:
+            changed = [(i, c) for i, (c, old) in enumerate(zip(charges, self.last[2])) if c != old]
+            if changed:
+                flags |= ZONES
+                parts.append(bytes([len(changed)]))
+                parts += [_ZDEL.pack(i, c) for i, c in changed]
+
+        prev = None if key else self.last[3]
+        if prev is None or len(prev) != len(q):
+            flags |= FLIES if key else FLIES_ABS
+            parts.append(struct.pack("<H", len(q)) + q.astype("<u2").tobytes())
+        else:
+            d = q - prev
+            moved = d.any(axis=1)
+            if moved.any():
+                if np.abs(d[moved]).max() > 127:
+                    flags |= FLIES_ABS
+                    parts.append(struct.pack("<H", len(q)) + q.astype("<u2").tobytes())
+                else:
+                    flags |= FLIES
+                    parts.append(struct.pack("<H", len(q)) + np.packbits(moved).tobytes()
+                                 + d[moved].astype(np.int8).tobytes())
+
+        if events:
+            flags |= EVENTS
+            parts.append(bytes([min(255, len(events))]))
+            parts += [_EVENT.pack(_u16(x), _u16(y), *col, min(255, n), min(255, int(spread)))
+                      for (x, y, col, n, spread) in events[:255]]
+
+        self.last = (stage, score, charges, q, view)
+        body = _HEAD.pack(KEY if key else DELTA, frame & 0xFFFFFFFF, flags) + b"".join(parts)
+        return _LEN.pack(len(body)) + body
+
+class Decoder:
+    """Rebuilds the meadow from a message stream; call feed() with raw bytes."""
+    def __init__(self):
+        self.buf = bytearray()
+        self.synced = False
+        self.frame = self.stage = self.score = 0
+        self.world_w, self.cam_x = 840, 0       # px; wider with game.py --world
+        self.zones = []                         # [x, y, r, charge 0..255]
+        self.flies = np.zeros((0, 2), np.int32) # in 1/POS_Q px
+        self.events = []                        # drained by the viewer
+
+    def feed(self, data):
+        """Apply every complete message in `data`; returns how many."""
+        self.buf += data
+        n = 0
+        while len(self.buf) >= 4:
+            size = _LEN.unpack_from(self.buf)[0]
+            if len(self.buf) < 4 + size: break
+            self.apply(bytes(self.buf[4:4+size]))
+            del self.buf[:4+size]
+            n += 1
+        return n
+
+    def apply(self, body):
+        kind, frame, flags = _HEAD.unpack_from(body)
+        if kind == DELTA and not self.synced:
+            return                              # wait for the next keyframe
+        self.synced = True
+        self.frame, off = frame, _HEAD.size
+        if flags & STAGE:
+            self.stage, self.score = _STAGE.unpack_from(body, off); off += _STAGE.size
+        if flags & VIEW:
+            self.world_w, self.cam_x = _VIEW.unpack_from(body, off); off += _VIEW.size
+        if flags & ZONES:
+            n = body[off]; off += 1
+            if kind == KEY:
+                self.zones = [list(_ZKEY.unpack_from(body, off + i*_ZKEY.size)) for i in range(n)]
+                off += n * _ZKEY.size
+            else:
+                for i in range(n):
+                    idx, c = _ZDEL.unpack_from(body, off); off += _ZDEL.size
+                    self.zones[idx][3] = c
+        if flags & (FLIES | FLIES_ABS):
+            n = struct.unpack_from("<H", body, off)[0]; off += 2
+            if kind == KEY or flags & FLIES_ABS:
+                self.flies = np.frombuffer(body, "<u2", 2*n, off).reshape(n, 2).astype(np.int32)
+                off += 4 * n
+            else:
+                nb = (n + 7) // 8
+                moved = np.unpackbits(np.frombuffer(body, np.uint8, nb, off))[:n].astype(bool)
+                off += nb
+                m = int(moved.sum())
+                d = np.frombuffer(body, np.int8, 2*m, off).reshape(m, 2)
+                off += 2 * m
+                self.flies[moved] += d
+        if flags & EVENTS:
+            n = body[off]; off += 1
+            for i in range(n):
+                self.events.append(_EVENT.unpack_from(body, off)); off += _EVENT.size
+
+def _socket(addr, server):
+    kind, _, rest = addr.partition(":")
+    if kind == "unix":
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if server:
+            try: os.unlink(rest)
+            except OSError: pass
+            s.bind(rest); s.listen()
+        else:
+            s.connect(rest)
+        return s
+    host, _, port = rest.rpartition(":")
+    if server:
+        return socket.create_server((host, int(port)))
+    return socket.create_connection((host, int(port)))
+
+class Publisher:
+    """Non-blocking broadcaster used by the game loop; never waits on a client."""
+    def __init__(self, addr=DEFAULT_ADDR):
+        # socket -> [pending bytearray (None = needs keyframe),
+        #            unsent bytes of the partly sent message at its head]
+        self.clients = {}
+        self.encoder = Encoder()
+        self.events = []
+        self.bytes_sent = 0
+        self.resyncs = 0
+        self.server = None
+        if addr:
+            self.server = _socket(addr, server=True)
+            self.server.setblocking(False)
+
+    def burst(self, x, y, color, n, spread):
+        """Record a particle burst so viewers can replay it."""
+        rgb = (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
+        self.events.append((x * POS_Q, y * POS_Q, rgb, n, spread))
+
+    def publish(self, frame, stage, score, zones, flies_xy, view=(840, 0)):
+        """zones: [(x, y, r, charge)] in pixels; flies_xy: [(x, y)];
+        view: (world width, camera x) in pixels."""
+        scaled = [(x*POS_Q, y*POS_Q, r, c) for (x, y, r, c) in zones]
+        msg = self.encoder.encode(frame, stage, score, scaled, flies_xy, self.events, view=view)
+        self._deliver(msg, lambda: Encoder().encode(
+            frame, stage, score, scaled, flies_xy, self.events, key=True, view=view))
+        self.events = []
+
+    def _deliver(self, msg, make_key):
+        self._accept()
+        key = None
+        for c, st in list(self.clients.items()):
+            pending, head = st
+            if pending is None or len(pending) > MAX_BACKLOG:
+                # resync on a message boundary: the partly sent head message
+                # goes out whole, then the keyframe replaces everything after it
+                if head > MAX_BACKLOG:
+                    self._drop(c)
+                    continue
+                key = key or make_key()
+                pending = st[0] = (pending[:head] if head else bytearray()) + key
+                self.resyncs += 1
+            else:
+                pending += msg
+            self._flush(c, st)
+
+    def _accept(self):
+        while self.server:
+            try: c, _ = self.server.accept()
+            except (BlockingIOError, OSError): return
+            c.setblocking(False)
+            self.clients[c] = [None, 0]
+
+    def _flush(self, c, st):
+        pending, head = st
+        try:
+            sent = c.send(pending)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(c)
+            return
+        self.bytes_sent += sent
+        # find where the send stopped: inside the head message, or inside a later one
+        n, pos = sent - head, head
+        while n > 0:
+            size = 4 + _LEN.unpack_from(pending, pos)[0]
+            if n < size: break
+            n -= size; pos += size
+        st[1] = -n if n <= 0 else size - n
+        del pending[:sent]
+
+    def _drop(self, c):
+        c.close()
+        del self.clients[c]
+
+    def close(self):
+        for c in self.clients: c.close()
+        if self.server: self.server.close()
+
+class LoopbackPublisher(Publisher):
+    """In-process stand-in for tests: every message goes straight into a Decoder."""
+    def __init__(self):
+        super().__init__(addr=None)
+        self.decoder = Decoder()
+        self.messages = 0
+
+    def _deliver(self, msg, make_key):
+        self.bytes_sent += len(msg)
+        self.messages += 1
+        self.decoder.feed(msg)
+
+# ── viewer ─────────────────────────────────────
+def view(addr):
+    import tkinter as tk
+    W, H = 840, 680
+    root = tk.Tk()
+    root.title("✦ Emberveil — spectator ✦")
+    cv = tk.Canvas(root, width=W, height=H, bg="#030C18", highlightthickness=0)
+    cv.pack()
+    hud = cv.create_text(12, 12, anchor="nw", fill="#8BB8D8", font=("Courier", 11), text="connecting…")
+    heart = cv.create_oval(W//2-68, H//2+15-68, W//2+68, H//2+15+68, outline="#152A3A", width=2)
+    zone_items, fly_items, sparks, spark_items = [], [], [], []
+    shown = [W, 0]                        # world width, camera x the canvas is set to
+
+    sock = _socket(addr, server=False)
+    sock.setblocking(False)
+    dec = Decoder()
+
+    def tick():
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data: break
+                dec.feed(data)
+        except BlockingIOError:
+            data = None
+        except OSError:                   # reset by the game closing: same as EOF
+            data = b""
+        if data == b"":
+            sock.close()
+            cv.itemconfig(hud, text="stream ended"); return
+        while len(zone_items) < len(dec.zones):
+            zone_items.append(cv.create_oval(0,0,1,1, outline="#3A86FF", width=2))
+        for item, (x, y, r, c) in zip(zone_items, dec.zones):
+            x, y = x / POS_Q, y / POS_Q
+            cv.coords(item, x-r, y-r, x+r, y+r)
+            cv.itemconfig(item, fill=f"#00{c//6:02x}{c//4:02x}",
+                          outline="#00FFAA" if c == 255 else "#3A86FF")
+        n = len(dec.flies)
+        while len(fly_items) < n:
+            fly_items.append(cv.create_oval(0,0,1,1, fill="#FFFAAA", outline=""))
+        pos = dec.flies / POS_Q
+        for item, (x, y) in zip(fly_items, pos.tolist()):
+            cv.coords(item, x-3, y-3, x+3, y+3)
+        for item in fly_items[n:]:
+            cv.coords(item, 0, 0, 0, 0)
+        for (x, y, r, g, b, count, spread) in dec.events:
+            for k in range(count):
+                ang = k * 6.283 / max(1, count)
+                sparks.append([x / POS_Q, y / POS_Q, np.cos(ang) * spread * 0.6,
+                               np.sin(ang) * spread * 0.6, 30, f"#{r:02x}{g:02x}{b:02x}"])
+        dec.events.clear()
+        for s in sparks:
+            s[0] += s[2]; s[1] += s[3]; s[3] += 0.05; s[4] -= 1
+        sparks[:] = [s for s in sparks if s[4] > 0]
+        while len(spark_items) < len(sparks):
+            spark_items.append(cv.create_oval(0,0,1,1, outline=""))
+        for item, s in zip(spark_items, sparks):
+            cv.coords(item, s[0]-2, s[1]-2, s[0]+2, s[1]+2)
+            cv.itemconfig(item, fill=s[5])
+        for item in spark_items[len(sparks):]:
+            cv.coords(item, 0, 0, 0, 0)
+        if [dec.world_w, dec.cam_x] != shown:    # follow the game's camera over a --world meadow
+            if dec.world_w != shown[0]:
+                cv.configure(scrollregion=(0, 0, dec.world_w, H), xscrollincrement=1)
+                hx = dec.world_w // 2
+                cv.coords(heart, hx-68, H//2+15-68, hx+68, H//2+15+68)
+            cv.xview_moveto(dec.cam_x / dec.world_w)
+            cv.coords(hud, dec.cam_x + 12, 12)
+            shown[:] = dec.world_w, dec.cam_x
+        cv.itemconfig(heart, outline="#00FFAA" if dec.stage >= 4 else "#152A3A")
+        cv.itemconfig(hud, text=f"frame {dec.frame}   task {dec.stage+1}   score {dec.score}")
+        root.after(16, tick)
+
+    tick()
+    root.mainloop()
+
+# ── loopback check ─────────────────────────────
+def loopback(frames=600):
+    """Play a headless autopilot run through LoopbackPublisher and confirm the
+    decoded state matches the game every frame; prints bandwidth per frame."""
+    import random
+    random.seed(5)
+    os.environ["EMBERVEIL_HEADLESS"] = "1"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import game
+    from autopilot import Autopilot
+
+    pub = game.publisher = LoopbackPublisher()
+    pilot = Autopilot(game)
+    key_bytes = 0
+    while not game.game_over and game.frame < frames:
+        pilot.step(); game.loop()
+        if pub.messages == 1: key_bytes = pub.bytes_sent
+        want = np.clip(np.rint(np.array([(f.x, f.y) for f in game.fireflies]) * POS_Q),
+                       0, 0xFFFF).astype(np.int32)
+        dec = pub.decoder
+        assert (dec.flies == want).all() and dec.score == game.score \
+               and (dec.world_w, dec.cam_x) == (game.WORLD_W, game.cam.x), \
+            f"mismatch at frame {game.frame}"
+    n = pub.messages
+    print(f"frames      {n}")
+    print(f"keyframe    {key_bytes} B")
+    print(f"avg frame   {pub.bytes_sent / n:.1f} B   "
+          f"({len(game.fireflies)} flies, raw {len(game.fireflies)*4} B)")
+    print(f"events      {sum(1 for _ in pub.decoder.events)} bursts decoded")
+    print("decoded state matches the game on every frame")
+
+def resync(frames=600, flies=2000):
+    """Publish over a real non-blocking socketpair whose reader drains less
+    than each frame adds, so sends stop mid-message and the client is
+    resynced again and again; the decoder must stay in step throughout."""
+    a, b = socket.socketpair()
+    a.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    b.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    a.setblocking(False); b.setblocking(False)
+    pub = Publisher(addr=None)
+    pub.clients[a] = [None, 0]
+    dec = Decoder()
+    rng = np.random.default_rng(3)
+    xy = rng.uniform(0, 800, (flies, 2))
+    partial = 0
+
+    def read(limit):
+        try: dec.feed(b.recv(limit))
+        except BlockingIOError: pass
+
+    for f in range(frames):
+        xy = np.clip(xy + rng.normal(0, 3, xy.shape), 0, 800)
+        pub.publish(f, 0, f, [], xy)
+        partial += pub.clients[a][1] > 0
+        read(3000)
+        assert len(dec.buf) < 4 + MAX_BACKLOG * 2, f"stream corrupt at frame {f}"
+    st = pub.clients[a]
+    while st[0]:
+        pub._flush(a, st)
+        read(65536)
+    read(65536)
+    want = np.clip(np.rint(xy * POS_Q), 0, 0xFFFF).astype(np.int32)
+    assert dec.frame == frames - 1 and (dec.flies == want).all(), "decoded state drifted"
+    assert pub.resyncs and partial, "the client never lagged: nothing was checked"
+    a.close(); b.close()
+    print(f"frames      {frames}   resyncs {pub.resyncs}   partly sent {partial}")
+    print("decoded state matches after partial sends and resyncs")
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "view"
+    if cmd == "loopback":
+        loopback()
+    elif cmd == "resync":
+        resync()
+    else:
+        view(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ADDR)
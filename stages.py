@@ -0,0 +1,91 @@
+"""Stage engine — the campaign as data, goals as incremental predicates.
+
+A stage is a dict (title, icon, color, hint, reward, flock …) whose
+"goals" list holds one goal per journal step. Each goal watches a named
+counter — "zone:0", "heart", "flowers", "shadows" — and compares it with
+a target. The game pushes counter values with set() wherever they change:
+an event listener, the code that edits a list, or a per-frame measurement
+taken only while the active stage watches it. update(), called once per
+frame, returns at once unless a watched counter actually changed.
+
+Targets may name a knob ("HEART_GOAL") and "then" may name functions to
+run when the stage completes ("spawn_dark"); both resolve against the
+`env` module when they are needed, so balance sweeps that change a knob
+at run time still apply. Labels and status lines are str.format
+templates over v (the counter) and n (the target).
+"""
+
+class Goal:
+    __slots__ = ("counter", "test", "target", "label", "status")
+
+    def __init__(self, counter, test, target, label, status=None):
+        self.counter, self.test, self.target = counter, test, target
+        self.label, self.status = label, status
+
+def flag(counter, label):
+    """Counter is set (a zone is full)."""
+    return Goal(counter, lambda v, n: v >= n, 1, label)
+
+def at_least(counter, target, label, status=None):
+    """Counter ≥ target (flies in a region, flowers planted)."""
+    return Goal(counter, lambda v, n: v >= n, target, label, status)
+
+def exactly(counter, target, label, status=None):
+    """Counter == target (no shadows left)."""
+    return Goal(counter, lambda v, n: v == n, target, label, status)
+
+class StageEngine:
+    def __init__(self, stages, env, on_complete, on_status):
+        self.stages = stages
+        self.env = env                    # module knob / hook names resolve against
+        self.on_complete = on_complete    # (stage index) once every goal is met
+        self.on_status = on_status        # (text) when the status line changes
+        self.values = {}                  # counter -> current value
+        self.index = 0
+        self.goals = []
+        self.targets = []
+        self.labels = []
+        self.done = []                    # per goal, as of the last check
+        self.status = None
+        self._watch = set()
+        self._dirty = False
+        self.start(0)
+
+    def _resolve(self, v):
+        return getattr(self.env, v) if isinstance(v, str) else v
+
+    def start(self, index):
+        """Make `index` the active stage (past the end: nothing is watched)."""
+        self.index = index
+        self.goals = self.stages[index]["goals"] if index < len(self.stages) else []
+        self.targets = [self._resolve(g.target) for g in self.goals]
+        self.labels = [g.label.format(n=n) for g, n in zip(self.goals, self.targets)]
+        self.done = [False] * len(self.goals)
+        self.status = None
+        self._watch = {g.counter for g in self.goals}
+        self._dirty = bool(self.goals)
+
+    def watching(self, counter):
+        return counter in self._watch
+
+    def set(self, counter, v):
+        if self.values.get(counter) == v: return
+        self.values[counter] = v
+        if counter in self._watch: self._dirty = True
+
+    def update(self):
+        """Re-check the active stage if a counter it watches changed."""
+        if not self._dirty: return
+        self._dirty = False
+        values = self.values
+        self.done = [g.test(values.get(g.counter, 0), n) for g, n in zip(self.goals, self.targets)]
+        status = next((g.status.format(v=values.get(g.counter, 0), n=n)
+                       for g, n in zip(self.goals, self.targets) if g.status), None)
+        if status != self.status:
+            self.status = status
+            if status is not None: self.on_status(status)
+        if all(self.done):
+            index = self.index
+            self.on_complete(index)
+            for name in self.stages[index].get("then", ()):
+                getattr(self.env, name)()
@@ -0,0 +1,59 @@
+"""Multi-rate system scheduler — which subsystem runs on which frame.
+
+Each system registers with a rate (hz, or every=N frames) and a time
+budget. run(frame) calls the systems due on that frame in registration
+order. A system slower than the frame rate is given the phase whose frames
+carry the least budget so far (worst frame first, then total), so the quarter-rate work does not all land
+on the same frame. Every run is timed; a run over budget is counted and
+tagged on the profiler's frame, so a spike report names the system.
+"""
+import time
+
+FRAME_HZ = 1 / 0.028        # the 28 ms loop
+HORIZON  = 60               # frames the phase balancing looks across
+
+class System:
+    __slots__ = ("name", "fn", "every", "phase", "budget_ms",
+                 "runs", "total_ms", "worst_ms", "overruns")
+
+    def __init__(self, name, fn, every, phase, budget_ms):
+        self.name, self.fn, self.every, self.phase = name, fn, every, phase
+        self.budget_ms = budget_ms
+        self.runs = self.overruns = 0
+        self.total_ms = self.worst_ms = 0.0
+
+class Scheduler:
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.systems = []
+        self._load = [0.0] * HORIZON    # budget already booked per frame slot
+
+    def add(self, name, fn, hz=None, every=1, budget_ms=1.0):
+        if hz: every = max(1, round(FRAME_HZ / hz))
+        slots = lambda p: [f % HORIZON for f in range(p, max(HORIZON, p + 1), every)]
+        phase = min(range(every), key=lambda p: (max(self._load[f] for f in slots(p)),
+                                                 sum(self._load[f] for f in slots(p)), p))
+        for f in slots(phase):
+            self._load[f] += budget_ms
+        s = System(name, fn, every, phase, budget_ms)
+        self.systems.append(s)
+        return s
+
+    def run(self, frame):
+        perf = time.perf_counter
+        for s in self.systems:
+            if frame % s.every != s.phase: continue
+            t0 = perf()
+            s.fn()
+            ms = (perf() - t0) * 1000
+            s.runs += 1
+            s.total_ms += ms
+            if ms > s.worst_ms: s.worst_ms = ms
+            if ms > s.budget_ms:
+                s.overruns += 1
+                if self.profiler: self.profiler.mark(f"{s.name} {ms:.1f}/{s.budget_ms:g} ms")
+
+    def report(self):
+        """(name, every, phase, runs, avg_ms, worst_ms, overruns) in run order."""
+        return [(s.name, s.every, s.phase, s.runs, s.total_ms / max(1, s.runs),
+                 s.worst_ms, s.overruns) for s in self.systems]
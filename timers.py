@@ -0,0 +1,83 @@
+"""Game timers — one heap of callbacks due at game-clock times.
+
+The queue reads its clock's `now` (a GameClock). The frame loop calls
+tick() once per frame and every timer due by then runs, in due order.
+Because the times are game time, timers stop while the game is paused and
+stretch under slow motion, and no Tcl after-callback is ever created.
+
+after() returns a handle that can be cancelled. Passing a key coalesces:
+scheduling the same key again cancels the earlier timer, so a burst of
+status messages leaves exactly one pending "hide". Cancelled entries stay
+in the heap until they surface (or until they outnumber the live ones and
+the heap is compacted), so cancelling is O(1).
+"""
+import heapq, itertools
+
+class Timer:
+    __slots__ = ("due", "fn", "key", "queue", "cancelled")
+
+    def __init__(self, due, fn, key, queue):
+        self.due, self.fn, self.key, self.queue = due, fn, key, queue
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.queue._dropped(self)
+
+class TimerQueue:
+    def __init__(self, clock):
+        self.clock = clock
+        self._heap = []              # (due, seq, Timer)
+        self._seq = itertools.count()
+        self._keyed = {}             # key -> its pending Timer
+        self._live = 0
+
+    def __len__(self):
+        return self._live
+
+    def after(self, delay, fn, key=None):
+        """Run fn() `delay` game seconds from now."""
+        if key is not None:
+            old = self._keyed.get(key)
+            if old: old.cancel()
+        t = Timer(self.clock.now + delay, fn, key, self)
+        if key is not None: self._keyed[key] = t
+        heapq.heappush(self._heap, (t.due, next(self._seq), t))
+        self._live += 1
+        return t
+
+    def cancel(self, key):
+        t = self._keyed.get(key)
+        if t: t.cancel()
+
+    def clear(self):
+        for e in self._heap:
+            e[2].cancelled = True
+        self._heap.clear()
+        self._keyed.clear()
+        self._live = 0
+
+    def tick(self):
+        """Run every timer due by now; returns how many ran."""
+        now = self.clock.now
+        heap, ran = self._heap, 0
+        while heap and heap[0][0] <= now:
+            t = heapq.heappop(heap)[2]
+            if t.cancelled: continue
+            t.cancelled = True       # spent: a late cancel() is a no-op
+            self._live -= 1
+            if t.key is not None and self._keyed.get(t.key) is t:
+                del self._keyed[t.key]
+            t.fn()
+            ran += 1
+        return ran
+
+    def _dropped(self, t):
+        self._live -= 1
+        if t.key is not None and self._keyed.get(t.key) is t:
+            del self._keyed[t.key]
+        if len(self._heap) > 64 and self._live < len(self._heap) // 2:
+            # in place: tick() may be mid-loop over this list, running a callback
+            self._heap[:] = [e for e in self._heap if not e[2].cancelled]
+            heapq.heapify(self._heap)
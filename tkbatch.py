@@ -0,0 +1,60 @@
+"""Per-frame canvas command batching.
+
+Every tkinter coords()/itemconfig() is a separate Python → Tcl round trip,
+and itemconfig also runs tkinter's option marshalling in Python. FrameBatch
+instead renders each update as a line of Tcl and submits the whole frame in
+a single eval. DirectCalls has the same interface but calls straight
+through, so the two can be compared (and swapped) without touching the
+draw code.
+
+    batch = FrameBatch(root)
+    batch.coords(canvas, item, x0, y0, x1, y1)
+    batch.itemconfig(canvas, item, fill="#ffcc00")
+    batch.flush()               # once per frame
+"""
+import re
+
+_SAFE = re.compile(r"[\w#.+\-]+\Z")
+
+def tcl_quote(v):
+    s = str(v)
+    if _SAFE.match(s): return s
+    return '"' + (s.replace("\\", "\\\\").replace('"', '\\"')
+                   .replace("$", "\\$").replace("[", "\\[").replace("]", "\\]")) + '"'
+
+class FrameBatch:
+    def __init__(self, root):
+        self.tk = root.tk
+        self.cmds = []
+        self.calls = 0           # Tcl round trips
+        self.commands = 0        # canvas commands submitted
+
+    def coords(self, widget, item, *xy):
+        self.cmds.append(f"{widget._w} coords {item} " + " ".join(["%.2f" % v for v in xy]))
+
+    def itemconfig(self, widget, item, **opts):
+        self.cmds.append(f"{widget._w} itemconfigure {item} " +
+                         " ".join([f"-{k} {tcl_quote(v)}" for k, v in opts.items()]))
+
+    def flush(self):
+        if not self.cmds: return
+        self.commands += len(self.cmds)
+        self.calls += 1
+        self.tk.eval("\n".join(self.cmds))
+        self.cmds.clear()
+
+class DirectCalls:
+    """One tkinter call per update, as before batching."""
+    def __init__(self):
+        self.calls = self.commands = 0
+
+    def coords(self, widget, item, *xy):
+        self.calls += 1; self.commands += 1
+        widget.coords(item, *xy)
+
+    def itemconfig(self, widget, item, **opts):
+        self.calls += 1; self.commands += 1
+        widget.itemconfig(item, **opts)
+
+    def flush(self):
+        pass
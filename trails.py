@@ -0,0 +1,45 @@
+"""Motion trails — the last K positions of every mover in one ring buffer.
+
+TrailBuffer owns a single (N, K, 2) float32 array. push() writes this
+frame's positions into one column and moves the head; paths(length)
+returns each mover's newest `length` points as a flat x0 y0 x1 y1 … list,
+ready for one coords() call on a reusable smoothed line item. Memory is
+N × K however long the quality level lets the trails be drawn.
+"""
+import numpy as np
+
+class TrailBuffer:
+    def __init__(self, n, k):
+        self.k = k
+        self.pos = np.zeros((n, k, 2), np.float32)
+        self.head = 0
+        self._fresh = True           # next push fills every slot
+
+    def __len__(self):
+        return len(self.pos)
+
+    def clear(self):
+        """Everyone jumped (new run, restore): drop the old points on the next push."""
+        self._fresh = True
+
+    def push(self, xy):
+        """xy: (N, 2) positions this frame. Only a change of N reallocates."""
+        if len(xy) != len(self.pos):
+            self.pos = np.zeros((len(xy), self.k, 2), np.float32)
+            self._fresh = True
+        if self._fresh:
+            self.pos[:] = xy[:, None, :]
+            self._fresh = False
+        else:
+            self.pos[:, self.head] = xy
+        self.head = (self.head + 1) % self.k
+
+    def restart(self, rows, xy):
+        """Movers in `rows` respawned: collapse their trails onto where they are now."""
+        self.pos[rows] = xy[rows][:, None, :]
+
+    def paths(self, length):
+        """Newest-first flat point lists, `length` points each (2..K)."""
+        length = max(2, min(self.k, length))
+        order = (self.head - 1 - np.arange(length)) % self.k
+        return self.pos[:, order].reshape(len(self.pos), -1).tolist()